@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Callable
+
+import requests
+
+try:
+    from .backend_pool import REQUEST
+    from .scheduler import PRIORITIES, RequestScheduler
+except ImportError:  # pragma: no cover
+    from backend_pool import REQUEST
+    from scheduler import PRIORITIES, RequestScheduler
+
+
+class AdaptiveLimiter:
+    """Concurrency limit tuned at runtime from request latency and errors.
+
+    Latency drives the limit gradient-style: a short-term average is compared
+    with the lowest average seen, and while the server answers as fast as usual
+    the limit grows by about ``sqrt(limit)`` per few requests; once queueing
+    on the server makes it slower than ``tolerance`` times the baseline, the
+    limit shrinks in proportion. Overload errors (429, 5xx, timeouts, refused
+    connections) cut it multiplicatively, once per burst: failures of requests
+    started before the last cut don't cut it again.
+
+    Requests that report their size (``cost`` in a ``unit`` such as audio
+    seconds or characters) are timed per unit of work, with averages and
+    baselines kept per unit, so a long clip after short ones reads as a
+    bigger request rather than a slower server.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff: float = 0.5,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit.")
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._backoff = backoff
+        self._tolerance = tolerance
+        self._smoothing = smoothing
+        self._clock = clock
+        # EWMA of recent latencies and the lowest recent average (the no-load
+        # latency), per unit: seconds per unit of work, or per request
+        self._short_latency: dict[str, float] = {}
+        self._baseline: dict[str, float] = {}
+        self._last_unit = REQUEST
+        self._last_backoff = -math.inf
+        self._successes = 0
+        self._overloads = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def now(self) -> float:
+        """Timestamp to pass as ``started`` to ``record``."""
+        return self._clock()
+
+    def record(
+        self,
+        started: float,
+        in_flight: int,
+        error: BaseException | None = None,
+        cost: float | None = None,
+        unit: str = REQUEST,
+    ) -> int:
+        """Account for a finished request started at ``started`` (from ``now``); returns the new limit.
+
+        ``in_flight`` is how many requests were running when it finished,
+        including this one. ``cost`` is the request's size in ``unit``; without
+        it the request counts as one unit of ``REQUEST``. Errors that aren't
+        overload (a 400, a bad file) leave the limit alone.
+        """
+        elapsed = self._clock() - started
+        if not cost or cost <= 0:
+            cost, unit = 1.0, REQUEST
+        with self._lock:
+            if error is None:
+                self._successes += 1
+                self._on_latency(elapsed / cost, unit, in_flight)
+            elif is_overload(error):
+                self._overloads += 1
+                if started >= self._last_backoff:
+                    self._limit = max(self._min_limit, self._limit * self._backoff)
+                    self._last_backoff = self._clock()
+            return int(self._limit)
+
+    def get_stats(self) -> dict[str, float | int | None]:
+        """Get the current limit and the signals it is derived from (for the last unit timed)."""
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "unit": self._last_unit,
+                "short_latency": self._short_latency.get(self._last_unit),
+                "baseline_latency": self._baseline.get(self._last_unit),
+                "successes": self._successes,
+                "overloads": self._overloads,
+            }
+
+    def _on_latency(self, latency: float, unit: str, in_flight: int) -> None:
+        self._last_unit = unit
+        short = self._short_latency.get(unit)
+        baseline = self._baseline.get(unit)
+        if short is None or baseline is None:
+            short = baseline = latency
+        else:
+            short += self._smoothing * (latency - short)
+            if self._limit <= self._min_limit:
+                # As unloaded as it gets: whatever the latency is now is the new baseline
+                # (a slower model, a different mix of work), otherwise the limit would stay pinned
+                baseline = short
+            else:
+                baseline = min(baseline, short)
+        self._short_latency[unit] = short
+        self._baseline[unit] = baseline
+
+        gradient = max(0.5, min(1.0, self._tolerance * baseline / max(short, 1e-9)))
+        if gradient == 1.0 and in_flight < self._limit / 2:
+            # The caller isn't using the limit; fast answers say nothing about a higher one
+            return
+        target = self._limit * gradient + math.sqrt(self._limit)
+        limit = (1 - self._smoothing) * self._limit + self._smoothing * target
+        self._limit = max(float(self._min_limit), min(float(self._max_limit), limit))
+
+
+def create_adaptive_scheduler(
+    initial_limit: int = 4,
+    min_limit: int = 1,
+    max_limit: int = 32,
+    weights: dict[str, float] | None = None,
+) -> RequestScheduler:
+    """Scheduler whose total concurrency follows an ``AdaptiveLimiter``.
+
+    Per-class limits are lifted to ``max_limit`` so the adaptive limit is the
+    one that binds; priorities still share it by weighted fair queueing.
+    """
+    limiter = AdaptiveLimiter(initial_limit=initial_limit, min_limit=min_limit, max_limit=max_limit)
+    return RequestScheduler(limits={priority: max_limit for priority in PRIORITIES}, weights=weights, limiter=limiter)
+
+
+def is_overload(exc: BaseException) -> bool:
+    """Whether an error means the server is over capacity rather than the request being bad.
+
+    Backends wrap request errors in ValueError (``raise ... from exc``), so the
+    chain of causes is checked too.
+    """
+    cause: BaseException | None = exc
+    while cause is not None:
+        if isinstance(cause, requests.exceptions.HTTPError):
+            response = cause.response
+            return response is None or response.status_code == 429 or response.status_code >= 500
+        if isinstance(cause, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        cause = cause.__cause__
+    return False
@@ -1,34 +1,60 @@
 from __future__ import annotations
 
-import threading
+import os
 from pathlib import Path
 
 import wx
 
 try:
     from .audio_utils import AudioSettings, build_recording_path, write_audio
+    from .catalog import RECORDING, SPEECH, RecordingCatalog
+    from .dsp import DspChain, Normalizer
+    from .jobs import Job, JobExecutor
+    from .peaks import PeakPyramid, peaks_path_for
     from .recorder import AudioRecorder
+    from .scheduler import INTERACTIVE
     from .speech_to_text import SpeechToText
-    from .text_to_speech import TextToSpeech
+    from .stt_backends import create_backend
+    from .text_to_speech import SUPPORTED_FORMATS, TextToSpeech
+    from .transcript import Segment, save_segments
+    from .tts_prefetch import SpeechPrefetcher, create_prefetch_scheduler
 except ImportError:  # pragma: no cover
     from audio_utils import AudioSettings, build_recording_path, write_audio
+    from catalog import RECORDING, SPEECH, RecordingCatalog
+    from dsp import DspChain, Normalizer
+    from jobs import Job, JobExecutor
+    from peaks import PeakPyramid, peaks_path_for
     from recorder import AudioRecorder
+    from scheduler import INTERACTIVE
     from speech_to_text import SpeechToText
-    from text_to_speech import TextToSpeech
+    from stt_backends import create_backend
+    from text_to_speech import SUPPORTED_FORMATS, TextToSpeech
+    from transcript import Segment, save_segments
+    from tts_prefetch import SpeechPrefetcher, create_prefetch_scheduler
 
 
 class RecorderPanel(wx.Panel):
-    def __init__(self, parent: wx.Window) -> None:
+    def __init__(self, parent: wx.Window, catalog: RecordingCatalog, jobs: JobExecutor) -> None:
         super().__init__(parent)
+        self._catalog = catalog
+        self._jobs = jobs
 
         self._settings = AudioSettings()
-        self._recorder = AudioRecorder(self._settings)
+        # CAPTURE_PROCESS=1 captures in a separate process, isolated from the GUI and encoders
+        self._recorder = AudioRecorder(self._settings, isolated=os.environ.get("CAPTURE_PROCESS") == "1")
         self._recordings_dir = Path.cwd() / "recordings"
         self._last_recording: Path | None = None
+        self._last_frames: list | None = None
+        self._last_frames_path: Path | None = None
 
         self._status = wx.StaticText(self, label="Pronto para gravar.")
         self._countdown = wx.StaticText(self, label="")
 
+        # Live input level meter, fed from the recorder's peak index
+        self._level_meter = wx.Gauge(self, range=100, size=(250, 12))
+        self._level_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._on_level_timer, self._level_timer)
+
         # Format selector
         format_box = wx.StaticBox(self, label="Formato")
         format_sizer = wx.StaticBoxSizer(format_box, wx.HORIZONTAL)
@@ -38,6 +64,10 @@ class RecorderPanel(wx.Panel):
         format_sizer.Add(self._format_wav, 0, wx.ALL, 5)
         format_sizer.Add(self._format_mp3, 0, wx.ALL, 5)
 
+        # DC removal and high-pass on the fly, peak normalization over the finished take;
+        # both help transcription
+        self._condition_check = wx.CheckBox(self, label="Condicionar áudio (filtro + normalização)")
+
         self._start_btn = wx.Button(self, label="Iniciar")
         self._stop_btn = wx.Button(self, label="Parar")
         self._stop_btn.Disable()
@@ -48,26 +78,59 @@ class RecorderPanel(wx.Panel):
         sizer = wx.BoxSizer(wx.VERTICAL)
         sizer.Add(self._status, 0, wx.ALL | wx.CENTER, 10)
         sizer.Add(self._countdown, 0, wx.ALL | wx.CENTER, 5)
+        sizer.Add(self._level_meter, 0, wx.ALL | wx.CENTER, 5)
         sizer.Add(format_sizer, 0, wx.ALL | wx.CENTER, 5)
+        sizer.Add(self._condition_check, 0, wx.ALL | wx.CENTER, 5)
         sizer.Add(self._start_btn, 0, wx.ALL | wx.CENTER, 10)
         sizer.Add(self._stop_btn, 0, wx.ALL | wx.CENTER, 5)
         self.SetSizer(sizer)
 
     def get_last_recording(self) -> Path | None:
+        if self._last_recording is None:
+            # Survive restarts: fall back to the newest recording in the catalog (not synthesized speech)
+            latest = self._catalog.latest(kind=RECORDING)
+            return latest.path if latest else None
         return self._last_recording
 
+    def get_last_frames(self) -> list | None:
+        return self._last_frames
+
+    def get_last_frames_path(self) -> Path | None:
+        return self._last_frames_path
+
+    def get_settings(self) -> AudioSettings:
+        return self._settings
+
+    def close(self) -> None:
+        self._recorder.close()
+
     def on_start(self, event: wx.CommandEvent) -> None:  # noqa: ARG002
         self._start_btn.Disable()
         self._stop_btn.Disable()
         self._format_wav.Disable()
         self._format_mp3.Disable()
+        self._condition_check.Disable()
+        self._recorder.processor = (
+            DspChain.for_speech(self._settings.samplerate, normalize=None)
+            if self._condition_check.IsChecked()
+            else None
+        )
         self._status.SetLabel("Aguardando microfone...")
         self._countdown.SetLabel("3")
 
-        threading.Thread(target=self._run_countdown, daemon=True).start()
+        self._jobs.submit("countdown", self._run_countdown)
 
     def on_stop(self, event: wx.CommandEvent) -> None:  # noqa: ARG002
-        frames = self._recorder.stop()
+        try:
+            frames = self._recorder.stop()
+        except RuntimeError:
+            # The collector didn't finish in time, so the take is incomplete; drop it
+            frames = []
+        peaks = self._recorder.last_peaks
+        normalize = self._recorder.processor is not None
+        self._level_timer.Stop()
+        self._level_meter.SetValue(0)
+        self._jobs.supersede("countdown")
         if not frames:
             self._status.SetLabel("Nenhum audio capturado.")
             self._countdown.SetLabel("")
@@ -75,60 +138,126 @@ class RecorderPanel(wx.Panel):
             self._stop_btn.Disable()
             self._format_wav.Enable()
             self._format_mp3.Enable()
+            self._condition_check.Enable()
             return
 
+        # Keep frames in memory so transcription doesn't wait for the disk write
+        self._last_frames = frames
+
         # Get selected format
         audio_format = "mp3" if self._format_mp3.GetValue() else "wav"
         file_path = build_recording_path(self._recordings_dir, extension=audio_format)
-        
-        try:
-            write_audio(file_path, frames, self._settings, format=audio_format)
+        self._last_frames_path = file_path
+        self._status.SetLabel("Salvando...")
+        self._countdown.SetLabel("")
+        self._stop_btn.Disable()
+
+        def do_save(job: Job) -> Path:  # noqa: ARG001
+            nonlocal frames, peaks
+            try:
+                if normalize:
+                    frames = self._normalize_take(frames)
+                    peaks = PeakPyramid(self._settings.samplerate)
+                    for frame in frames:
+                        peaks.add(frame)
+                    peaks.finish()
+                    if self._last_frames_path == file_path:
+                        self._last_frames = frames
+                write_audio(file_path, frames, self._settings, format=audio_format)
+                if peaks is not None:
+                    peaks.save(peaks_path_for(file_path))
+                self._catalog.add_recording(
+                    file_path,
+                    duration=sum(len(frame) for frame in frames) / self._settings.samplerate,
+                    samplerate=self._settings.samplerate,
+                    channels=self._settings.channels,
+                )
+            except Exception:
+                if file_path.exists() and file_path.stat().st_size == 0:
+                    file_path.unlink()
+                raise
             self._last_recording = file_path
-            self._status.SetLabel(f"Gravado em: {file_path.name}")
-        except Exception as exc:  # noqa: BLE001
-            self._status.SetLabel(f"Erro ao salvar: {exc}")
-        finally:
-            self._countdown.SetLabel("")
-            self._start_btn.Enable()
-            self._stop_btn.Disable()
-            self._format_wav.Enable()
-            self._format_mp3.Enable()
+            return file_path
+
+        # Saves are never superseded: every take must reach the disk
+        self._jobs.submit(
+            "save",
+            do_save,
+            on_done=lambda path: self._on_save_finished(f"Gravado em: {path.name}"),
+            on_error=lambda exc: self._on_save_finished(f"Erro ao salvar: {exc}"),
+            supersede=False,
+        )
+
+    def _normalize_take(self, frames: list) -> list:
+        """Peak-normalize a whole take at once, so the gain never pumps while it plays."""
+        normalizer = Normalizer("peak", target_db=-1.0, samplerate=self._settings.samplerate)
+        return DspChain([normalizer]).process_frames(frames)
+
+    def _on_save_finished(self, message: str) -> None:
+        self._status.SetLabel(message)
+        self._start_btn.Enable()
+        self._format_wav.Enable()
+        self._format_mp3.Enable()
+        self._condition_check.Enable()
 
-    def _run_countdown(self) -> None:
+    def _run_countdown(self, job: Job) -> None:
+        ui = self._jobs.ui
         for value in (3, 2, 1):
-            wx.CallAfter(self._countdown.SetLabel, str(value))
+            if job.superseded:
+                return
+            ui.post(self._countdown.SetLabel, str(value), key="countdown")
             if value == 3:
-                wx.CallAfter(self._status.SetLabel, "Começando em breve...")
+                ui.post(self._status.SetLabel, "Começando em breve...", key="status")
             elif value == 2:
-                wx.CallAfter(self._start_recording)
+                ui.post(self._start_recording)
             
             wx.MilliSleep(1000)
         
-        wx.CallAfter(self._countdown.SetLabel, "")
+        if job.superseded:
+            return
+        ui.post(self._countdown.SetLabel, "", key="countdown")
+        ui.post(self._on_countdown_finished)
 
+    def _on_countdown_finished(self) -> None:
+        if not self._recorder.is_recording:
+            return
         self._status.SetLabel("Gravando...")
-        self._countdown.SetLabel("")
         self._stop_btn.Enable()
 
+    def _on_level_timer(self, event: wx.TimerEvent) -> None:  # noqa: ARG002
+        peak, _rms = self._recorder.get_level()
+        self._level_meter.SetValue(min(100, int(peak * 100)))
+
     def _start_recording(self) -> None:
         try:
             self._recorder.start()
+            self._level_timer.Start(50)
         except Exception as exc:  # noqa: BLE001
             self._status.SetLabel(f"Erro no microfone: {exc}")
             self._start_btn.Enable()
             return
 
 class SpeechToTextPanel(wx.Panel):
-    def __init__(self, parent: wx.Window, recorder_panel: RecorderPanel) -> None:
+    def __init__(
+        self,
+        parent: wx.Window,
+        recorder_panel: RecorderPanel,
+        catalog: RecordingCatalog,
+        jobs: JobExecutor,
+    ) -> None:
         super().__init__(parent)
         self._recorder_panel = recorder_panel
-        self._stt = SpeechToText()
+        self._jobs = jobs
+        # STT_BACKEND=local transcribes in-process (faster-whisper) instead of calling Speaches
+        backend = create_backend(os.environ.get("STT_BACKEND"), model=os.environ.get("STT_LOCAL_MODEL"))
+        self._stt = SpeechToText(priority=INTERACTIVE, catalog=catalog, backend=backend)
+        if self._stt.is_local:
+            self._jobs.submit("stt-warmup", lambda job: self._stt.warm_up())
 
         self._status = wx.StaticText(self, label="Selecione um arquivo ou use a última gravação.")
         
         # Model info
-        model_name = self._stt._model if hasattr(self._stt, "_model") else "Desconhecido"
-        self._model_label = wx.StaticText(self, label=f"Modelo: {model_name}")
+        self._model_label = wx.StaticText(self, label=f"Modelo: {self._stt.model}")
         font = self._model_label.GetFont()
         font.PointSize -= 1
         self._model_label.SetFont(font)
@@ -143,6 +272,9 @@ class SpeechToTextPanel(wx.Panel):
         
         self._transcribe_file_btn = wx.Button(self, label="Transcrever Arquivo")
         self._transcribe_last_btn = wx.Button(self, label="Transcrever Última Gravação")
+        self._save_subtitles_btn = wx.Button(self, label="Salvar Legendas...")
+        self._save_subtitles_btn.Disable()
+        self._segments: list[Segment] = []
         
         self._result_label = wx.StaticText(self, label="Transcrição:")
         self._result_text = wx.TextCtrl(
@@ -153,6 +285,7 @@ class SpeechToTextPanel(wx.Panel):
         
         self._transcribe_file_btn.Bind(wx.EVT_BUTTON, self.on_transcribe_file)
         self._transcribe_last_btn.Bind(wx.EVT_BUTTON, self.on_transcribe_last)
+        self._save_subtitles_btn.Bind(wx.EVT_BUTTON, self.on_save_subtitles)
         
         sizer = wx.BoxSizer(wx.VERTICAL)
         sizer.Add(self._status, 0, wx.ALL | wx.CENTER, 10)
@@ -160,6 +293,7 @@ class SpeechToTextPanel(wx.Panel):
         sizer.Add(self._file_picker, 0, wx.ALL | wx.EXPAND, 10)
         sizer.Add(self._transcribe_file_btn, 0, wx.ALL | wx.CENTER, 5)
         sizer.Add(self._transcribe_last_btn, 0, wx.ALL | wx.CENTER, 5)
+        sizer.Add(self._save_subtitles_btn, 0, wx.ALL | wx.CENTER, 5)
         sizer.Add(self._result_label, 0, wx.ALL | wx.LEFT, 10)
         sizer.Add(self._result_text, 1, wx.ALL | wx.EXPAND, 10)
         self.SetSizer(sizer)
@@ -173,6 +307,11 @@ class SpeechToTextPanel(wx.Panel):
         self._transcribe(Path(file_path))
 
     def on_transcribe_last(self, event: wx.CommandEvent) -> None:  # noqa: ARG002
+        last_frames = self._recorder_panel.get_last_frames()
+        if last_frames:
+            self._transcribe_frames(last_frames)
+            return
+
         last_recording = self._recorder_panel.get_last_recording()
         if not last_recording or not last_recording.exists():
             self._status.SetLabel("Nenhuma gravação encontrada.")
@@ -183,22 +322,93 @@ class SpeechToTextPanel(wx.Panel):
     def _transcribe(self, audio_file: Path) -> None:
         self._status.SetLabel("Transcrevendo...")
         self._result_text.SetValue("")
-        
-        def do_transcribe():
-            try:
-                text = self._stt.transcribe_file(audio_file)
-                wx.CallAfter(self._result_text.SetValue, text)
-                wx.CallAfter(self._status.SetLabel, "Transcrição concluída.")
-            except Exception as exc:  # noqa: BLE001
-                wx.CallAfter(self._status.SetLabel, f"Erro: {exc}")
-        
-        threading.Thread(target=do_transcribe, daemon=True).start()
+        self._segments = []
+        self._save_subtitles_btn.Disable()
+
+        # One request whose segments are streamed back, so long files are readable before they finish
+        self._jobs.submit(
+            "transcribe",
+            lambda job: self._stream_transcription(job, audio_file),
+            on_done=self._on_segments_done,
+            on_error=lambda exc: self._status.SetLabel(f"Erro: {exc}"),
+        )
+
+    def _stream_transcription(self, job: Job, audio_file: Path) -> list[Segment]:
+        ui = self._jobs.ui
+        segments: list[Segment] = []
+        stream = self._stt.iter_segments(audio_file)
+        try:
+            for segment in stream:
+                if job.superseded:
+                    break
+                segments.append(segment)
+                text = " ".join(s.text for s in segments if s.text)
+                ui.post(self._result_text.SetValue, text, key="transcript")
+                minutes, seconds = divmod(int(segment.end), 60)
+                ui.post(self._status.SetLabel, f"Transcrevendo... {minutes:02d}:{seconds:02d}", key="transcript-status")
+        finally:
+            stream.close()
+        return segments
+
+    def _on_segments_done(self, segments: list[Segment]) -> None:
+        self._segments = segments
+        self._result_text.SetValue(" ".join(s.text for s in segments if s.text))
+        self._status.SetLabel("Transcrição concluída.")
+        if segments:
+            self._save_subtitles_btn.Enable()
+
+    def on_save_subtitles(self, event: wx.CommandEvent) -> None:  # noqa: ARG002
+        with wx.FileDialog(
+            self,
+            message="Salvar legendas",
+            wildcard="SubRip (*.srt)|*.srt|WebVTT (*.vtt)|*.vtt|JSON Lines (*.jsonl)|*.jsonl",
+            style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT,
+        ) as dialog:
+            if dialog.ShowModal() != wx.ID_OK:
+                return
+            path = Path(dialog.GetPath())
+            if not path.suffix:
+                path = path.with_suffix((".srt", ".vtt", ".jsonl")[dialog.GetFilterIndex()])
+        try:
+            save_segments(self._segments, path)
+        except Exception as exc:
+            self._status.SetLabel(f"Erro ao salvar legendas: {exc}")
+            return
+        self._status.SetLabel(f"Legendas salvas: {path.name}")
+
+    def _transcribe_frames(self, frames: list) -> None:
+        settings = self._recorder_panel.get_settings()
+        source_path = self._recorder_panel.get_last_frames_path()
+        self._run_transcription(
+            lambda: self._stt.transcribe_frames(frames, settings, source_path=source_path)
+        )
+
+    def _run_transcription(self, transcribe) -> None:
+        self._status.SetLabel("Transcrevendo...")
+        self._result_text.SetValue("")
+        self._segments = []
+        self._save_subtitles_btn.Disable()
+        
+        # A new transcription supersedes the previous one: its request still completes, but the late result is dropped
+        self._jobs.submit(
+            "transcribe",
+            lambda job: transcribe(),
+            on_done=self._on_transcribed,
+            on_error=lambda exc: self._status.SetLabel(f"Erro: {exc}"),
+        )
+
+    def _on_transcribed(self, text: str) -> None:
+        self._result_text.SetValue(text)
+        self._status.SetLabel("Transcrição concluída.")
 
 
 class TextToSpeechPanel(wx.Panel):
-    def __init__(self, parent: wx.Window) -> None:
+    def __init__(self, parent: wx.Window, catalog: RecordingCatalog, jobs: JobExecutor) -> None:
         super().__init__(parent)
-        self._tts = TextToSpeech()
+        self._catalog = catalog
+        self._jobs = jobs
+        self._tts = TextToSpeech(priority=INTERACTIVE, scheduler=create_prefetch_scheduler())
+        self._prefetcher = SpeechPrefetcher(self._tts, jobs)
         self._recordings_dir = Path.cwd() / "recordings"
 
         self._status = wx.StaticText(self, label="Digite o texto para converter em fala.")
@@ -222,6 +432,13 @@ class TextToSpeechPanel(wx.Panel):
         
         voice_sizer.Add(self._voice_choice, 1, wx.ALL | wx.EXPAND, 5)
         self._voice_choice.Bind(wx.EVT_CHOICE, self.on_voice_changed)
+
+        # Output format selector for "Salvar em Arquivo"
+        format_box = wx.StaticBox(self, label="Formato do Arquivo")
+        format_sizer = wx.StaticBoxSizer(format_box, wx.HORIZONTAL)
+        self._format_choice = wx.Choice(self, choices=[fmt.upper() for fmt in SUPPORTED_FORMATS])
+        self._format_choice.SetSelection(SUPPORTED_FORMATS.index(self._tts.get_response_format()))
+        format_sizer.Add(self._format_choice, 1, wx.ALL | wx.EXPAND, 5)
         
         self._input_label = wx.StaticText(self, label="Texto:")
         self._input_text = wx.TextCtrl(
@@ -229,6 +446,11 @@ class TextToSpeechPanel(wx.Panel):
             style=wx.TE_MULTILINE | wx.TE_WORDWRAP,
             size=(400, 120),
         )
+        self._input_text.Bind(wx.EVT_TEXT, self.on_text_changed)
+
+        # Opt-in: synthesize finished sentences in the background while typing
+        self._prefetch_check = wx.CheckBox(self, label="Pré-sintetizar enquanto digita")
+        self._prefetch_check.Bind(wx.EVT_CHECKBOX, self.on_prefetch_toggled)
         
         self._speak_btn = wx.Button(self, label="Falar Agora")
         self._save_btn = wx.Button(self, label="Salvar em Arquivo")
@@ -240,8 +462,10 @@ class TextToSpeechPanel(wx.Panel):
         sizer.Add(self._status, 0, wx.ALL | wx.CENTER, 10)
         sizer.Add(self._model_label, 0, wx.ALL | wx.CENTER, 5)
         sizer.Add(voice_sizer, 0, wx.ALL | wx.EXPAND, 10)
+        sizer.Add(format_sizer, 0, wx.ALL | wx.EXPAND, 10)
         sizer.Add(self._input_label, 0, wx.ALL | wx.LEFT, 10)
         sizer.Add(self._input_text, 1, wx.ALL | wx.EXPAND, 10)
+        sizer.Add(self._prefetch_check, 0, wx.LEFT | wx.RIGHT, 10)
         
         btn_sizer = wx.BoxSizer(wx.HORIZONTAL)
         btn_sizer.Add(self._speak_btn, 0, wx.ALL, 5)
@@ -255,6 +479,22 @@ class TextToSpeechPanel(wx.Panel):
         if selected != wx.NOT_FOUND:
             self._tts.set_voice(selected)
             self._status.SetLabel(f"Voz alterada: {self._voice_choice.GetStringSelection()}")
+            if self._prefetch_check.IsChecked():
+                self._prefetcher.voice_changed()
+
+    def on_text_changed(self, event: wx.CommandEvent) -> None:
+        event.Skip()
+        if self._prefetch_check.IsChecked():
+            self._prefetcher.text_changed(self._input_text.GetValue())
+
+    def on_prefetch_toggled(self, event: wx.CommandEvent) -> None:  # noqa: ARG002
+        if self._prefetch_check.IsChecked():
+            self._prefetcher.text_changed(self._input_text.GetValue())
+        else:
+            self._prefetcher.cancel()
+
+    def close(self) -> None:
+        self._prefetcher.close()
 
     def on_speak(self, event: wx.CommandEvent) -> None:  # noqa: ARG002
         text = self._input_text.GetValue().strip()
@@ -263,15 +503,15 @@ class TextToSpeechPanel(wx.Panel):
             return
         
         self._status.SetLabel("Falando...")
-        
-        def do_speak():
-            try:
-                self._tts.speak(text)
-                wx.CallAfter(self._status.SetLabel, "Finalizado.")
-            except Exception as exc:  # noqa: BLE001
-                wx.CallAfter(self._status.SetLabel, f"Erro: {exc}")
-        
-        threading.Thread(target=do_speak, daemon=True).start()
+        # Pre-rendered sentences are only used in speculative mode
+        speak = self._prefetcher.speak if self._prefetch_check.IsChecked() else self._tts.speak
+        
+        self._jobs.submit(
+            "speak",
+            lambda job: speak(text),
+            on_done=lambda _: self._status.SetLabel("Finalizado."),
+            on_error=lambda exc: self._status.SetLabel(f"Erro: {exc}"),
+        )
 
     def on_save(self, event: wx.CommandEvent) -> None:  # noqa: ARG002
         text = self._input_text.GetValue().strip()
@@ -279,17 +519,29 @@ class TextToSpeechPanel(wx.Panel):
             self._status.SetLabel("Digite algum texto primeiro.")
             return
         
-        file_path = build_recording_path(self._recordings_dir, extension="mp3")
+        audio_format = SUPPORTED_FORMATS[self._format_choice.GetSelection()]
+        file_path = build_recording_path(self._recordings_dir, extension=audio_format)
         self._status.SetLabel("Salvando...")
         
-        def do_save():
+        def do_save(job: Job) -> None:  # noqa: ARG001
             try:
-                self._tts.save_to_file(text, file_path)
-                wx.CallAfter(self._status.SetLabel, f"Salvo: {file_path.name}")
-            except Exception as exc:  # noqa: BLE001
-                wx.CallAfter(self._status.SetLabel, f"Erro: {exc}")
-        
-        threading.Thread(target=do_save, daemon=True).start()
+                self._tts.save_to_file(text, file_path, response_format=audio_format)
+            except Exception:
+                # Drop the empty file build_recording_path reserved
+                if file_path.exists() and file_path.stat().st_size == 0:
+                    file_path.unlink()
+                raise
+            # The synthesized text doubles as the transcript of the saved file
+            self._catalog.add_recording(file_path, kind=SPEECH)
+            self._catalog.set_transcript(file_path, text)
+
+        self._jobs.submit(
+            "tts-save",
+            do_save,
+            on_done=lambda _: self._status.SetLabel(f"Salvo: {file_path.name}"),
+            on_error=lambda exc: self._status.SetLabel(f"Erro: {exc}"),
+            supersede=False,
+        )
 
 
 class RecorderFrame(wx.Frame):
@@ -297,10 +549,21 @@ class RecorderFrame(wx.Frame):
         super().__init__(parent=None, title="Gravador de Áudio", size=(500, 400))
         
         notebook = wx.Notebook(self)
+
+        # Shared, bounded pool for every background job started from the panels
+        self._jobs = JobExecutor(max_workers=4, call_after=wx.CallAfter)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+
+        recordings_dir = Path.cwd() / "recordings"
+        catalog = RecordingCatalog(recordings_dir / "catalog.sqlite3")
+        # Pick up recordings made before the catalog existed (or by other tools)
+        self._jobs.submit("catalog-sync", lambda job: catalog.sync_directory(recordings_dir))
         
-        recorder_panel = RecorderPanel(notebook)
-        stt_panel = SpeechToTextPanel(notebook, recorder_panel)
-        tts_panel = TextToSpeechPanel(notebook)
+        recorder_panel = RecorderPanel(notebook, catalog, self._jobs)
+        stt_panel = SpeechToTextPanel(notebook, recorder_panel, catalog, self._jobs)
+        tts_panel = TextToSpeechPanel(notebook, catalog, self._jobs)
+        self._tts_panel = tts_panel
+        self._recorder_panel = recorder_panel
         
         notebook.AddPage(recorder_panel, "Gravação")
         notebook.AddPage(stt_panel, "Fala → Texto")
@@ -310,6 +573,12 @@ class RecorderFrame(wx.Frame):
         sizer.Add(notebook, 1, wx.EXPAND)
         self.SetSizer(sizer)
 
+    def on_close(self, event: wx.CloseEvent) -> None:
+        self._jobs.shutdown()
+        self._tts_panel.close()
+        self._recorder_panel.close()
+        event.Skip()
+
 
 class RecorderApp(wx.App):
     def OnInit(self) -> bool:
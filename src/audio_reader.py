@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import soundfile as sf
+
+# WAV subtypes whose samples can be mapped straight from disk
+_MEMMAP_DTYPES = {
+    "PCM_16": np.dtype("<i2"),
+    "PCM_32": np.dtype("<i4"),
+    "FLOAT": np.dtype("<f4"),
+    "DOUBLE": np.dtype("<f8"),
+}
+# Closest type soundfile can decode each subtype to without losing precision
+_NATIVE_DTYPES = {
+    "PCM_S8": "int16",
+    "PCM_U8": "int16",
+    "PCM_16": "int16",
+    "ALAC_16": "int16",
+    "PCM_24": "int32",
+    "PCM_32": "int32",
+    "ALAC_20": "int32",
+    "ALAC_24": "int32",
+    "ALAC_32": "int32",
+    "DOUBLE": "float64",
+}
+
+
+class AudioReader:
+    """Random-access, block-wise reader for audio files of any size.
+
+    PCM/float WAV files are memory-mapped, so reads are views into the page
+    cache rather than copies; every other format soundfile understands is read
+    through seek + block reads. Either way only the requested range is loaded.
+    """
+
+    def __init__(self, file_path: Path, use_memmap: bool = True) -> None:
+        self._path = Path(file_path)
+        info = sf.info(str(self._path))
+        self.samplerate: int = info.samplerate
+        self.channels: int = info.channels
+        self.frames: int = info.frames
+        self.format: str = info.format
+        self.subtype: str = info.subtype
+
+        self._memmap: np.memmap | None = None
+        self._file: sf.SoundFile | None = None
+        if use_memmap:
+            self._memmap = _open_wav_memmap(self._path, info)
+        if self._memmap is None:
+            self._file = sf.SoundFile(str(self._path))
+        # dtype of read(dtype=None), the same whether or not the file is memory-mapped
+        self.native_dtype: np.dtype = (
+            self._memmap.dtype if self._memmap is not None else np.dtype(_NATIVE_DTYPES.get(self.subtype, "float32"))
+        )
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.samplerate if self.samplerate else 0.0
+
+    @property
+    def is_memory_mapped(self) -> bool:
+        return self._memmap is not None
+
+    def read(self, start: int = 0, stop: int | None = None, dtype: str | None = None) -> np.ndarray:
+        """Read frames [start, stop) as a (frames, channels) array.
+
+        ``dtype=None`` keeps the file's sample type (``native_dtype``: int16
+        for 16-bit PCM, int32 for 24/32-bit, float32 for float and lossy
+        formats); a memory-mapped file then returns a read-only view. Any other
+        ``dtype`` is converted with soundfile's scaling.
+        """
+        start, stop = self._clamp(start, stop)
+        if self._memmap is not None:
+            block = self._memmap[start:stop]
+            return block if dtype is None else _convert(block, np.dtype(dtype))
+
+        assert self._file is not None
+        self._file.seek(start)
+        return self._file.read(stop - start, dtype=str(np.dtype(dtype or self.native_dtype)), always_2d=True)
+
+    def read_seconds(self, start: float, stop: float | None = None, dtype: str | None = None) -> np.ndarray:
+        """Read the time range [start, stop) given in seconds."""
+        stop_frame = None if stop is None else int(round(stop * self.samplerate))
+        return self.read(int(round(start * self.samplerate)), stop_frame, dtype=dtype)
+
+    def blocks(
+        self,
+        blocksize: int,
+        overlap: int = 0,
+        start: int = 0,
+        stop: int | None = None,
+        dtype: str | None = None,
+    ) -> Iterator[np.ndarray]:
+        """Iterate over fixed-size (possibly overlapping) windows of the file.
+
+        Only one block is resident at a time; the last block may be shorter.
+        """
+        if blocksize <= 0:
+            raise ValueError("blocksize must be positive.")
+        if not 0 <= overlap < blocksize:
+            raise ValueError("overlap must be in [0, blocksize).")
+
+        start, stop = self._clamp(start, stop)
+        step = blocksize - overlap
+        position = start
+        while position < stop:
+            yield self.read(position, min(position + blocksize, stop), dtype=dtype)
+            if position + blocksize >= stop:
+                break
+            position += step
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._memmap is not None:
+            # Dropping the reference unmaps the file once no views remain
+            self._memmap = None
+
+    def __enter__(self) -> AudioReader:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _clamp(self, start: int, stop: int | None) -> tuple[int, int]:
+        stop = self.frames if stop is None else min(stop, self.frames)
+        start = max(0, min(start, stop))
+        return start, stop
+
+
+def _open_wav_memmap(file_path: Path, info) -> np.memmap | None:
+    if info.format != "WAV" or info.subtype not in _MEMMAP_DTYPES or info.frames == 0:
+        return None
+
+    offset = _find_wav_data_offset(file_path)
+    if offset is None:
+        return None
+
+    return np.memmap(
+        file_path,
+        dtype=_MEMMAP_DTYPES[info.subtype],
+        mode="r",
+        offset=offset,
+        shape=(info.frames, info.channels),
+    )
+
+
+def _find_wav_data_offset(file_path: Path) -> int | None:
+    """Byte offset of the sample data in a RIFF/WAVE file."""
+    with open(file_path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+            if chunk_id == b"data":
+                return f.tell()
+            # Chunks are word aligned
+            f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def _convert(block: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    if block.dtype == dtype:
+        return block
+
+    if block.dtype.kind == "f":
+        samples = block.astype(np.float64)
+    else:
+        samples = block.astype(np.float64) / float(2 ** (8 * block.dtype.itemsize - 1))
+
+    if dtype.kind == "f":
+        return samples.astype(dtype)
+
+    scale = float(2 ** (8 * dtype.itemsize - 1))
+    info = np.iinfo(dtype)
+    return np.clip(np.round(samples * scale), info.min, info.max).astype(dtype)
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
 import numpy as np
 import soundfile as sf
-from pydub import AudioSegment
 
 
 @dataclass(frozen=True)
@@ -14,13 +14,25 @@ class AudioSettings:
     samplerate: int = 44100
     channels: int = 1
     dtype: str = "int16"
+    blocksize: int = 0  # frames per callback; 0 lets PortAudio pick (variable size)
+    latency: str | float = "high"  # "low", "high" or a target in seconds
+    device: int | str | None = None  # input device index or name; None = system default
 
 
 def build_recording_path(base_dir: Path, extension: str = "wav") -> Path:
+    """Reserve a new timestamped file name; saves within the same second get a numeric suffix."""
     base_dir.mkdir(parents=True, exist_ok=True)
     stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{stamp}.{extension}"
-    return base_dir / filename
+    counter = 0
+    while True:
+        suffix = f"_{counter}" if counter else ""
+        file_path = base_dir / f"{stamp}{suffix}.{extension}"
+        try:
+            # Create the file atomically so concurrent saves can't pick the same name
+            file_path.open("x").close()
+            return file_path
+        except FileExistsError:
+            counter += 1
 
 
 def write_audio(file_path: Path, frames: list[np.ndarray], settings: AudioSettings, format: str = "wav") -> None:
@@ -40,7 +52,9 @@ def write_audio(file_path: Path, frames: list[np.ndarray], settings: AudioSettin
             samplerate=settings.samplerate,
             subtype="PCM_16",
         )
-        # Convert to MP3
+        # Convert to MP3; pydub is only needed (and imported) for this path
+        from pydub import AudioSegment
+
         audio_segment = AudioSegment.from_wav(str(temp_wav))
         audio_segment.export(str(file_path), format="mp3", bitrate="192k")
         temp_wav.unlink()  # Remove temporary file
@@ -56,3 +70,23 @@ def write_audio(file_path: Path, frames: list[np.ndarray], settings: AudioSettin
 def write_wav(file_path: Path, frames: list[np.ndarray], settings: AudioSettings) -> None:
     """Backward compatibility wrapper for write_audio with WAV format."""
     write_audio(file_path, frames, settings, format="wav")
+
+
+def encode_wav_buffer(frames: list[np.ndarray], settings: AudioSettings) -> io.BytesIO:
+    """Encode captured frames as an in-memory WAV, block by block, without concatenating them."""
+    if not frames:
+        raise ValueError("No audio data to write.")
+
+    buffer = io.BytesIO()
+    with sf.SoundFile(
+        buffer,
+        mode="w",
+        samplerate=settings.samplerate,
+        channels=frames[0].shape[1] if frames[0].ndim > 1 else 1,
+        format="WAV",
+        subtype="PCM_16",
+    ) as wav:
+        for frame in frames:
+            wav.write(frame)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import statistics
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Sequence, TypeVar
+
+import requests
+
+T = TypeVar("T")
+
+# Units the size of a request's work is measured in; latency is tracked per unit
+REQUEST = "request"
+AUDIO_SECONDS = "audio_seconds"
+CHARACTERS = "characters"
+
+# Seconds between background health checks of pools the clients build from URL lists
+HEALTH_INTERVAL = 30.0
+
+
+@dataclass
+class Backend:
+    url: str
+    outstanding: int = 0
+    latency: dict[str, float] = field(default_factory=dict)  # EWMA of seconds per unit of work, by unit
+    failures: int = 0
+    ejected_until: float = 0.0
+    probing: bool = False  # a readmission probe is in flight
+
+    @property
+    def is_ejected(self) -> bool:
+        return self.ejected_until > 0.0
+
+
+class BackendPool:
+    """Client-side load balancer over one or more Speaches servers.
+
+    Requests go to the healthy backend with the fewest outstanding requests.
+    Backends that keep failing, or that get much slower than their peers, are
+    ejected for a while and only readmitted after a successful ``/health`` probe.
+    Speed is compared per unit of work (seconds per audio second, per
+    character), so a backend that happens to get a long file isn't "slow".
+
+    With ``health_interval`` and more than one backend, a background thread
+    also runs ``check_health`` every that many seconds, so dead backends are
+    found before a request is sent to them.
+    """
+
+    def __init__(
+        self,
+        urls: str | Sequence[str],
+        slow_factor: float = 3.0,
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+        health_timeout: float = 2.0,
+        latency_alpha: float = 0.3,
+        health_interval: float | None = None,
+    ) -> None:
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls:
+            raise ValueError("At least one backend URL is required.")
+
+        self._backends = [Backend(url=url.rstrip("/")) for url in urls]
+        self._slow_factor = slow_factor
+        self._max_failures = max_failures
+        self._eject_seconds = eject_seconds
+        self._health_timeout = health_timeout
+        self._latency_alpha = latency_alpha
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        if health_interval is not None and len(self._backends) > 1:
+            threading.Thread(
+                target=_health_loop,
+                args=(weakref.ref(self), self._closed, health_interval),
+                name="backend-health",
+                daemon=True,
+            ).start()
+
+    @property
+    def urls(self) -> list[str]:
+        return [backend.url for backend in self._backends]
+
+    @property
+    def primary_url(self) -> str:
+        return self._backends[0].url
+
+    def get_backends(self) -> list[Backend]:
+        """Get the backends with their current routing statistics."""
+        return list(self._backends)
+
+    def check_health(self) -> None:
+        """Probe every backend's /health endpoint, ejecting the ones that fail."""
+        for backend in self._backends:
+            healthy = self._probe(backend)
+            with self._lock:
+                if healthy:
+                    backend.failures = 0
+                    backend.ejected_until = 0.0
+                else:
+                    self._eject(backend)
+
+    def close(self) -> None:
+        """Stop the background health checks."""
+        self._closed.set()
+
+    def acquire(self, unit: str = REQUEST, exclude: set[str] | None = None) -> Backend:
+        """Pick the least loaded available backend and count a request against it."""
+        self._readmit_expired()
+        with self._lock:
+            candidates = [b for b in self._backends if not exclude or b.url not in exclude] or self._backends
+            available = [b for b in candidates if not b.is_ejected]
+            if not available:
+                # Nothing is healthy; use the backend that is due back first
+                available = [min(candidates, key=lambda b: b.ejected_until)]
+            backend = min(available, key=lambda b: (b.outstanding, b.latency.get(unit, 0.0)))
+            backend.outstanding += 1
+            return backend
+
+    def release(
+        self,
+        backend: Backend,
+        elapsed: float | None = None,
+        failed: bool = False,
+        cost: float | None = None,
+        unit: str = REQUEST,
+    ) -> None:
+        """Record the outcome of a request started with acquire().
+
+        ``cost`` is the size of the request's work in ``unit`` (e.g. 12.5 audio
+        seconds); without it the request counts as one ``REQUEST``.
+        """
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+            if failed:
+                backend.failures += 1
+                if backend.failures >= self._max_failures:
+                    self._eject(backend)
+                return
+
+            backend.failures = 0
+            if elapsed is not None:
+                if not cost or cost <= 0:
+                    cost, unit = 1.0, REQUEST
+                sample = elapsed / cost
+                previous = backend.latency.get(unit)
+                if previous is None:
+                    backend.latency[unit] = sample
+                else:
+                    alpha = self._latency_alpha
+                    backend.latency[unit] = alpha * sample + (1 - alpha) * previous
+                if self._is_slow(backend, unit):
+                    self._eject(backend)
+
+    @contextmanager
+    def request(self, cost: float | None = None, unit: str = REQUEST) -> Iterator[str]:
+        """Context manager yielding the base URL to use for one request."""
+        backend = self.acquire(unit)
+        started = time.monotonic()
+        try:
+            yield backend.url
+        except Exception as exc:
+            self.release(backend, failed=_is_backend_failure(exc))
+            raise
+        else:
+            self.release(backend, elapsed=time.monotonic() - started, cost=cost, unit=unit)
+
+    def call(self, send: Callable[[str], T], cost: float | None = None, unit: str = REQUEST) -> T:
+        """Run ``send(base_url)``, moving on to another backend when one can't be reached.
+
+        Only connection errors are retried (the request never got to the
+        server, or the connection died with it); every backend is tried at
+        most once. ``send`` must be safe to call again, e.g. rewind uploads.
+        """
+        tried: set[str] = set()
+        while True:
+            backend = self.acquire(unit, exclude=tried)
+            tried.add(backend.url)
+            started = time.monotonic()
+            try:
+                result = send(backend.url)
+            except Exception as exc:
+                self.release(backend, failed=_is_backend_failure(exc))
+                if isinstance(exc, requests.exceptions.ConnectionError) and len(tried) < len(self._backends):
+                    continue
+                raise
+            self.release(backend, elapsed=time.monotonic() - started, cost=cost, unit=unit)
+            return result
+
+    def _probe(self, backend: Backend) -> bool:
+        try:
+            response = requests.get(f"{backend.url}/health", timeout=self._health_timeout)
+            response.raise_for_status()
+            return True
+        except Exception:
+            return False
+
+    def _readmit_expired(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            # One caller probes each backend; the others keep routing around it meanwhile
+            expired = [b for b in self._backends if b.is_ejected and b.ejected_until <= now and not b.probing]
+            for backend in expired:
+                backend.probing = True
+
+        for backend in expired:
+            healthy = False
+            try:
+                healthy = self._probe(backend)
+            finally:
+                with self._lock:
+                    backend.probing = False
+                    if healthy:
+                        backend.ejected_until = 0.0
+                        backend.failures = 0
+                    else:
+                        backend.ejected_until = time.monotonic() + self._eject_seconds
+
+    def _is_slow(self, backend: Backend, unit: str) -> bool:
+        peers = [
+            b.latency[unit]
+            for b in self._backends
+            if b is not backend and unit in b.latency and not b.is_ejected
+        ]
+        if not peers or unit not in backend.latency:
+            return False
+        return backend.latency[unit] > self._slow_factor * statistics.median(peers)
+
+    def _eject(self, backend: Backend) -> None:
+        # Never eject the last available backend; there is nothing to fail over to
+        others = [b for b in self._backends if b is not backend and not b.is_ejected]
+        if not others and not backend.is_ejected:
+            return
+        backend.ejected_until = time.monotonic() + self._eject_seconds
+        backend.latency = {}
+
+
+def _is_backend_failure(exc: Exception) -> bool:
+    """Whether an exception says something about the backend rather than the request."""
+    if isinstance(exc, requests.exceptions.HTTPError):
+        response = exc.response
+        return response is None or response.status_code >= 500
+    return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _health_loop(pool_ref: weakref.ref, closed: threading.Event, interval: float) -> None:
+    # Holds the pool weakly, so a pool nobody uses any more is collected and the thread ends
+    while not closed.wait(interval):
+        pool = pool_ref()
+        if pool is None:
+            return
+        pool.check_health()
+        del pool
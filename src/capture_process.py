@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import soundfile as sf
+
+try:
+    from .audio_utils import AudioSettings
+    from .shm_ring import RingSpec, SharedRingBuffer
+except ImportError:  # pragma: no cover
+    from audio_utils import AudioSettings
+    from shm_ring import RingSpec, SharedRingBuffer
+
+RING_SECONDS = 30.0
+START_TIMEOUT = 10.0
+
+
+class CaptureProcess:
+    """Audio capture in a dedicated process, publishing into a shared-memory ring.
+
+    The capture process does nothing but copy each PortAudio block into the
+    ring, so encoding, uploads, JSON parsing or the GUI can't stall it on the
+    GIL. Consumers, in this process (``ring.reader()``) or in worker
+    processes (``start_worker``), read the blocks without copying.
+
+    The process is spawned by the first ``start`` and then kept: ``stop``
+    only closes the input stream and ends the ring's current stream, so the
+    next recording starts without paying for a new interpreter. ``release``
+    shuts it down.
+    """
+
+    def __init__(self, settings: AudioSettings, ring_seconds: float = RING_SECONDS, context: Any = None) -> None:
+        self._settings = settings
+        # "spawn" behaves the same on every platform (and is the only option on Windows)
+        self._context = context or mp.get_context("spawn")
+        self._ring = SharedRingBuffer.create(
+            capacity=int(ring_seconds * settings.samplerate),
+            channels=settings.channels,
+            dtype=settings.dtype,
+            samplerate=settings.samplerate,
+        )
+        self._ring.close()  # nothing is streaming until start()
+        self._commands: Any = None
+        self._replies: Any = None
+        self._process: Any = None
+        self._streaming = False
+        self._workers: list[Any] = []
+
+    @property
+    def ring(self) -> SharedRingBuffer:
+        return self._ring
+
+    @property
+    def spec(self) -> RingSpec:
+        return self._ring.spec
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the input stream is open, i.e. a recording is in progress."""
+        return self._streaming and self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        """Open the input stream, spawning the capture process if it isn't up yet."""
+        if self._streaming:
+            return
+        if self._process is None or not self._process.is_alive():
+            self._spawn()
+        self._streaming = True
+        try:
+            self._request("start", START_TIMEOUT)
+        except RuntimeError:
+            self._streaming = False
+            self._ring.close()
+            raise
+
+    def start_worker(self, target: Callable[..., Any], *args: Any) -> Any:
+        """Run ``target(spec, *args)`` in a new process; it must be importable (module-level)."""
+        worker = self._context.Process(target=target, args=(self._ring.spec, *args), daemon=True)
+        worker.start()
+        self._workers.append(worker)
+        return worker
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close the input stream and the ring's stream, and wait for workers to drain it."""
+        if self._streaming:
+            self._streaming = False
+            try:
+                self._request("stop", timeout)
+            except RuntimeError:
+                self._shutdown(timeout)
+        # The capture process closes the ring after the stream; make sure it's closed if it crashed
+        self._ring.close()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def release(self, timeout: float = 5.0) -> None:
+        """Stop the capture process and free the ring."""
+        self.stop(timeout)
+        self._shutdown(timeout)
+        self._ring.release()
+
+    def _spawn(self) -> None:
+        self._commands = self._context.Queue()
+        self._replies = self._context.Queue()
+        self._process = self._context.Process(
+            target=_capture_main,
+            args=(self._ring.spec, self._settings, self._commands, self._replies),
+            name="audio-capture",
+            daemon=True,
+        )
+        self._process.start()
+
+    def _request(self, command: str, timeout: float) -> None:
+        self._commands.put(command)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                error = self._replies.get(timeout=0.05)
+                break
+            except queue.Empty:
+                if self._process.is_alive() and time.monotonic() < deadline:
+                    continue
+            # Dead or stuck; a reply sent just before exiting may still be in the pipe
+            try:
+                error = self._replies.get(timeout=0.5)
+            except queue.Empty:
+                alive = self._process.is_alive()
+                error = f"capture process did not {command} in time" if alive else "capture process exited"
+            break
+        if error is not None:
+            if not self._process.is_alive() or time.monotonic() >= deadline:
+                self._shutdown(0)
+            raise RuntimeError(f"Audio capture failed: {error}")
+
+    def _shutdown(self, timeout: float) -> None:
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._commands.put(None)
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+        self._process = None
+
+
+def _capture_main(spec: RingSpec, settings: AudioSettings, commands, replies) -> None:
+    """Capture process: open and close the input stream on command until told to exit (None).
+
+    Every command is answered with None, or the error message if it failed.
+    """
+    ring = SharedRingBuffer.attach(spec)
+    stream = None
+    try:
+        import sounddevice as sd
+
+        def callback(indata, frames, time, status) -> None:  # noqa: ARG001
+            if status and status.input_overflow:
+                ring.count_overflow()
+            ring.write(indata)
+
+        while (command := commands.get()) is not None:
+            try:
+                if command == "start" and stream is None:
+                    ring.reopen()
+                    stream = sd.InputStream(
+                        samplerate=settings.samplerate,
+                        channels=settings.channels,
+                        dtype=settings.dtype,
+                        blocksize=settings.blocksize,
+                        latency=settings.latency,
+                        device=settings.device,
+                        callback=callback,
+                    )
+                    stream.start()
+                elif command == "stop" and stream is not None:
+                    stream.stop()
+                    stream.close()
+                    stream = None
+                    ring.close()
+                replies.put(None)
+            except Exception as exc:  # noqa: BLE001
+                if stream is not None:
+                    stream.close()
+                    stream = None
+                ring.close()
+                replies.put(str(exc))
+    except Exception as exc:  # noqa: BLE001
+        replies.put(str(exc))
+    finally:
+        if stream is not None:
+            stream.close()
+        ring.close()
+        ring.release()
+
+
+def consume(spec: RingSpec, handler: Callable[[np.ndarray], None], max_frames: int = 4096) -> int:
+    """Feed every block of a ring's current stream to ``handler`` until it is closed.
+
+    ``handler`` receives zero-copy views, valid for the duration of the call.
+    Returns the frames lost to overruns: skipped because the producer lapped
+    this consumer, or overwritten while ``handler`` was still using them.
+    """
+    ring = SharedRingBuffer.attach(spec)
+    try:
+        reader = ring.reader()
+        lost = 0
+        while not reader.drained():
+            block = reader.read_wait(max_frames)
+            if block is None:
+                continue
+            handler(block)
+            if not reader.still_valid():
+                lost += len(block)
+        return reader.lost_frames + lost
+    finally:
+        ring.release()
+
+
+def encode_worker(spec: RingSpec, output_path: Path, audio_format: str = "WAV", subtype: str = "PCM_16") -> None:
+    """Worker process: stream the ring into an audio file as it is captured."""
+    with sf.SoundFile(
+        str(output_path),
+        mode="w",
+        samplerate=spec.samplerate,
+        channels=spec.channels,
+        format=audio_format,
+        subtype=subtype,
+    ) as output:
+        consume(spec, output.write)
+
+
+def transcribe_worker(
+    spec: RingSpec,
+    result_path: Path,
+    api_base_url: str = "http://localhost:8000",
+    language: str = "pt",
+) -> None:
+    """Worker process: collect the capture and write its transcription to ``result_path``."""
+    try:
+        from .speech_to_text import SpeechToText
+    except ImportError:  # pragma: no cover
+        from speech_to_text import SpeechToText
+
+    frames: list[np.ndarray] = []
+    # The views are recycled by the ring, so this consumer has to keep copies
+    consume(spec, lambda block: frames.append(block.copy()))
+    if not frames:
+        return
+    settings = AudioSettings(samplerate=spec.samplerate, channels=spec.channels, dtype=spec.dtype)
+    text = SpeechToText(api_base_url=api_base_url).transcribe_frames(frames, settings, language=language)
+    Path(result_path).write_text(text, encoding="utf-8")
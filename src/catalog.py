@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import soundfile as sf
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".opus", ".ogg")
+HASH_CHUNK_SIZE = 1024 * 1024
+TEMP_MARKER = ".tmp."  # intermediate WAV of an MP3 export, e.g. 20240101_120000.tmp.wav
+
+# What produced a file: a microphone take or synthesized speech
+RECORDING = "recording"
+SPEECH = "speech"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    format TEXT,
+    duration REAL,
+    samplerate INTEGER,
+    channels INTEGER,
+    size INTEGER,
+    mtime REAL,
+    content_hash TEXT,
+    created_at TEXT NOT NULL,
+    transcript TEXT,
+    language TEXT,
+    kind TEXT NOT NULL DEFAULT 'recording'
+);
+CREATE INDEX IF NOT EXISTS recordings_hash ON recordings(content_hash);
+CREATE INDEX IF NOT EXISTS recordings_mtime ON recordings(mtime);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(
+    transcript, content='recordings', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS recordings_ai AFTER INSERT ON recordings BEGIN
+    INSERT INTO transcripts_fts(rowid, transcript) VALUES (new.id, new.transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS recordings_ad AFTER DELETE ON recordings BEGIN
+    INSERT INTO transcripts_fts(transcripts_fts, rowid, transcript) VALUES ('delete', old.id, old.transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS recordings_au AFTER UPDATE OF transcript ON recordings BEGIN
+    INSERT INTO transcripts_fts(transcripts_fts, rowid, transcript) VALUES ('delete', old.id, old.transcript);
+    INSERT INTO transcripts_fts(rowid, transcript) VALUES (new.id, new.transcript);
+END;
+"""
+
+_COLUMNS = (
+    "path, format, duration, samplerate, channels, size, mtime, content_hash, created_at, transcript, language, kind"
+)
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    path: Path
+    format: str | None
+    duration: float | None
+    samplerate: int | None
+    channels: int | None
+    size: int | None
+    mtime: float | None
+    content_hash: str | None
+    created_at: str
+    transcript: str | None
+    language: str | None
+    kind: str = RECORDING
+
+
+class RecordingCatalog:
+    """SQLite index of recordings: audio metadata, content hash and transcript.
+
+    Transcripts are full-text indexed (FTS5 when the sqlite build has it,
+    plain LIKE otherwise). Writers upsert by path, so metadata and transcripts
+    can arrive in any order from different threads.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(recordings)")}
+        if "kind" not in columns:
+            # Catalogs created before files were told apart by kind
+            self._conn.execute(f"ALTER TABLE recordings ADD COLUMN kind TEXT NOT NULL DEFAULT '{RECORDING}'")
+        has_index = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'transcripts_fts'"
+        ).fetchone() is not None
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self._has_fts = True
+            if not has_index:
+                # Rows indexed before the FTS table existed must be in it, or deleting them corrupts the index
+                self._conn.execute("INSERT INTO transcripts_fts(transcripts_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            self._has_fts = False
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def add_recording(
+        self,
+        file_path: Path,
+        duration: float | None = None,
+        samplerate: int | None = None,
+        channels: int | None = None,
+        kind: str | None = None,
+    ) -> CatalogEntry:
+        """Index (or re-index) a recording file; audio info is read from the file when not given.
+
+        ``kind`` (RECORDING or SPEECH) is kept as it is when re-indexing
+        unless given; new files default to RECORDING.
+        """
+        file_path = file_path.resolve()
+        stat = file_path.stat()
+        if duration is None or samplerate is None or channels is None:
+            try:
+                info = sf.info(str(file_path))
+                duration = info.duration if duration is None else duration
+                samplerate = info.samplerate if samplerate is None else samplerate
+                channels = info.channels if channels is None else channels
+            except Exception:  # noqa: BLE001
+                # Keep the file searchable by path/hash even if libsndfile can't parse it
+                pass
+
+        values = {
+            "path": str(file_path),
+            "format": file_path.suffix.lstrip(".").lower(),
+            "duration": duration,
+            "samplerate": samplerate,
+            "channels": channels,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "content_hash": file_hash(file_path),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "kind": kind,
+        }
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO recordings (
+                    path, format, duration, samplerate, channels, size, mtime, content_hash, created_at, kind
+                )
+                VALUES (
+                    :path, :format, :duration, :samplerate, :channels, :size, :mtime, :content_hash, :created_at,
+                    COALESCE(:kind, 'recording')
+                )
+                ON CONFLICT(path) DO UPDATE SET
+                    kind = COALESCE(:kind, recordings.kind),
+                    format = excluded.format,
+                    duration = excluded.duration,
+                    samplerate = excluded.samplerate,
+                    channels = excluded.channels,
+                    size = excluded.size,
+                    mtime = excluded.mtime,
+                    content_hash = excluded.content_hash
+                """,
+                values,
+            )
+            self._conn.commit()
+        entry = self.get(file_path)
+        assert entry is not None
+        return entry
+
+    def set_transcript(self, file_path: Path, transcript: str, language: str | None = None) -> None:
+        """Store the transcript of a recording, creating its row if it isn't indexed yet."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO recordings (path, created_at, transcript, language)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    transcript = excluded.transcript,
+                    language = excluded.language
+                """,
+                (str(file_path.resolve()), datetime.now().isoformat(timespec="seconds"), transcript, language),
+            )
+            self._conn.commit()
+
+    def get(self, file_path: Path) -> CatalogEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM recordings WHERE path = ?",
+                (str(file_path.resolve()),),
+            ).fetchone()
+        return _to_entry(row) if row else None
+
+    def latest(self, kind: str | None = None) -> CatalogEntry | None:
+        """Most recently modified non-empty file that still exists on disk, optionally of one ``kind``.
+
+        Entries whose file was deleted are pruned on the way.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {_COLUMNS} FROM recordings
+                WHERE size > 0 AND (:kind IS NULL OR kind = :kind)
+                ORDER BY mtime DESC, id DESC
+                """,
+                {"kind": kind},
+            )
+            missing = []
+            found = None
+            for row in rows:
+                entry = _to_entry(row)
+                if entry.path.exists():
+                    found = entry
+                    break
+                missing.append((str(entry.path),))
+            rows.close()
+            if missing:
+                self._conn.executemany("DELETE FROM recordings WHERE path = ?", missing)
+                self._conn.commit()
+        return found
+
+    def find_by_hash(self, content_hash: str) -> list[CatalogEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM recordings WHERE content_hash = ?",
+                (content_hash,),
+            ).fetchall()
+        return [_to_entry(row) for row in rows]
+
+    def search(self, query: str, limit: int = 50) -> list[CatalogEntry]:
+        """Full-text search over transcripts; every word in ``query`` must match."""
+        terms = query.split()
+        if not terms:
+            return []
+
+        with self._lock:
+            if self._has_fts:
+                match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+                rows = self._conn.execute(
+                    f"""
+                    SELECT {", ".join("r." + c.strip() for c in _COLUMNS.split(","))}
+                    FROM transcripts_fts f JOIN recordings r ON r.id = f.rowid
+                    WHERE transcripts_fts MATCH ?
+                    ORDER BY f.rank
+                    LIMIT ?
+                    """,
+                    (match, limit),
+                ).fetchall()
+            else:
+                where = " AND ".join("transcript LIKE ?" for _ in terms)
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM recordings WHERE {where} LIMIT ?",
+                    (*(f"%{term}%" for term in terms), limit),
+                ).fetchall()
+        return [_to_entry(row) for row in rows]
+
+    def sync_directory(self, directory: Path) -> int:
+        """Index new or changed audio files under ``directory``; returns how many were (re)indexed."""
+        with self._lock:
+            known = {
+                row["path"]: (row["size"], row["mtime"])
+                for row in self._conn.execute("SELECT path, size, mtime FROM recordings")
+            }
+
+        indexed = 0
+        for entry in _scan_audio(directory):
+            try:
+                stat = entry.stat()
+                if known.get(str(Path(entry.path).resolve())) == (stat.st_size, stat.st_mtime):
+                    continue
+                self.add_recording(Path(entry.path))
+            except FileNotFoundError:
+                # Deleted or renamed between the scan and the read (e.g. a temp file of an export)
+                continue
+            indexed += 1
+        return indexed
+
+
+def file_hash(file_path: Path) -> str:
+    """Content hash of a file, read in fixed-size chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _scan_audio(directory: Path) -> Iterator[os.DirEntry]:
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_audio(Path(entry.path))
+            elif entry.name.lower().endswith(AUDIO_EXTENSIONS) and TEMP_MARKER not in entry.name.lower():
+                yield entry
+
+
+def _to_entry(row: sqlite3.Row) -> CatalogEntry:
+    return CatalogEntry(
+        path=Path(row["path"]),
+        format=row["format"],
+        duration=row["duration"],
+        samplerate=row["samplerate"],
+        channels=row["channels"],
+        size=row["size"],
+        mtime=row["mtime"],
+        content_hash=row["content_hash"],
+        created_at=row["created_at"],
+        transcript=row["transcript"],
+        language=row["language"],
+        kind=row["kind"],
+    )
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Protocol, Sequence
+
+import numpy as np
+import soundfile as sf
+
+try:
+    from .audio_reader import AudioReader
+except ImportError:  # pragma: no cover
+    from audio_reader import AudioReader
+
+BLOCK_FRAMES = 65536
+INT16_SCALE = 32768.0
+
+
+class BlockProcessor(Protocol):
+    """Stateful stage of a DspChain: float32 (frames, channels) in, same shape out."""
+
+    def process(self, block: np.ndarray) -> np.ndarray: ...
+
+    def reset(self) -> None: ...
+
+
+class HighPassFilter:
+    """Cascade of first-order high-pass sections (6 dB/octave each).
+
+    The recursion y[n] = a * y[n-1] + u[n] is evaluated in closed form over
+    short sub-blocks with cumulative sums, so there is no per-sample Python
+    loop; filter state carries over between blocks.
+    """
+
+    def __init__(self, samplerate: int, cutoff: float = 80.0, order: int = 2) -> None:
+        if cutoff <= 0 or cutoff >= samplerate / 2:
+            raise ValueError(f"Frequência de corte inválida: {cutoff}")
+        self._a = 1.0 / (1.0 + 2.0 * math.pi * cutoff / samplerate)
+        self._order = order
+        # Keep a**-chunk well inside float64 range regardless of the cutoff
+        self._chunk = max(1, min(1024, int(30.0 / -math.log(self._a))))
+        powers = self._a ** np.arange(1, self._chunk + 1)
+        self._powers = powers[:, None]
+        self._inverse = (1.0 / powers)[:, None]
+        self.reset()
+
+    def reset(self) -> None:
+        self._last_input: list[np.ndarray | None] = [None] * self._order
+        self._last_output: list[np.ndarray | None] = [None] * self._order
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        signal = block.astype(np.float64)
+        for stage in range(self._order):
+            signal = self._section(stage, signal)
+        return signal.astype(np.float32)
+
+    def _section(self, stage: int, x: np.ndarray) -> np.ndarray:
+        if len(x) == 0:
+            return x
+        previous_x = self._last_input[stage]
+        previous_y = self._last_output[stage]
+        if previous_x is None:
+            # Start from the first sample so an initial offset doesn't produce a step
+            previous_x = x[0]
+            previous_y = np.zeros(x.shape[1])
+
+        u = np.empty_like(x)
+        u[0] = x[0] - previous_x
+        np.subtract(x[1:], x[:-1], out=u[1:])
+        u *= self._a
+
+        self._last_input[stage] = x[-1].copy()
+        self._last_output[stage] = self._scan(u, previous_y)
+        return u
+
+    def _scan(self, u: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """In-place y[n] = a * y[n-1] + u[n]; returns the last output."""
+        for start in range(0, len(u), self._chunk):
+            segment = u[start:start + self._chunk]
+            count = len(segment)
+            segment *= self._inverse[:count]
+            np.cumsum(segment, axis=0, out=segment)
+            segment += y
+            segment *= self._powers[:count]
+            y = segment[-1]
+        return y.copy()
+
+
+class DCBlocker(HighPassFilter):
+    """Removes DC offset with a single very low (5 Hz) high-pass section."""
+
+    def __init__(self, samplerate: int, cutoff: float = 5.0) -> None:
+        super().__init__(samplerate, cutoff=cutoff, order=1)
+
+
+class Normalizer:
+    """Peak or RMS loudness normalization.
+
+    Over files or finished takes, ``measure`` every block first
+    (DspChain.process_file and process_frames do this) and the gain is
+    fixed. Live, the gain starts at unity and follows the statistics seen so
+    far like a compressor: it drops within ``attack`` seconds when louder
+    input arrives and rises over ``release`` seconds, ramped across each
+    block to avoid zipper noise. Gain is always limited so peaks stay under
+    ``ceiling_db``.
+    """
+
+    def __init__(
+        self,
+        mode: str = "peak",
+        target_db: float = -1.0,
+        ceiling_db: float = -1.0,
+        max_gain_db: float = 20.0,
+        samplerate: int = 44100,
+        attack: float = 0.005,
+        release: float = 2.0,
+    ) -> None:
+        if mode not in ("peak", "rms"):
+            raise ValueError(f"Modo de normalização desconhecido: {mode}")
+        self._mode = mode
+        self._target = 10 ** (target_db / 20)
+        self._ceiling = 10 ** (ceiling_db / 20)
+        self._max_gain = 10 ** (max_gain_db / 20)
+        self._attack_frames = max(attack * samplerate, 1.0)
+        self._release_frames = max(release * samplerate, 1.0)
+        self.reset()
+
+    @property
+    def gain(self) -> float:
+        if self._peak <= 0:
+            return 1.0
+        if self._mode == "peak":
+            gain = self._target / self._peak
+        else:
+            rms = math.sqrt(self._sumsq / self._count) if self._count else 0.0
+            gain = self._target / rms if rms > 0 else self._max_gain
+        return min(gain, self._max_gain, self._ceiling / self._peak)
+
+    def reset(self) -> None:
+        self._peak = 0.0
+        self._sumsq = 0.0
+        self._count = 0
+        self._frozen = False
+        self._current_gain = 1.0
+
+    def measure(self, block: np.ndarray) -> None:
+        if len(block) == 0:
+            return
+        self._peak = max(self._peak, float(np.abs(block).max()))
+        self._sumsq += float(np.einsum("ij,ij->", block, block, dtype=np.float64))
+        self._count += block.size
+
+    def freeze(self) -> None:
+        """Stop adapting: use the gain of everything measured so far."""
+        self._frozen = True
+        self._current_gain = self.gain
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if len(block) == 0:
+            return block
+        if self._frozen:
+            block *= self._current_gain
+            return block
+
+        self.measure(block)
+        start, target = self._current_gain, self.gain
+        time_constant = self._attack_frames if target < start else self._release_frames
+        end = start + (target - start) * (1.0 - math.exp(-len(block) / time_constant))
+        self._current_gain = end
+        if start == end:
+            block *= end
+        else:
+            block *= np.linspace(start, end, len(block), dtype=np.float32)[:, None]
+        # Adaptive gain lags behind new peaks; never let that clip
+        np.clip(block, -self._ceiling, self._ceiling, out=block)
+        return block
+
+
+class TPDFDither:
+    """Triangular dither plus rounding for float -> int16 conversion."""
+
+    def __init__(self, enabled: bool = True, seed: int | None = None) -> None:
+        self._enabled = enabled
+        self._rng = np.random.default_rng(seed)
+
+    def to_int16(self, block: np.ndarray) -> np.ndarray:
+        scaled = block * INT16_SCALE
+        if self._enabled:
+            noise = self._rng.random(scaled.shape, dtype=np.float32)
+            noise -= self._rng.random(scaled.shape, dtype=np.float32)
+            scaled += noise
+        np.rint(scaled, out=scaled)
+        np.clip(scaled, -INT16_SCALE, INT16_SCALE - 1, out=scaled)
+        return scaled.astype(np.int16)
+
+
+class DspChain:
+    """Composable post-processing chain applied block by block.
+
+    Blocks may be int16 (as captured) or float; the output keeps the input's
+    sample type, with int16 re-quantized through TPDF dither. Only block-sized
+    buffers are allocated, so it runs in the recorder's collector thread or
+    over files of any length.
+    """
+
+    def __init__(self, processors: Sequence[BlockProcessor], dither: bool = True) -> None:
+        self.processors = list(processors)
+        self._dither = TPDFDither(enabled=dither)
+
+    @classmethod
+    def for_speech(cls, samplerate: int, normalize: str | None = None) -> DspChain:
+        """DC removal, 80 Hz high-pass and (optionally) normalization: conditioning for STT.
+
+        Normalization is best left to ``process_file`` or ``process_frames``,
+        which measure the whole signal first; live it can only adapt as it goes.
+        """
+        processors: list[BlockProcessor] = [DCBlocker(samplerate), HighPassFilter(samplerate, cutoff=80.0)]
+        if normalize == "peak":
+            processors.append(Normalizer("peak", target_db=-1.0, samplerate=samplerate))
+        elif normalize == "rms":
+            processors.append(Normalizer("rms", target_db=-20.0, samplerate=samplerate))
+        return cls(processors)
+
+    def reset(self) -> None:
+        for processor in self.processors:
+            processor.reset()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        is_int16 = block.dtype == np.int16
+        if is_int16:
+            signal = block.astype(np.float32)
+            signal /= INT16_SCALE
+        else:
+            signal = block.astype(np.float32, copy=True)
+        for processor in self.processors:
+            signal = processor.process(signal)
+        if is_int16:
+            return self._dither.to_int16(signal)
+        return signal.astype(block.dtype, copy=False)
+
+    def process_file(self, source: Path, destination: Path, blocksize: int = BLOCK_FRAMES) -> None:
+        """Run the chain over a file into a PCM_16 WAV, in fixed-size blocks."""
+        self.reset()
+        with AudioReader(source) as reader:
+            if any(isinstance(processor, Normalizer) for processor in self.processors):
+                self._measure_pass(reader.blocks(blocksize, dtype="float32"))
+
+            with sf.SoundFile(
+                str(destination),
+                mode="w",
+                samplerate=reader.samplerate,
+                channels=reader.channels,
+                format="WAV",
+                subtype="PCM_16",
+            ) as output:
+                for block in reader.blocks(blocksize, dtype="float32"):
+                    signal = block.copy()
+                    for processor in self.processors:
+                        signal = processor.process(signal)
+                    output.write(self._dither.to_int16(signal))
+
+    def process_frames(self, frames: Sequence[np.ndarray]) -> list[np.ndarray]:
+        """Run the chain over a finished take held in memory, normalizing over all of it."""
+        self.reset()
+        if any(isinstance(processor, Normalizer) for processor in self.processors):
+            self._measure_pass(
+                frame.astype(np.float32) / INT16_SCALE if frame.dtype == np.int16 else frame for frame in frames
+            )
+        return [self.process(frame) for frame in frames]
+
+    def _measure_pass(self, blocks: Iterable[np.ndarray]) -> None:
+        # Normalizers need the whole signal's statistics after the stages in front of them
+        for block in blocks:
+            signal = block.astype(np.float32, copy=True)
+            for processor in self.processors:
+                if isinstance(processor, Normalizer):
+                    processor.measure(signal)
+                else:
+                    signal = processor.process(signal)
+        for processor in self.processors:
+            if isinstance(processor, Normalizer):
+                processor.freeze()
+            else:
+                processor.reset()
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    seconds: float  # audio processed
+    elapsed: float  # wall time
+    blocksize: int
+
+    @property
+    def real_time_factor(self) -> float:
+        """Processing time per second of audio; below 1.0 keeps up with live capture."""
+        return self.elapsed / self.seconds if self.seconds else 0.0
+
+
+def benchmark(
+    chain: DspChain,
+    samplerate: int = 44100,
+    channels: int = 1,
+    seconds: float = 30.0,
+    blocksize: int = 1024,
+) -> BenchmarkResult:
+    """Time the chain on int16 noise fed in capture-sized blocks."""
+    rng = np.random.default_rng(0)
+    block = (rng.standard_normal((blocksize, channels)) * 3000).astype(np.int16)
+    count = max(1, int(seconds * samplerate / blocksize))
+    chain.reset()
+    started = time.perf_counter()
+    for _ in range(count):
+        chain.process(block)
+    elapsed = time.perf_counter() - started
+    return BenchmarkResult(seconds=count * blocksize / samplerate, elapsed=elapsed, blocksize=blocksize)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Condiciona gravações (DC, passa-altas, normalização, dither).")
+    parser.add_argument("source", type=Path, nargs="?")
+    parser.add_argument("destination", type=Path, nargs="?")
+    parser.add_argument("--normalize", choices=("peak", "rms", "none"), default="peak")
+    parser.add_argument("--benchmark", action="store_true", help="mede o fator de tempo real da cadeia")
+    parser.add_argument("--blocksize", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    normalize = None if args.normalize == "none" else args.normalize
+    if args.benchmark:
+        for blocksize in (256, args.blocksize, BLOCK_FRAMES):
+            result = benchmark(DspChain.for_speech(44100, normalize=normalize), blocksize=blocksize)
+            print(
+                f"Bloco {blocksize:>6}: fator de tempo real {result.real_time_factor:.4f} "
+                f"({1 / result.real_time_factor if result.real_time_factor else 0:.0f}x tempo real)"
+            )
+        return
+
+    if args.source is None or args.destination is None:
+        parser.error("informe origem e destino, ou use --benchmark")
+    info = sf.info(str(args.source))
+    DspChain.for_speech(info.samplerate, normalize=normalize).process_file(args.source, args.destination)
+    print(f"Salvo: {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Hashable
+
+
+class Job:
+    """Handle for work submitted to a JobExecutor.
+
+    Superseding a job drops its result and callbacks and keeps it from
+    starting if it is still queued. Work already running is not interrupted:
+    an HTTP request in flight runs to completion (holding its pool worker),
+    so long jobs should check ``superseded`` between steps.
+    """
+
+    def __init__(self, group: str) -> None:
+        self.group = group
+        self.future: Future | None = None
+        self._superseded = threading.Event()
+
+    @property
+    def superseded(self) -> bool:
+        return self._superseded.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to ``timeout`` seconds; returns True as soon as the job is superseded."""
+        return self._superseded.wait(timeout)
+
+    def supersede(self) -> None:
+        """Mark the job stale; if it hasn't started yet it never runs."""
+        self._superseded.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class JobExecutor:
+    """Bounded pool for GUI background work, with per-group supersede semantics.
+
+    Submitting a job to a group supersedes the group's previous job by
+    default, so e.g. a new transcription makes the stale one's result
+    disappear instead of racing it to the screen. Superseding doesn't abort
+    work in progress (see ``Job``). Callbacks only run for jobs that are still
+    current, and are delivered through ``ui``, which batches them into as few
+    ``call_after`` (wx.CallAfter in the app) dispatches as possible.
+
+    Jobs submitted with ``supersede=False`` (e.g. saves) are never dropped:
+    ``shutdown`` only supersedes the other groups and waits for these.
+    """
+
+    def __init__(self, max_workers: int = 4, call_after: Callable[..., Any] | None = None) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.ui = UiUpdateBatcher(call_after or (lambda fn, *args: fn(*args)))
+        self._current: dict[str, Job] = {}
+        self._kept: set[Job] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        group: str,
+        fn: Callable[[Job], Any],
+        on_done: Callable[[Any], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+        supersede: bool = True,
+    ) -> Job:
+        """Run ``fn(job)`` on the pool; long-running work can poll ``job.superseded``."""
+        job = Job(group)
+        with self._lock:
+            previous = self._current.get(group)
+            if supersede and previous is not None:
+                previous.supersede()
+            self._current[group] = job
+            if not supersede:
+                self._kept.add(job)
+            job.future = self._executor.submit(self._run, job, fn, on_done, on_error)
+        return job
+
+    def supersede(self, group: str) -> None:
+        """Supersede the current job of a group, if any."""
+        with self._lock:
+            job = self._current.pop(group, None)
+        if job is not None:
+            job.supersede()
+
+    def is_busy(self, group: str) -> bool:
+        with self._lock:
+            job = self._current.get(group)
+        return job is not None and not job.superseded and job.future is not None and not job.future.done()
+
+    def shutdown(self, timeout: float | None = None) -> bool:
+        """Supersede supersedable jobs and wait up to ``timeout`` for the kept ones to finish.
+
+        Kept jobs still run to completion, but their callbacks are dropped
+        since the UI is going away. Returns False if some are still running.
+        """
+        with self._lock:
+            self._closed = True
+            jobs = [job for job in self._current.values() if job not in self._kept]
+            kept = [job.future for job in self._kept]
+            self._current.clear()
+        for job in jobs:
+            job.supersede()
+        self._executor.shutdown(wait=False)
+        return not wait(kept, timeout=timeout).not_done
+
+    def _run(self, job: Job, fn, on_done, on_error) -> None:
+        if job.superseded:
+            return
+        try:
+            result = fn(job)
+        except Exception as exc:  # noqa: BLE001
+            if on_error is not None and not job.superseded and not self._closed:
+                self.ui.post(on_error, exc)
+            return
+        finally:
+            with self._lock:
+                if self._current.get(job.group) is job:
+                    del self._current[job.group]
+                self._kept.discard(job)
+                closed = self._closed
+        if closed:
+            return
+        if on_done is not None and not job.superseded:
+            self.ui.post(on_done, result)
+
+
+class UiUpdateBatcher:
+    """Coalesce UI updates posted from worker threads into a single dispatch.
+
+    Updates posted while a flush is pending ride along with it, and updates
+    sharing a ``key`` (e.g. the same status label) keep only the latest value.
+    """
+
+    def __init__(self, dispatch: Callable[..., Any]) -> None:
+        self._dispatch = dispatch
+        self._pending: dict[Hashable, tuple[Callable, tuple]] = {}
+        self._scheduled = False
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def post(self, fn: Callable, *args, key: Hashable | None = None) -> None:
+        with self._lock:
+            if key is None:
+                # Unkeyed updates are never coalesced
+                self._counter += 1
+                key = ("_unkeyed", self._counter)
+            else:
+                # Re-insert so a keyed update keeps its latest position in the flush order
+                self._pending.pop(key, None)
+            self._pending[key] = (fn, args)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._dispatch(self._flush)
+
+    def _flush(self) -> None:
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._scheduled = False
+        for fn, args in pending:
+            fn(*args)
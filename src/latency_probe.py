@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import argparse
+import time as time_module
+from dataclasses import dataclass
+
+import numpy as np
+
+try:
+    from .audio_utils import AudioSettings
+except ImportError:  # pragma: no cover
+    from audio_utils import AudioSettings
+
+
+@dataclass(frozen=True)
+class LatencyReport:
+    samplerate: int
+    callbacks: int
+    frames: int
+    elapsed: float  # seconds between the first and last callback
+    blocksize_mean: float
+    interval_mean_ms: float
+    jitter_ms: float  # standard deviation of the callback interval
+    interval_max_ms: float
+    input_latency_mean_ms: float | None  # ADC time of the block -> callback invocation
+    input_latency_max_ms: float | None
+    reported_latency_ms: float | None  # what PortAudio says the stream latency is
+    overflows: int
+    drift_frames: int  # frames received minus frames expected from elapsed time
+
+    def format(self) -> str:
+        lines = [
+            f"Callbacks: {self.callbacks} ({self.frames} frames em {self.elapsed:.2f}s)",
+            f"Bloco médio: {self.blocksize_mean:.1f} frames",
+            f"Intervalo entre callbacks: média {self.interval_mean_ms:.2f} ms, "
+            f"jitter {self.jitter_ms:.2f} ms, máx {self.interval_max_ms:.2f} ms",
+        ]
+        if self.input_latency_mean_ms is not None:
+            lines.append(
+                f"Latência de entrada (ADC -> callback): média {self.input_latency_mean_ms:.2f} ms, "
+                f"máx {self.input_latency_max_ms:.2f} ms"
+            )
+        if self.reported_latency_ms is not None:
+            lines.append(f"Latência informada pelo PortAudio: {self.reported_latency_ms:.2f} ms")
+        lines.append(f"Overruns: {self.overflows}, desvio de amostras: {self.drift_frames:+d} frames")
+        return "\n".join(lines)
+
+
+class LatencyProbe:
+    """Collects timing for every capture callback of a stream.
+
+    Use ``callback`` as (or from) the InputStream callback; it only appends to
+    preallocated arrays so the measurement doesn't disturb what it measures.
+    Callback times come from PortAudio's stream clock (``time.currentTime``),
+    which is what the ADC timestamps use; hosts that report 0 fall back to
+    ``perf_counter``.
+    """
+
+    def __init__(self, samplerate: int, max_callbacks: int = 100_000) -> None:
+        self._samplerate = samplerate
+        self._host_times = np.zeros(max_callbacks)
+        self._frames = np.zeros(max_callbacks, dtype=np.int64)
+        self._latencies = np.full(max_callbacks, np.nan)
+        self._count = 0
+        self._overflows = 0
+
+    def callback(self, indata, frames, time, status) -> None:  # noqa: ARG002
+        if status and getattr(status, "input_overflow", False):
+            self._overflows += 1
+        index = self._count
+        if index >= len(self._host_times):
+            return
+        adc_time = getattr(time, "inputBufferAdcTime", None)
+        current_time = getattr(time, "currentTime", None)
+        self._host_times[index] = current_time or time_module.perf_counter()
+        self._frames[index] = frames
+        if adc_time and current_time:
+            self._latencies[index] = current_time - adc_time
+        self._count = index + 1
+
+    def report(self, reported_latency: float | None = None) -> LatencyReport:
+        count = self._count
+        host_times = self._host_times[:count]
+        frames = self._frames[:count]
+        latencies = self._latencies[:count]
+        latencies = latencies[~np.isnan(latencies)]
+
+        intervals = np.diff(host_times) * 1000 if count > 1 else np.zeros(1)
+        elapsed = float(host_times[-1] - host_times[0]) if count > 1 else 0.0
+        # Frames delivered after the first callback should match the elapsed wall time
+        expected = int(round(elapsed * self._samplerate))
+        received = int(frames[1:].sum()) if count > 1 else 0
+
+        return LatencyReport(
+            samplerate=self._samplerate,
+            callbacks=count,
+            frames=int(frames.sum()),
+            elapsed=elapsed,
+            blocksize_mean=float(frames.mean()) if count else 0.0,
+            interval_mean_ms=float(intervals.mean()),
+            jitter_ms=float(intervals.std()),
+            interval_max_ms=float(intervals.max()),
+            input_latency_mean_ms=float(latencies.mean() * 1000) if len(latencies) else None,
+            input_latency_max_ms=float(latencies.max() * 1000) if len(latencies) else None,
+            reported_latency_ms=reported_latency * 1000 if reported_latency is not None else None,
+            overflows=self._overflows,
+            drift_frames=received - expected,
+        )
+
+
+def measure_latency(settings: AudioSettings, seconds: float = 5.0) -> LatencyReport:
+    """Open a capture stream with ``settings`` for ``seconds`` and report its timing."""
+    import sounddevice as sd
+
+    probe = LatencyProbe(settings.samplerate)
+    stream = sd.InputStream(
+        samplerate=settings.samplerate,
+        channels=settings.channels,
+        dtype=settings.dtype,
+        blocksize=settings.blocksize,
+        latency=settings.latency,
+        device=settings.device,
+        callback=probe.callback,
+    )
+    with stream:
+        time_module.sleep(seconds)
+        reported = stream.latency
+    return probe.report(reported_latency=reported if isinstance(reported, (int, float)) else None)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Mede latência e jitter da captura de áudio.")
+    parser.add_argument("--list", action="store_true", help="lista os dispositivos e sai")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--samplerate", type=int, default=AudioSettings.samplerate)
+    parser.add_argument("--channels", type=int, default=AudioSettings.channels)
+    parser.add_argument("--blocksize", type=int, default=AudioSettings.blocksize)
+    parser.add_argument("--latency", default=AudioSettings.latency, help='"low", "high" ou segundos')
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    if args.list:
+        import sounddevice as sd
+
+        print(sd.query_devices())
+        return
+
+    device = int(args.device) if args.device is not None and args.device.isdigit() else args.device
+    try:
+        latency: str | float = float(args.latency)
+    except ValueError:
+        latency = args.latency
+
+    settings = AudioSettings(
+        samplerate=args.samplerate,
+        channels=args.channels,
+        blocksize=args.blocksize,
+        latency=latency,
+        device=device,
+    )
+    print(measure_latency(settings, seconds=args.seconds).format())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-import wx
-
-try:
-    from .app import RecorderApp
-except ImportError:  # pragma: no cover
-    from app import RecorderApp
-
 
 def main() -> None:
+    # wx is only loaded when the GUI actually starts. The import path is picked
+    # once, from how this module was loaded, so an ImportError raised inside
+    # app (a missing dependency) isn't mistaken for the wrong import style
+    if __package__:
+        from .app import RecorderApp
+    else:  # pragma: no cover
+        from app import RecorderApp
+
     app = RecorderApp()
     app.MainLoop()
 
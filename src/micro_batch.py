@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+import soundfile as sf
+
+try:
+    from .audio_utils import AudioSettings, encode_wav_buffer
+    from .stt_backends import WHISPER_SAMPLERATE, to_whisper_input
+except ImportError:  # pragma: no cover
+    from audio_utils import AudioSettings, encode_wav_buffer
+    from stt_backends import WHISPER_SAMPLERATE, to_whisper_input
+
+# Whisper decodes 30 s windows; a batch that fits one window is a single decoder pass
+MAX_BATCH_SECONDS = 30.0
+GAP_SECONDS = 1.0
+MAX_CLIP_SECONDS = 5.0
+# A segment overlapping a second clip by more than this can't be attributed to one clip
+AMBIGUOUS_OVERLAP_SECONDS = 0.2
+
+_PACK_SETTINGS = AudioSettings(samplerate=WHISPER_SAMPLERATE, channels=1)
+
+
+@dataclass(frozen=True)
+class PackedClip:
+    index: int  # position in the caller's list of files
+    start: float  # seconds into the packed upload
+    end: float
+
+
+@dataclass
+class ClipBatch:
+    clips: list[PackedClip] = field(default_factory=list)
+    # Clips and silence gaps in upload order; transcribe_packed leaves it empty and loads them per batch
+    pieces: list[np.ndarray] = field(default_factory=list)
+    duration: float = 0.0
+
+
+def pack_clips(
+    clips: Sequence[tuple[int, np.ndarray]],
+    gap_seconds: float = GAP_SECONDS,
+    max_batch_seconds: float = MAX_BATCH_SECONDS,
+) -> list[ClipBatch]:
+    """Lay out 16 kHz mono clips back to back with silence in between, in batches."""
+    audio = dict(clips)
+    batches = layout_clips([(index, len(samples)) for index, samples in clips], gap_seconds, max_batch_seconds)
+    for batch in batches:
+        batch.pieces = _pieces(batch, audio.__getitem__, gap_seconds)
+    return batches
+
+
+def layout_clips(
+    lengths: Sequence[tuple[int, int]],
+    gap_seconds: float = GAP_SECONDS,
+    max_batch_seconds: float = MAX_BATCH_SECONDS,
+) -> list[ClipBatch]:
+    """Plan batches from clip lengths (in 16 kHz frames) alone, without their audio."""
+    batches: list[ClipBatch] = []
+    batch = ClipBatch()
+    for index, frames in lengths:
+        length = frames / WHISPER_SAMPLERATE
+        needed = length if not batch.clips else gap_seconds + length
+        if batch.clips and batch.duration + needed > max_batch_seconds:
+            batches.append(batch)
+            batch = ClipBatch()
+        if batch.clips:
+            batch.duration += gap_seconds
+        batch.clips.append(PackedClip(index=index, start=batch.duration, end=batch.duration + length))
+        batch.duration += length
+    if batch.clips:
+        batches.append(batch)
+    return batches
+
+
+def split_result(batch: ClipBatch, result: dict) -> tuple[dict[int, str], set[int]]:
+    """Attribute a packed transcription back to its clips.
+
+    Words (when the server returned them) go to the clip containing their
+    midpoint. Otherwise whole segments go to the clip they overlap most, and
+    clips sharing a segment are reported as ambiguous.
+    """
+    texts: dict[int, list[str]] = {clip.index: [] for clip in batch.clips}
+    ambiguous: set[int] = set()
+
+    words = result.get("words") or [
+        word for segment in result.get("segments", []) for word in (segment.get("words") or [])
+    ]
+    if words:
+        for word in words:
+            clip = _nearest_clip(batch.clips, (word["start"] + word["end"]) / 2)
+            texts[clip.index].append(word["word"])
+    else:
+        for segment in result.get("segments", []):
+            overlaps = sorted(
+                ((min(segment["end"], clip.end) - max(segment["start"], clip.start), clip) for clip in batch.clips),
+                key=lambda item: item[0],
+                reverse=True,
+            )
+            best_overlap, best = overlaps[0]
+            if best_overlap <= 0:
+                best = _nearest_clip(batch.clips, (segment["start"] + segment["end"]) / 2)
+            texts[best.index].append(segment["text"])
+            for overlap, clip in overlaps[1:]:
+                if overlap > AMBIGUOUS_OVERLAP_SECONDS:
+                    ambiguous.update((best.index, clip.index))
+
+    return {index: "".join(parts).strip() for index, parts in texts.items()}, ambiguous
+
+
+def transcribe_packed(
+    stt,
+    audio_files: Sequence[Path],
+    language: str = "pt",
+    max_clip_seconds: float = MAX_CLIP_SECONDS,
+    gap_seconds: float = GAP_SECONDS,
+    max_batch_seconds: float = MAX_BATCH_SECONDS,
+    max_workers: int = 2,
+) -> list[str]:
+    """Transcribe many short files with few requests; returns texts in input order.
+
+    Files longer than ``max_clip_seconds``, and clips whose text can't be
+    attributed unambiguously, are transcribed on their own.
+    """
+    texts: list[str | None] = [None] * len(audio_files)
+    lengths: list[tuple[int, int]] = []
+    alone: list[int] = []
+    for index, audio_file in enumerate(audio_files):
+        try:
+            info = sf.info(str(audio_file))
+        except Exception as exc:
+            raise ValueError(f"Erro ao processar arquivo: {exc}")
+        if info.duration > max_clip_seconds:
+            alone.append(index)
+            continue
+        lengths.append((index, -(-info.frames * WHISPER_SAMPLERATE // info.samplerate)))
+
+    def load(index: int) -> np.ndarray:
+        samples, samplerate = sf.read(str(audio_files[index]), dtype="float32", always_2d=True)
+        return to_whisper_input(samples, samplerate)
+
+    def run_batch(batch: ClipBatch) -> tuple[dict[int, str], set[int]]:
+        # Clips are read when their batch is sent, so only the batches in flight are in memory
+        buffer = encode_wav_buffer(_pieces(batch, load, gap_seconds), _PACK_SETTINGS)
+        result = stt.transcribe_verbose(buffer, filename="batch.wav", language=language, word_timestamps=True)
+        return split_result(batch, result)
+
+    batches = layout_clips(lengths, gap_seconds=gap_seconds, max_batch_seconds=max_batch_seconds)
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+            for batch_texts, ambiguous in executor.map(run_batch, batches):
+                for index, text in batch_texts.items():
+                    texts[index] = text
+                alone.extend(ambiguous)
+
+    for index in sorted(set(alone)):
+        texts[index] = stt.transcribe_file(Path(audio_files[index]), language)
+    return [text or "" for text in texts]
+
+
+def _pieces(batch: ClipBatch, load: Callable[[int], np.ndarray], gap_seconds: float) -> list[np.ndarray]:
+    """The batch's clips and the silence between them, each clip fitted to its planned length."""
+    gap = np.zeros(int(gap_seconds * WHISPER_SAMPLERATE), dtype=np.float32)
+    pieces: list[np.ndarray] = []
+    for clip in batch.clips:
+        if pieces:
+            pieces.append(gap)
+        audio = load(clip.index)
+        frames = round((clip.end - clip.start) * WHISPER_SAMPLERATE)
+        if len(audio) != frames:
+            audio = np.pad(audio[:frames], (0, max(0, frames - len(audio))))
+        pieces.append(audio)
+    return pieces
+
+
+def _nearest_clip(clips: list[PackedClip], position: float) -> PackedClip:
+    def distance(clip: PackedClip) -> float:
+        if clip.start <= position <= clip.end:
+            return 0.0
+        return min(abs(position - clip.start), abs(position - clip.end))
+
+    return min(clips, key=distance)
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time as time_module
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+import soundfile as sf
+
+try:
+    from .audio_utils import AudioSettings
+except ImportError:  # pragma: no cover
+    from audio_utils import AudioSettings
+
+if TYPE_CHECKING:
+    import sounddevice as sd
+
+
+@dataclass(frozen=True)
+class CaptureSource:
+    """One input device to capture; every channel is written to its own file."""
+
+    device: int | str | None = None
+    channels: int = 1
+    name: str = ""
+
+
+@dataclass
+class ChannelTrack:
+    file_path: Path
+    source: int
+    channel: int
+    device: int | str | None
+    name: str
+    frames: int = 0
+
+
+@dataclass
+class SourceClock:
+    """Clock metadata used to line up sources that don't share a word clock."""
+
+    first_adc_time: float | None = None  # PortAudio stream time of the first sample
+    first_host_time: float | None = None  # time.monotonic() when the first block arrived
+    frames: int = 0
+    overflows: int = 0
+
+
+@dataclass
+class CaptureSession:
+    directory: Path
+    samplerate: int
+    started_at: str
+    tracks: list[ChannelTrack] = field(default_factory=list)
+    clocks: list[SourceClock] = field(default_factory=list)
+
+    def offset_seconds(self, source: int) -> float:
+        """Start of a source relative to the earliest source, in seconds."""
+        starts = [clock.first_host_time for clock in self.clocks if clock.first_host_time is not None]
+        start = self.clocks[source].first_host_time
+        if not starts or start is None:
+            return 0.0
+        return start - min(starts)
+
+    def write_metadata(self) -> Path:
+        metadata = {
+            "samplerate": self.samplerate,
+            "started_at": self.started_at,
+            "tracks": [
+                {**asdict(track), "file_path": track.file_path.name}
+                for track in self.tracks
+            ],
+            "clocks": [
+                {**asdict(clock), "offset_seconds": self.offset_seconds(index)}
+                for index, clock in enumerate(self.clocks)
+            ],
+        }
+        metadata_path = self.directory / "session.json"
+        metadata_path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+        return metadata_path
+
+
+class MultiRecorder:
+    """Capture several devices (or one multichannel interface) concurrently.
+
+    Each source gets its own InputStream and writer thread, and every channel
+    is streamed to its own PCM_16 WAV as blocks arrive, so memory stays bounded
+    regardless of session length.
+    """
+
+    def __init__(self, sources: list[CaptureSource], settings: AudioSettings, output_dir: Path) -> None:
+        if not sources:
+            raise ValueError("At least one capture source is required.")
+        self._sources = sources
+        self._settings = settings
+        self._output_dir = output_dir
+        self._streams: list[sd.InputStream] = []
+        self._queues: list[queue.Queue] = []
+        self._writers: list[threading.Thread] = []
+        self._files: list[list[sf.SoundFile]] = []
+        self._session: Optional[CaptureSession] = None
+        self._is_recording = False
+
+    @property
+    def is_recording(self) -> bool:
+        return self._is_recording
+
+    def start(self) -> CaptureSession:
+        if self._is_recording:
+            assert self._session is not None
+            return self._session
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        directory = _reserve_session_dir(self._output_dir, stamp)
+        session = CaptureSession(directory=directory, samplerate=self._settings.samplerate, started_at=stamp)
+
+        self._files = []
+        for index, source in enumerate(self._sources):
+            label = source.name or f"src{index + 1}"
+            files = []
+            for channel in range(source.channels):
+                file_path = directory / f"{label}_ch{channel + 1:02d}.wav"
+                files.append(
+                    sf.SoundFile(
+                        file_path,
+                        mode="w",
+                        samplerate=self._settings.samplerate,
+                        channels=1,
+                        format="WAV",
+                        subtype="PCM_16",
+                    )
+                )
+                session.tracks.append(
+                    ChannelTrack(file_path=file_path, source=index, channel=channel, device=source.device, name=label)
+                )
+            self._files.append(files)
+            session.clocks.append(SourceClock())
+
+        self._session = session
+        self._queues = [queue.Queue() for _ in self._sources]
+        self._is_recording = True
+
+        try:
+            # Imported here: loading sounddevice initializes PortAudio
+            import sounddevice as sd
+
+            for index, source in enumerate(self._sources):
+                stream = sd.InputStream(
+                    device=source.device,
+                    samplerate=self._settings.samplerate,
+                    channels=source.channels,
+                    dtype=self._settings.dtype,
+                    blocksize=self._settings.blocksize,
+                    latency=self._settings.latency,
+                    callback=self._make_callback(index),
+                )
+                self._streams.append(stream)
+            # Start the streams back to back so their first blocks line up as closely as possible
+            for stream in self._streams:
+                stream.start()
+        except Exception:
+            self._is_recording = False
+            self._close_streams()
+            self._close_files()
+            raise
+
+        self._writers = [
+            threading.Thread(target=self._write_source, args=(index,), daemon=True)
+            for index in range(len(self._sources))
+        ]
+        for writer in self._writers:
+            writer.start()
+        return session
+
+    def stop(self) -> CaptureSession | None:
+        if not self._is_recording:
+            return None
+
+        self._close_streams()
+        self._is_recording = False
+        # No block arrives once the streams are closed, so each writer only has
+        # its queue left to drain; it closes its own files when it exits
+        for writer in self._writers:
+            writer.join()
+        self._writers = []
+        self._files = []
+
+        session = self._session
+        self._session = None
+        if session is not None:
+            session.write_metadata()
+        return session
+
+    def _make_callback(self, index: int):
+        def callback(indata, frames, time, status) -> None:  # noqa: ARG001
+            clock = self._session.clocks[index] if self._session else None
+            if clock is not None:
+                if status and status.input_overflow:
+                    clock.overflows += 1
+                if clock.first_host_time is None:
+                    clock.first_host_time = time_module.monotonic()
+                    clock.first_adc_time = getattr(time, "inputBufferAdcTime", None)
+            self._queues[index].put(indata.copy())
+
+        return callback
+
+    def _write_source(self, index: int) -> None:
+        source_queue = self._queues[index]
+        files = self._files[index]
+        session = self._session
+        try:
+            while self._is_recording or not source_queue.empty():
+                try:
+                    block = source_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                for channel, file in enumerate(files):
+                    file.write(block[:, channel])
+                if session is not None:
+                    session.clocks[index].frames += len(block)
+                    for track in session.tracks:
+                        if track.source == index:
+                            track.frames += len(block)
+        finally:
+            for file in files:
+                file.close()
+
+    def _close_streams(self) -> None:
+        for stream in self._streams:
+            try:
+                stream.stop()
+            finally:
+                stream.close()
+        self._streams = []
+
+    def _close_files(self) -> None:
+        for files in self._files:
+            for file in files:
+                file.close()
+        self._files = []
+
+
+def _reserve_session_dir(output_dir: Path, stamp: str) -> Path:
+    """Create a new session directory; sessions started within the same second get a numeric suffix."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    counter = 0
+    while True:
+        suffix = f"_{counter}" if counter else ""
+        directory = output_dir / f"{stamp}{suffix}"
+        try:
+            # mkdir fails if the name is taken, so two sessions can't share a directory
+            directory.mkdir()
+            return directory
+        except FileExistsError:
+            counter += 1
+
+
+def transcribe_tracks(
+    stt,
+    session: CaptureSession,
+    language: str = "pt",
+    max_workers: int | None = None,
+) -> dict[str, str]:
+    """Transcribe every channel of a session in parallel, keyed by file name."""
+    tracks = [track for track in session.tracks if track.frames > 0]
+    if not tracks:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(tracks)) as executor:
+        futures = {
+            track.file_path.name: executor.submit(stt.transcribe_file, track.file_path, language)
+            for track in tracks
+        }
+        return {name: future.result() for name, future in futures.items()}
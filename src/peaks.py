@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .audio_reader import AudioReader
+    from .resample import pcm_to_float
+except ImportError:  # pragma: no cover
+    from audio_reader import AudioReader
+    from resample import pcm_to_float
+
+PEAKS_SUFFIX = ".peaks"
+
+
+@dataclass(frozen=True)
+class PeakSummary:
+    """Per-pixel waveform overview; values are normalized to [-1, 1]."""
+
+    mins: np.ndarray
+    maxs: np.ndarray
+    rms: np.ndarray
+
+
+class _Level:
+    """Growable min/max/sum-of-squares arrays for one pyramid level."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.mins = np.empty(capacity, dtype=np.float32)
+        self.maxs = np.empty(capacity, dtype=np.float32)
+        self.sumsq = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def extend(self, mins: np.ndarray, maxs: np.ndarray, sumsq: np.ndarray) -> None:
+        needed = self.size + len(mins)
+        if needed > len(self.mins):
+            capacity = max(needed, 2 * len(self.mins))
+            self.mins = np.resize(self.mins, capacity)
+            self.maxs = np.resize(self.maxs, capacity)
+            self.sumsq = np.resize(self.sumsq, capacity)
+        self.mins[self.size:needed] = mins
+        self.maxs[self.size:needed] = maxs
+        self.sumsq[self.size:needed] = sumsq
+        self.size = needed
+
+
+class PeakPyramid:
+    """Multi-resolution min/max/RMS index of a signal.
+
+    Level 0 summarizes ``base_bin`` frames per bin and each level above merges
+    ``factor`` bins of the one below. Blocks can be appended while recording,
+    and any range can be summarized at a given width in O(pixels) by picking
+    the coarsest level that still has at least one bin per pixel.
+    """
+
+    def __init__(self, samplerate: int, base_bin: int = 256, factor: int = 4, max_levels: int = 8) -> None:
+        if base_bin < 1 or factor < 2:
+            raise ValueError("base_bin must be >= 1 and factor >= 2.")
+        self.samplerate = samplerate
+        self.base_bin = base_bin
+        self.factor = factor
+        self.frames = 0
+        self._levels = [_Level() for _ in range(max_levels)]
+        self._pending = np.empty(0, dtype=np.float32)
+        self._last_peak = 0.0
+        self._last_rms = 0.0
+        self._finished = False
+
+    @property
+    def levels(self) -> int:
+        return len(self._levels)
+
+    def bin_size(self, level: int) -> int:
+        return self.base_bin * self.factor**level
+
+    def add(self, block: np.ndarray) -> None:
+        """Append a block of captured frames (any dtype, mono or multichannel)."""
+        if self._finished:
+            raise ValueError("Cannot add frames to a finished pyramid.")
+        samples = _to_mono_float(block)
+        if not len(samples):
+            return
+
+        self.frames += len(samples)
+        self._last_peak = float(np.max(np.abs(samples)))
+        self._last_rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        complete = len(samples) // self.base_bin * self.base_bin
+        self._pending = samples[complete:].copy()
+        if not complete:
+            return
+
+        bins = samples[:complete].reshape(-1, self.base_bin)
+        self._levels[0].extend(
+            bins.min(axis=1),
+            bins.max(axis=1),
+            np.square(bins, dtype=np.float64).sum(axis=1),
+        )
+        self._propagate()
+
+    def latest_level(self) -> tuple[float, float]:
+        """Peak and RMS of the most recently added block, for live metering."""
+        return self._last_peak, self._last_rms
+
+    def query(self, start: int, stop: int, pixels: int) -> PeakSummary:
+        """Summarize frames [start, stop) into ``pixels`` columns."""
+        stop = min(stop, self.frames)
+        if pixels < 1 or stop <= start:
+            empty = np.zeros(0, dtype=np.float32)
+            return PeakSummary(empty, empty, empty)
+
+        frames_per_pixel = (stop - start) / pixels
+        level = 0
+        while (
+            level + 1 < len(self._levels)
+            and self.bin_size(level + 1) <= frames_per_pixel
+            and self._levels[level + 1].size
+        ):
+            level += 1
+
+        data = self._levels[level]
+        bin_size = self.bin_size(level)
+        tail = self._tail(level)
+        size = data.size + (tail is not None)
+        if not size:
+            empty = np.zeros(0, dtype=np.float32)
+            return PeakSummary(empty, empty, empty)
+
+        end = min(int(np.ceil(stop / bin_size)), size)
+        starts = np.floor(np.linspace(start, stop, pixels + 1)[:-1] / bin_size).astype(np.int64)
+        starts = np.clip(starts, 0, end - 1)
+        # reduceat returns the single element at a non-increasing index
+        bounds = np.maximum(np.append(starts[1:], end), starts + 1)
+
+        first = int(starts[0])
+        mins = data.mins[first:min(end, data.size)]
+        maxs = data.maxs[first:min(end, data.size)]
+        sumsq = data.sumsq[first:min(end, data.size)]
+        if end > data.size:
+            # The last frames haven't filled a bin at this level yet
+            mins = np.append(mins, np.float32(tail[0]))
+            maxs = np.append(maxs, np.float32(tail[1]))
+            sumsq = np.append(sumsq, tail[2])
+
+        mins = np.minimum.reduceat(mins, starts - first)
+        maxs = np.maximum.reduceat(maxs, starts - first)
+        sumsq = np.add.reduceat(sumsq, starts - first)
+
+        frames = np.minimum(bounds * bin_size, self.frames) - starts * bin_size
+        rms = np.sqrt(sumsq / frames).astype(np.float32)
+        return PeakSummary(mins, maxs, rms)
+
+    def finish(self) -> None:
+        """Fold the frames that haven't filled a bin yet into every level.
+
+        Call once the signal is complete (the recording stopped), so the last
+        partial bins are saved with the sidecar; nothing can be added after.
+        """
+        tails = [self._tail(index) for index in range(len(self._levels))]
+        for level, tail in zip(self._levels, tails):
+            if tail is not None:
+                level.extend(*(np.array([value]) for value in tail))
+        self._pending = np.empty(0, dtype=np.float32)
+        self._finished = True
+
+    def save(self, file_path: Path) -> None:
+        """Write a compact sidecar (int16 min/max, uint16 RMS per level)."""
+        arrays: dict[str, np.ndarray] = {
+            "header": np.array(
+                [self.samplerate, self.base_bin, self.factor, self.frames, len(self._levels)],
+                dtype=np.int64,
+            )
+        }
+        for index, level in enumerate(self._levels):
+            mins, maxs, sumsq = level.mins[: level.size], level.maxs[: level.size], level.sumsq[: level.size]
+            tail = self._tail(index)
+            if tail is not None:
+                # Still recording: save the partial last bin too
+                mins, maxs, sumsq = np.append(mins, tail[0]), np.append(maxs, tail[1]), np.append(sumsq, tail[2])
+            rms = np.sqrt(sumsq / self._bin_frames(index, len(sumsq)))
+            arrays[f"min{index}"] = _quantize(mins, np.int16)
+            arrays[f"max{index}"] = _quantize(maxs, np.int16)
+            arrays[f"rms{index}"] = _quantize(rms, np.uint16)
+        with open(file_path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, file_path: Path) -> PeakPyramid:
+        with np.load(file_path) as archive:
+            samplerate, base_bin, factor, frames, levels = (int(v) for v in archive["header"])
+            pyramid = cls(samplerate, base_bin=base_bin, factor=factor, max_levels=levels)
+            pyramid.frames = frames
+            pyramid._finished = True
+            for index, level in enumerate(pyramid._levels):
+                rms = archive[f"rms{index}"].astype(np.float64) / np.iinfo(np.uint16).max
+                level.extend(
+                    archive[f"min{index}"].astype(np.float32) / np.iinfo(np.int16).max,
+                    archive[f"max{index}"].astype(np.float32) / np.iinfo(np.int16).max,
+                    np.square(rms) * pyramid._bin_frames(index, len(rms)),
+                )
+        return pyramid
+
+    @classmethod
+    def from_file(cls, audio_path: Path, blocksize: int = 65536) -> PeakPyramid:
+        """Build the pyramid for an existing recording with bounded memory."""
+        with AudioReader(audio_path) as reader:
+            pyramid = cls(reader.samplerate)
+            for block in reader.blocks(blocksize):
+                pyramid.add(block)
+        pyramid.finish()
+        return pyramid
+
+    def _tail(self, index: int) -> tuple[float, float, float] | None:
+        """Min, max and sum of squares of the frames past the last bin of a level."""
+        covered = self._levels[index].size * self.bin_size(index)
+        if covered >= self.frames:
+            return None
+        if index == 0:
+            samples = self._pending
+            if not len(samples):
+                return None
+            return float(samples.min()), float(samples.max()), float(np.square(samples, dtype=np.float64).sum())
+
+        # Fewer than ``factor`` bins below haven't been merged yet, plus that level's own tail
+        below = self._levels[index - 1]
+        first = self._levels[index].size * self.factor
+        mins = list(below.mins[first: below.size])
+        maxs = list(below.maxs[first: below.size])
+        sumsq = list(below.sumsq[first: below.size])
+        tail = self._tail(index - 1)
+        if tail is not None:
+            mins.append(tail[0])
+            maxs.append(tail[1])
+            sumsq.append(tail[2])
+        if not mins:
+            return None
+        return float(min(mins)), float(max(maxs)), float(sum(sumsq))
+
+    def _bin_frames(self, index: int, size: int) -> np.ndarray:
+        """Frames summarized by each of the first ``size`` bins of a level (the last may be partial)."""
+        bin_size = self.bin_size(index)
+        counts = np.full(size, bin_size, dtype=np.int64)
+        if size:
+            counts[-1] = max(1, min(bin_size, self.frames - (size - 1) * bin_size))
+        return counts
+
+    def _propagate(self) -> None:
+        for index in range(1, len(self._levels)):
+            below = self._levels[index - 1]
+            level = self._levels[index]
+            available = below.size // self.factor
+            if available <= level.size:
+                return
+            lo = level.size * self.factor
+            hi = available * self.factor
+            level.extend(
+                below.mins[lo:hi].reshape(-1, self.factor).min(axis=1),
+                below.maxs[lo:hi].reshape(-1, self.factor).max(axis=1),
+                below.sumsq[lo:hi].reshape(-1, self.factor).sum(axis=1),
+            )
+
+
+def peaks_path_for(audio_path: Path) -> Path:
+    """Sidecar location for a recording: ``name.wav`` -> ``name.wav.peaks``."""
+    return audio_path.with_name(audio_path.name + PEAKS_SUFFIX)
+
+
+def _to_mono_float(block: np.ndarray) -> np.ndarray:
+    samples = pcm_to_float(block)
+    if samples.ndim > 1:
+        # Keep the extreme value across channels so peaks aren't averaged away
+        pick = np.argmax(np.abs(samples), axis=1)
+        samples = samples[np.arange(len(samples)), pick]
+    return samples
+
+
+def _quantize(values: np.ndarray, dtype: type) -> np.ndarray:
+    info = np.iinfo(dtype)
+    return np.clip(np.round(values * info.max), info.min, info.max).astype(dtype)
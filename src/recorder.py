@@ -3,51 +3,147 @@ from __future__ import annotations
 import queue
 import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import numpy as np
-import sounddevice as sd
 
 try:
     from .audio_utils import AudioSettings
+    from .capture_process import CaptureProcess
+    from .dsp import DspChain
+    from .peaks import PeakPyramid
 except ImportError:  # pragma: no cover
     from audio_utils import AudioSettings
+    from capture_process import CaptureProcess
+    from dsp import DspChain
+    from peaks import PeakPyramid
+
+if TYPE_CHECKING:
+    import sounddevice as sd
+
+
+# Seconds stop() waits for the collector to drain the take
+STOP_TIMEOUT = 5.0
 
 
 @dataclass
 class RecorderState:
     is_recording: bool = False
     frames: list[np.ndarray] | None = None
+    peaks: PeakPyramid | None = None
+    overflows: int = 0
+    lost_frames: int = 0  # isolated capture: frames the collector fell too far behind to read
 
 
 class AudioRecorder:
-    def __init__(self, settings: AudioSettings) -> None:
+    """Microphone capture into memory.
+
+    With ``isolated`` the stream runs in a separate CaptureProcess and blocks
+    arrive through its shared-memory ring, so CPU-heavy work in this process
+    can't cause input overruns. The process outlives each recording; call
+    ``close`` to shut it down.
+    """
+
+    def __init__(self, settings: AudioSettings, processor: DspChain | None = None, isolated: bool = False) -> None:
         self._settings = settings
+        self._isolated = isolated
+        self._capture: CaptureProcess | None = None
+        # Optional conditioning applied to every block in the collector thread
+        self.processor = processor
         self._state = RecorderState(is_recording=False, frames=[])
         self._queue: queue.Queue = queue.Queue()
         self._stream: Optional[sd.InputStream] = None
         self._worker: Optional[threading.Thread] = None
+        self._last_peaks: PeakPyramid | None = None
+        self._last_overflows = 0
+        self._last_lost_frames = 0
 
     @property
     def is_recording(self) -> bool:
         return self._state.is_recording
 
+    @property
+    def last_peaks(self) -> PeakPyramid | None:
+        """Peak index of the most recently stopped recording."""
+        return self._last_peaks
+
+    def get_level(self) -> tuple[float, float]:
+        """Current input peak and RMS (0..1) while recording."""
+        peaks = self._state.peaks
+        if not self._state.is_recording or peaks is None:
+            return 0.0, 0.0
+        return peaks.latest_level()
+
+    @property
+    def overflows(self) -> int:
+        """Blocks dropped, in the current recording or else the last one.
+
+        Counts input overruns and, with ``isolated``, reads of the ring the
+        collector lost because the capture lapped it.
+        """
+        if not self._state.is_recording:
+            return self._last_overflows
+        if self._capture is not None:
+            return self._capture.ring.overflows + self._state.overflows
+        return self._state.overflows
+
+    @property
+    def lost_frames(self) -> int:
+        """Frames missing from the current (or last) isolated recording because the collector fell behind."""
+        if not self._state.is_recording:
+            return self._last_lost_frames
+        return self._state.lost_frames
+
+    @property
+    def capture(self) -> CaptureProcess | None:
+        """The capture process of isolated recordings, e.g. to start ring workers."""
+        return self._capture
+
     def start(self) -> None:
         if self._state.is_recording:
             return
 
-        self._state = RecorderState(is_recording=True, frames=[])
+        self._state = RecorderState(
+            is_recording=True,
+            frames=[],
+            peaks=PeakPyramid(self._settings.samplerate),
+        )
         self._queue = queue.Queue()
+        if self.processor is not None:
+            self.processor.reset()
+
+        if self._isolated:
+            if self._capture is None:
+                self._capture = CaptureProcess(self._settings)
+            try:
+                self._capture.start()
+            except Exception:
+                self._capture.release()
+                self._capture = None
+                self._state.is_recording = False
+                raise
+            reader = self._capture.ring.reader()
+            self._worker = threading.Thread(
+                target=self._collect_from_ring, args=(reader, self._state), daemon=True
+            )
+            self._worker.start()
+            return
+
+        # Imported here: loading sounddevice initializes PortAudio
+        import sounddevice as sd
 
         self._stream = sd.InputStream(
             samplerate=self._settings.samplerate,
             channels=self._settings.channels,
             dtype=self._settings.dtype,
+            blocksize=self._settings.blocksize,
+            latency=self._settings.latency,
+            device=self._settings.device,
             callback=self._callback,
         )
         self._stream.start()
 
-        self._worker = threading.Thread(target=self._collect_frames, daemon=True)
+        self._worker = threading.Thread(target=self._collect_frames, args=(self._queue, self._state), daemon=True)
         print("Starting recording thread...")
         self._worker.start()
 
@@ -60,25 +156,74 @@ class AudioRecorder:
             self._stream.stop()
             self._stream.close()
             self._stream = None
+        if self._capture is not None:
+            # Closes the stream and the ring; the collector drains what's left before exiting
+            self._capture.stop()
 
         if self._worker is not None:
-            self._worker.join(timeout=1)
+            self._worker.join(timeout=STOP_TIMEOUT)
+            if self._worker.is_alive():
+                # The take keeps its own state, so a late collector can't leak into the next one
+                raise RuntimeError("Recording thread did not finish; the take is incomplete.")
             self._worker = None
+        # Kept after stop so the take's overruns can still be reported
+        self._last_overflows = self._state.overflows
+        self._last_lost_frames = self._state.lost_frames
+        if self._capture is not None:
+            self._last_overflows += self._capture.ring.overflows
 
         frames = self._state.frames or []
+        if self._state.peaks is not None:
+            self._state.peaks.finish()
+        self._last_peaks = self._state.peaks
         self._state = RecorderState(is_recording=False, frames=[])
         return frames
 
+    def close(self) -> None:
+        """Stop recording and shut down the capture process, if there is one."""
+        self.stop()
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
     def _callback(self, indata, frames, time, status) -> None:  # noqa: ARG002
         if status:
+            if status.input_overflow:
+                self._state.overflows += 1
             return
         self._queue.put(indata.copy())
 
-    def _collect_frames(self) -> None:
-        while self._state.is_recording:
+    def _collect_frames(self, blocks: queue.Queue, state: RecorderState) -> None:
+        while state.is_recording:
             try:
-                chunk = self._queue.get(timeout=0.1)
-                if self._state.frames is not None:
-                    self._state.frames.append(chunk)
+                chunk = blocks.get(timeout=0.1)
+                self._store(chunk, state)
             except queue.Empty:
                 continue
+
+    def _store(self, chunk: np.ndarray, state: RecorderState) -> None:
+        if self.processor is not None:
+            chunk = self.processor.process(chunk)
+        if state.frames is not None:
+            state.frames.append(chunk)
+        if state.peaks is not None:
+            state.peaks.add(chunk)
+
+    def _collect_from_ring(self, reader, state: RecorderState) -> None:
+        lapped = discarded = 0
+        while not reader.drained():
+            block = reader.read_wait()
+            if reader.lost_frames > lapped:
+                # The capture lapped the collector; the skipped frames are gone
+                state.overflows += 1
+                lapped = reader.lost_frames
+            if block is not None:
+                # Frames outlive the ring slot they were read from
+                chunk = block.copy()
+                if reader.still_valid():
+                    self._store(chunk, state)
+                else:
+                    # Partly overwritten by newer frames while being copied
+                    state.overflows += 1
+                    discarded += len(block)
+            state.lost_frames = lapped + discarded
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+ZERO_CROSSINGS = 16  # per side of the sinc kernel, at the lower of the two rates
+KAISER_BETA = 8.6  # ~80 dB stopband
+
+
+class StreamingResampler:
+    """Band-limited rational resampler that keeps its state across blocks.
+
+    Each output frame is a Kaiser-windowed sinc interpolation of the input
+    whose cutoff sits at the lower of the two Nyquist frequencies, so
+    downsampling doesn't fold high frequencies back into the audible band.
+    The ``target / source`` ratio is reduced to ``up / down`` and the kernel
+    is tabulated for the ``up`` phases an output frame can fall on.
+
+    Feed blocks to ``process`` and call ``flush`` once at the end to get the
+    last frames; together they return ``ceil(frames * target / source)``
+    frames, lined up with the input.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int) -> None:
+        if source_rate < 1 or target_rate < 1:
+            raise ValueError("Sample rates must be positive.")
+        divisor = gcd(source_rate, target_rate)
+        self._up = target_rate // divisor
+        self._down = source_rate // divisor
+        self._passthrough = self._up == self._down
+        self._channels: int | None = None
+        self._received = 0  # input frames seen so far
+        self._produced = 0  # output frames returned so far
+        if self._passthrough:
+            return
+
+        cutoff = min(1.0, self._up / self._down)  # fraction of the input Nyquist
+        self._half = int(np.ceil(ZERO_CROSSINGS / cutoff))
+        # Output frame n sits at input position n * down / up; taps cover the
+        # ``half`` input frames on each side of it
+        phases = np.arange(self._up)[:, None] / self._up
+        offsets = phases + self._half - 1 - np.arange(2 * self._half)[None, :]
+        window = np.i0(KAISER_BETA * np.sqrt(np.clip(1.0 - (offsets / self._half) ** 2, 0.0, None)))
+        kernel = cutoff * np.sinc(cutoff * offsets) * window / np.i0(KAISER_BETA)
+        # Unity gain at DC for every phase
+        self._kernel = (kernel / kernel.sum(axis=1, keepdims=True)).astype(np.float32)
+        self._buffer: np.ndarray | None = None
+        self._offset = -self._half  # input index of _buffer[0]; the stream starts after silence
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample a (frames, channels) float block; may return fewer frames than it will owe."""
+        block = np.asarray(block, dtype=np.float32)
+        if self._channels is None:
+            self._channels = block.shape[1]
+        self._received += len(block)
+        if self._passthrough:
+            self._produced += len(block)
+            return block
+
+        if self._buffer is None:
+            self._buffer = np.zeros((self._half, self._channels), dtype=np.float32)
+        self._buffer = np.concatenate((self._buffer, block))
+        return self._emit(self._received)
+
+    def flush(self) -> np.ndarray:
+        """Return the frames still owed at the end of the stream."""
+        channels = self._channels or 1
+        if self._passthrough or self._buffer is None:
+            return np.zeros((0, channels), dtype=np.float32)
+        # Pad with silence so the last frames have their right-hand taps
+        self._buffer = np.concatenate((self._buffer, np.zeros((self._half, channels), dtype=np.float32)))
+        total = -(-self._received * self._up // self._down)
+        return self._emit(self._received + self._half, total)
+
+    def _emit(self, end: int, total: int | None = None) -> np.ndarray:
+        """Compute every output frame whose taps lie before input index ``end``."""
+        assert self._buffer is not None
+        last_center = end - self._half - 1
+        stop = ((last_center + 1) * self._up - 1) // self._down + 1
+        if total is not None:
+            stop = min(stop, total)
+
+        count = max(0, stop - self._produced)
+        output = np.empty((count, self._buffer.shape[1]), dtype=np.float32)
+        if not count:
+            return output
+        windows = sliding_window_view(self._buffer, 2 * self._half, axis=0)  # (frames, channels, taps)
+        # Frames ``up`` apart share a kernel phase and their centers are ``down``
+        # input frames apart, so each phase is one strided matrix product
+        for index in range(min(self._up, count)):
+            center, phase = divmod((self._produced + index) * self._down, self._up)
+            first = center - self._half + 1 - self._offset
+            rows = windows[first::self._down][: len(range(index, count, self._up))]
+            output[index::self._up] = rows @ self._kernel[phase]
+        self._produced = max(self._produced, stop)
+
+        # Drop input no later output frame reaches
+        keep_from = self._produced * self._down // self._up - self._half + 1
+        if keep_from > self._offset:
+            self._buffer = self._buffer[keep_from - self._offset:]
+            self._offset = keep_from
+
+        return output
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Resample a whole float signal, mono (frames,) or (frames, channels)."""
+    samples = np.asarray(samples, dtype=np.float32)
+    if source_rate == target_rate:
+        return samples
+    resampler = StreamingResampler(source_rate, target_rate)
+    frames = samples.reshape(len(samples), -1)
+    output = np.concatenate((resampler.process(frames), resampler.flush()))
+    return output[:, 0] if samples.ndim == 1 else output
+
+
+def pcm_to_float(samples: np.ndarray) -> np.ndarray:
+    """Float32 samples in [-1, 1); integer PCM is divided by 2**(bits - 1), as everywhere in the app."""
+    samples = np.asarray(samples)
+    if samples.dtype.kind in "iu":
+        return (samples.astype(np.float32) / float(2 ** (8 * samples.dtype.itemsize - 1))).astype(np.float32)
+    return samples.astype(np.float32, copy=False)
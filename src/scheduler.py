@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+try:
+    from .backend_pool import REQUEST
+except ImportError:  # pragma: no cover
+    from backend_pool import REQUEST
+
+if TYPE_CHECKING:
+    from .adaptive_limit import AdaptiveLimiter
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+
+DEFAULT_LIMITS = {INTERACTIVE: 4, NORMAL: 4, BULK: 3}
+DEFAULT_WEIGHTS = {INTERACTIVE: 16.0, NORMAL: 4.0, BULK: 1.0}
+
+
+class RequestScheduler:
+    """Admission control for requests sent to the Speaches server.
+
+    At most ``max_concurrency`` requests run at once, and each priority class
+    has its own concurrency limit (``None`` means unlimited). Free slots go to
+    queued requests by weighted fair queueing: interactive work is dispatched
+    far more often than bulk work, but bulk work is never starved and keeps the
+    server busy when nothing else is waiting. With a ``limiter`` the total is
+    tuned from the latency and errors of the requests run in each slot instead
+    of being fixed.
+
+    Priorities only order requests made within one process: the GUI and a
+    batch job running as separate processes each have their own scheduler and
+    don't see each other's queue.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = 4,
+        limits: dict[str, int | None] | None = None,
+        weights: dict[str, float] | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        queue_timeout: float | None = None,
+    ) -> None:
+        if limiter is not None:
+            max_concurrency = limiter.limit
+        _validate_limit(max_concurrency)
+
+        self._max_concurrency = max_concurrency
+        self._queue_timeout = queue_timeout
+        self._limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self._queues: dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+        self._running: dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self._virtual_time: dict[str, float] = {priority: 0.0 for priority in PRIORITIES}
+        self._virtual_now = 0.0
+        self._total_running = 0
+        self._granted: set[object] = set()
+        self._limiter = limiter
+        self._condition = threading.Condition()
+
+    @property
+    def max_concurrency(self) -> int | None:
+        return self._max_concurrency
+
+    @property
+    def limiter(self) -> AdaptiveLimiter | None:
+        return self._limiter
+
+    def set_max_concurrency(self, max_concurrency: int | None) -> None:
+        """Change the total number of concurrent requests (None for no limit)."""
+        _validate_limit(max_concurrency)
+        with self._condition:
+            self._max_concurrency = max_concurrency
+            self._dispatch()
+
+    @contextmanager
+    def slot(
+        self,
+        priority: str = NORMAL,
+        timeout: float | None = None,
+        cost: float | None = None,
+        unit: str = REQUEST,
+    ) -> Iterator[None]:
+        """Context manager holding one request slot for the given priority class.
+
+        Raises TimeoutError if no slot frees up within ``timeout`` seconds
+        (default: the scheduler's ``queue_timeout``). ``cost`` is the size of
+        the work done in the slot, in ``unit`` (as for ``BackendPool.call``),
+        so the limiter can compare the latency of requests of different sizes.
+        """
+        if not self.acquire(priority, timeout):
+            raise TimeoutError(f"No {priority} request slot became free in time.")
+        if self._limiter is None:
+            try:
+                yield
+            finally:
+                self.release(priority)
+            return
+
+        started = self._limiter.now()
+        error: BaseException | None = None
+        try:
+            yield
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            with self._condition:
+                in_flight = self._total_running
+            limit = self._limiter.record(started, in_flight, error, cost=cost, unit=unit)
+            if limit != self._max_concurrency:
+                self.set_max_concurrency(limit)
+            self.release(priority)
+
+    def acquire(self, priority: str = NORMAL, timeout: float | None = None) -> bool:
+        """Block until a request of the given priority class may run.
+
+        Returns False, leaving the queue, if that takes longer than ``timeout``
+        seconds (default: the scheduler's ``queue_timeout``; None waits forever).
+        """
+        _validate_priority(priority)
+        if timeout is None:
+            timeout = self._queue_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+        with self._condition:
+            if not self._queues[priority] and self._running[priority] == 0:
+                # An idle class rejoins at the current virtual time instead of
+                # cashing in credit accumulated while it was idle
+                self._virtual_time[priority] = max(self._virtual_time[priority], self._virtual_now)
+            self._queues[priority].append(ticket)
+            self._dispatch()
+            while ticket not in self._granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._queues[priority].remove(ticket)
+                    return False
+                self._condition.wait(remaining)
+            self._granted.remove(ticket)
+            return True
+
+    def release(self, priority: str = NORMAL) -> None:
+        """Return a slot obtained with acquire()."""
+        with self._condition:
+            self._running[priority] -= 1
+            self._total_running -= 1
+            self._dispatch()
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """Get running and queued request counts per priority class."""
+        with self._condition:
+            return {
+                priority: {
+                    "running": self._running[priority],
+                    "queued": len(self._queues[priority]),
+                }
+                for priority in PRIORITIES
+            }
+
+    def _dispatch(self) -> None:
+        dispatched = False
+        while self._max_concurrency is None or self._total_running < self._max_concurrency:
+            candidates = [
+                priority
+                for priority in PRIORITIES
+                if self._queues[priority]
+                and (self._limits[priority] is None or self._running[priority] < self._limits[priority])
+            ]
+            if not candidates:
+                break
+
+            priority = min(candidates, key=lambda p: (self._virtual_time[p], PRIORITIES.index(p)))
+            ticket = self._queues[priority].popleft()
+            self._running[priority] += 1
+            self._total_running += 1
+            self._virtual_now = self._virtual_time[priority]
+            self._virtual_time[priority] += 1.0 / self._weights[priority]
+            self._granted.add(ticket)
+            dispatched = True
+
+        if dispatched:
+            self._condition.notify_all()
+
+
+_default_scheduler: RequestScheduler | None = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    """Scheduler shared by every client in this process that isn't given one explicitly.
+
+    Interactive and normal requests are never queued by it, so it doesn't cap
+    the app or a pool of several backends; bulk requests are limited to
+    ``DEFAULT_LIMITS[BULK]`` at a time, so batch work can't flood the server
+    and always leaves headroom for interactive requests. Pass a configured
+    ``RequestScheduler`` (or an adaptive one) for other limits.
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler(
+                max_concurrency=None, limits={INTERACTIVE: None, NORMAL: None, BULK: DEFAULT_LIMITS[BULK]}
+            )
+        return _default_scheduler
+
+
+def _validate_limit(limit: int | None) -> None:
+    if limit is not None and limit < 1:
+        raise ValueError("max_concurrency must be at least 1.")
+
+
+def _validate_priority(priority: str) -> None:
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority class: {priority}")
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Header: int64 slots at the start of the segment, data follows
+_HEADER_SLOTS = 8
+_HEADER_BYTES = _HEADER_SLOTS * 8
+_WRITTEN, _CLOSED, _OVERFLOWS, _STREAM_START = 0, 1, 2, 3
+
+
+@dataclass(frozen=True)
+class RingSpec:
+    """Everything another process needs to attach to a ring (picklable)."""
+
+    name: str
+    capacity: int  # frames
+    channels: int
+    dtype: str
+    samplerate: int
+
+
+class SharedRingBuffer:
+    """Single-producer, multi-consumer ring of audio frames in shared memory.
+
+    The producer copies each block in and then advances a monotonic frame
+    counter; consumers keep their own position and read numpy views straight
+    out of the segment. The counter is one aligned int64 and is only written
+    after the data, so a reader never sees frames that aren't there yet. A
+    reader that falls more than ``capacity`` frames behind is moved forward
+    and the lost frames are counted.
+
+    One ring can carry several streams in turn (one per recording): ``close``
+    ends the current one and ``reopen`` starts the next, and new readers
+    start at the beginning of the current stream.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, spec: RingSpec, owner: bool) -> None:
+        self.spec = spec
+        self._shm = shm
+        self._owner = owner
+        self._header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        self._data = np.ndarray(
+            (spec.capacity, spec.channels), dtype=np.dtype(spec.dtype), buffer=shm.buf, offset=_HEADER_BYTES
+        )
+
+    @classmethod
+    def create(cls, capacity: int, channels: int, dtype: str = "int16", samplerate: int = 44100) -> SharedRingBuffer:
+        size = _HEADER_BYTES + capacity * channels * np.dtype(dtype).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        ring = cls(shm, RingSpec(shm.name, capacity, channels, dtype, samplerate), owner=True)
+        ring._header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, spec: RingSpec) -> SharedRingBuffer:
+        return cls(shared_memory.SharedMemory(name=spec.name), spec, owner=False)
+
+    @property
+    def written(self) -> int:
+        """Total frames written since the ring was created."""
+        return int(self._header[_WRITTEN])
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._header[_CLOSED])
+
+    @property
+    def overflows(self) -> int:
+        """Input overruns counted by the producer in the current stream."""
+        return int(self._header[_OVERFLOWS])
+
+    @property
+    def stream_start(self) -> int:
+        """Frame counter value at which the current stream began."""
+        return int(self._header[_STREAM_START])
+
+    def write(self, block: np.ndarray) -> None:
+        capacity = self.spec.capacity
+        count = len(block)
+        position = self.written
+        if count > capacity:
+            # Only the newest ``capacity`` frames can survive anyway
+            position += count - capacity
+            block = block[-capacity:]
+            count = capacity
+        start = position % capacity
+        first = min(count, capacity - start)
+        self._data[start:start + first] = block[:first]
+        self._data[:count - first] = block[first:]
+        self._header[_WRITTEN] = position + count
+
+    def count_overflow(self) -> None:
+        self._header[_OVERFLOWS] += 1
+
+    def close(self) -> None:
+        """Mark the end of the stream; readers drain what's left and stop."""
+        self._header[_CLOSED] = 1
+
+    def reopen(self) -> None:
+        """Start a new stream after ``close``; frames written from now on belong to it."""
+        self._header[_STREAM_START] = self._header[_WRITTEN]
+        self._header[_OVERFLOWS] = 0
+        self._header[_CLOSED] = 0
+
+    def reader(self, position: int | None = None) -> RingReader:
+        """Cursor at ``position``, by default the start of the current stream."""
+        return RingReader(self, self.stream_start if position is None else position)
+
+    def release(self) -> None:
+        """Detach from the segment; the creating side also frees it."""
+        # Views into the buffer must be dropped before the mapping can close
+        self._header = None  # type: ignore[assignment]
+        self._data = None  # type: ignore[assignment]
+        try:
+            self._shm.close()
+        except BufferError:
+            # A consumer still holds a view; the mapping goes away when it's collected
+            pass
+        if self._owner:
+            self._shm.unlink()
+
+
+class RingReader:
+    """One consumer's cursor into a SharedRingBuffer."""
+
+    def __init__(self, ring: SharedRingBuffer, position: int = 0) -> None:
+        self._ring = ring
+        self.position = position
+        self.lost_frames = 0
+        self._last_start = position
+
+    def read(self, max_frames: int | None = None) -> np.ndarray | None:
+        """Next contiguous run of frames as a zero-copy view, or None if nothing is new.
+
+        The view is only valid until the producer laps it; copy it (or check
+        ``still_valid``) if it has to outlive a ring's worth of capture.
+        """
+        ring = self._ring
+        capacity = ring.spec.capacity
+        written = ring.written
+        if written - self.position > capacity:
+            self.lost_frames += written - capacity - self.position
+            self.position = written - capacity
+        available = written - self.position
+        if available <= 0:
+            return None
+        start = self.position % capacity
+        count = min(available, capacity - start)
+        if max_frames is not None:
+            count = min(count, max_frames)
+        self._last_start = self.position
+        self.position += count
+        return ring._data[start:start + count]
+
+    def still_valid(self) -> bool:
+        """Whether the last view returned by ``read`` hasn't been overwritten yet."""
+        return self._ring.written <= self._last_start + self._ring.spec.capacity
+
+    def read_wait(self, max_frames: int | None = None, timeout: float = 0.1, poll: float = 0.005) -> np.ndarray | None:
+        """Like ``read`` but polls up to ``timeout`` seconds for new frames."""
+        deadline = time.monotonic() + timeout
+        while True:
+            block = self.read(max_frames)
+            if block is not None or self._ring.closed or time.monotonic() >= deadline:
+                return block
+            time.sleep(poll)
+
+    def drained(self) -> bool:
+        """True once the producer closed the ring and every frame was read."""
+        return self._ring.closed and self.position >= self._ring.written
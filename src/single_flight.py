@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Callable, Hashable, Iterable, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still running wait and receive the same result (or exception). Once the
+    call finishes the key is forgotten, so this is deduplication, not caching.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Number of distinct keys currently being executed."""
+        with self._lock:
+            return len(self._calls)
+
+
+def frames_digest(frames: Iterable[np.ndarray]) -> str:
+    """Content hash of captured frames, used as a coalescing key."""
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        digest.update(str(frame.shape).encode())
+        digest.update(memoryview(np.ascontiguousarray(frame)).cast("B"))
+    return digest.hexdigest()
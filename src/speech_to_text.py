@@ -1,94 +1,241 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Sequence, TypeVar
 
-import requests
+import numpy as np
+
+try:
+    from .audio_utils import AudioSettings
+    from .backend_pool import AUDIO_SECONDS, HEALTH_INTERVAL, BackendPool
+    from .catalog import RecordingCatalog
+    from .micro_batch import transcribe_packed
+    from .scheduler import NORMAL, PRIORITIES, RequestScheduler, get_default_scheduler
+    from .single_flight import SingleFlight, frames_digest
+    from .stt_backends import SpeachesBackend, TranscriptionBackend, audio_duration, create_backend
+    from .transcript import WINDOW_SECONDS, Segment, Transcript, stream_segments
+except ImportError:  # pragma: no cover
+    from audio_utils import AudioSettings
+    from backend_pool import AUDIO_SECONDS, HEALTH_INTERVAL, BackendPool
+    from catalog import RecordingCatalog
+    from micro_batch import transcribe_packed
+    from scheduler import NORMAL, PRIORITIES, RequestScheduler, get_default_scheduler
+    from single_flight import SingleFlight, frames_digest
+    from stt_backends import SpeachesBackend, TranscriptionBackend, audio_duration, create_backend
+    from transcript import WINDOW_SECONDS, Segment, Transcript, stream_segments
+
+T = TypeVar("T")
 
 
 class SpeechToText:
-    def __init__(self, api_base_url: str = "http://localhost:8000") -> None:
-        self._api_base_url = api_base_url.rstrip("/")
-        self._transcribe_endpoint = f"{self._api_base_url}/v1/audio/transcriptions"
-        self._models_endpoint = f"{self._api_base_url}/v1/models"
-        self._model = "whisper-1"
-        self._supported_languages: list[str] = []
-        self._load_model_from_api()
-
-    def _download_default_model(self) -> None:
-        """Download default STT model if none exists."""
-        try:
-            model_id = "Systran%2Ffaster-whisper-large-v3"
-            download_url = f"{self._api_base_url}/v1/models/{model_id}"
-            response = requests.post(download_url, timeout=30)
-            response.raise_for_status()
-        except Exception:
-            # If download fails, continue with fallback
-            pass
-    
-    def _load_model_from_api(self) -> None:
-        """Load first STT model from API with supported languages."""
-        try:
-            params = {"task": "automatic-speech-recognition"}
-            response = requests.get(self._models_endpoint, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            models = data.get("data", [])
-            
-            # If no models found, try to download default model
-            if not models or len(models) == 0:
-                self._download_default_model()
-                # Try again after download
-                response = requests.get(self._models_endpoint, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                models = data.get("data", [])
-            
-            if models and len(models) > 0:
-                first_model = models[0]
-                self._model = first_model.get("id", "whisper-1")
-                self._supported_languages = first_model.get("language", [])
-            else:
-                # Fallback
-                self._model = "whisper-1"
-                self._supported_languages = []
-        except Exception:
-            # Fallback to default
-            self._model = "whisper-1"
-            self._supported_languages = []
-    
+    """Transcription client: the Speaches API by default, or an in-process ``backend``.
+
+    ``backend`` is a ``TranscriptionBackend`` or a configuration name
+    ("speaches", "local"); every request goes through the backend, holding a
+    slot of the ``scheduler`` while it runs.
+    """
+
+    def __init__(
+        self,
+        api_base_url: str | Sequence[str] | BackendPool = "http://localhost:8000",
+        scheduler: RequestScheduler | None = None,
+        priority: str = NORMAL,
+        catalog: RecordingCatalog | None = None,
+        backend: str | TranscriptionBackend | None = None,
+    ) -> None:
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioridade desconhecida: {priority}")
+        self._pool = api_base_url if isinstance(api_base_url, BackendPool) else BackendPool(api_base_url, health_interval=HEALTH_INTERVAL)
+        self._scheduler = scheduler or get_default_scheduler()
+        self._priority = priority
+        self._api_base_url = self._pool.primary_url
+        self._in_flight = SingleFlight()
+        self._catalog = catalog
+        if backend is None or isinstance(backend, str):
+            backend = create_backend(backend)
+        if backend is None:
+            backend = SpeachesBackend(self._pool)
+            with self._scheduler.slot(self._priority):
+                backend.load_model()
+        self._backend: TranscriptionBackend = backend
+
+    @property
+    def model(self) -> str:
+        return self._backend.model
+
+    @property
+    def is_local(self) -> bool:
+        return self._backend.is_local
+
+    def warm_up(self) -> None:
+        """Load an in-process model ahead of the first transcription; no-op for the API."""
+        self._run(self._backend.warm_up)
+
     def get_supported_languages(self) -> list[str]:
         """Get list of supported language codes."""
-        return self._supported_languages
+        return self._backend.supported_languages
 
     def transcribe_file(self, audio_file: Path, language: str = "pt") -> str:
-        """Transcribe audio file to text using Speaches API."""
+        """Transcribe audio file to text using Speaches API.
+
+        Concurrent calls for the same unchanged file share one request.
+        """
+        def do_transcribe() -> str:
+            with open(audio_file, "rb") as f:
+                return self.transcribe_buffer(f, filename=audio_file.name, language=language)
+
+        try:
+            stat = audio_file.stat()
+            key = ("file", str(audio_file.resolve()), stat.st_size, stat.st_mtime_ns, language, self.model)
+            text = self._in_flight.do(key, do_transcribe)
+        except ValueError:
+            raise
+        except Exception as exc:
+            raise ValueError(f"Erro ao processar arquivo: {exc}")
+        self._record_transcript(audio_file, text, language)
+        return text
+
+    def transcribe_frames(
+        self,
+        frames: list[np.ndarray],
+        settings: AudioSettings,
+        language: str = "pt",
+        source_path: Path | None = None,
+    ) -> str:
+        """Transcribe captured frames directly from memory, skipping the disk round-trip.
+
+        Concurrent calls for the same frames share one request. ``source_path``
+        is the file the frames are (being) saved to, used for the catalog.
+        """
+        def do_transcribe() -> str:
+            return self._run(
+                lambda: self._backend.transcribe_frames(frames, settings.samplerate, language),
+                cost=sum(len(frame) for frame in frames) / settings.samplerate,
+            )
+
+        key = ("frames", frames_digest(frames), settings.samplerate, language, self.model)
+        text = self._in_flight.do(key, do_transcribe)
+        if source_path is not None:
+            self._record_transcript(source_path, text, language)
+        return text
+
+    def _record_transcript(self, audio_file: Path, text: str, language: str) -> None:
+        if self._catalog is None:
+            return
+        try:
+            self._catalog.set_transcript(audio_file, text, language)
+        except Exception:
+            # The catalog is an index; a failure there must not lose the transcription
+            pass
+
+    def transcribe_buffer(
+        self,
+        buffer: BinaryIO,
+        filename: str = "audio.wav",
+        language: str = "pt",
+    ) -> str:
+        """Transcribe an already encoded audio buffer."""
+        return self._run(
+            lambda: self._backend.transcribe_buffer(buffer, filename, language), cost=audio_duration(buffer)
+        )
+
+    def transcribe_verbose(
+        self,
+        buffer: BinaryIO,
+        filename: str = "audio.wav",
+        language: str = "pt",
+        word_timestamps: bool = False,
+    ) -> dict:
+        """Transcribe a buffer returning the verbose_json result (text, segments and, optionally, words)."""
+        return self._run(
+            lambda: self._backend.transcribe_verbose(buffer, filename, language, word_timestamps),
+            cost=audio_duration(buffer),
+        )
+
+    def transcribe_result(self, audio_file: Path, language: str = "pt", word_timestamps: bool = True) -> Transcript:
+        """Transcribe a file keeping segment (and word) timestamps, in one request."""
         try:
             with open(audio_file, "rb") as f:
-                files = {"file": (audio_file.name, f, "audio/wav")}
-                data = {
-                    "model": self._model,
-                    "language": language,
-                }
-                
-                response = requests.post(
-                    self._transcribe_endpoint,
-                    files=files,
-                    data=data,
-                    timeout=60,
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                return result.get("text", "")
-        except requests.exceptions.HTTPError as exc:
-            error_detail = ""
-            try:
-                error_detail = exc.response.json()
-            except Exception:
-                error_detail = exc.response.text
-            raise ValueError(f"Erro na API de transcrição ({exc.response.status_code}): {error_detail}")
-        except requests.exceptions.RequestException as exc:
-            raise ValueError(f"Erro na API de transcrição: {exc}")
+                result = self.transcribe_verbose(f, audio_file.name, language, word_timestamps=word_timestamps)
+        except ValueError:
+            raise
         except Exception as exc:
             raise ValueError(f"Erro ao processar arquivo: {exc}")
+        transcript = Transcript.from_verbose(result)
+        self._record_transcript(audio_file, transcript.text, language)
+        return transcript
+
+    def iter_segments(
+        self,
+        audio_file: Path,
+        language: str = "pt",
+        word_timestamps: bool = False,
+        window_seconds: float = WINDOW_SECONDS,
+    ) -> Iterator[Segment]:
+        """Transcribe a file progressively, yielding timed segments as they are decoded.
+
+        The whole file goes in one request whose segments are streamed back
+        (Speaches' ``stream=true``, or a local model's decoder). Backends that
+        can't stream get windows of about ``window_seconds`` cut at pauses
+        instead, so the first segments still arrive after one window.
+        """
+        if hasattr(self._backend, "stream_verbose"):
+            segments = self._stream_file(Path(audio_file), language, word_timestamps)
+        else:
+            segments = stream_segments(self, audio_file, language, word_timestamps, window_seconds=window_seconds)
+        texts = []
+        for segment in segments:
+            texts.append(segment.text)
+            yield segment
+        self._record_transcript(Path(audio_file), " ".join(text for text in texts if text), language)
+
+    def _stream_file(self, audio_file: Path, language: str, word_timestamps: bool) -> Iterator[Segment]:
+        try:
+            upload = open(audio_file, "rb")
+        except OSError as exc:
+            raise ValueError(f"Erro ao processar arquivo: {exc}")
+        with upload:
+            # The slot is held until the last segment is in
+            try:
+                with self._scheduler.slot(self._priority, cost=audio_duration(upload), unit=AUDIO_SECONDS):
+                    next_id = 0
+                    for result in self._backend.stream_verbose(upload, audio_file.name, language, word_timestamps):
+                        for segment in Transcript.from_verbose(result).segments:
+                            yield replace(segment, id=next_id)
+                            next_id += 1
+            except ValueError:
+                raise
+            except Exception as exc:
+                raise ValueError(f"Erro na transcrição: {exc}")
+
+    def transcribe_files(
+        self,
+        audio_files: Sequence[Path],
+        language: str = "pt",
+        pack: bool = False,
+        max_clip_seconds: float = 5.0,
+    ) -> list[str]:
+        """Transcribe several files, in order.
+
+        With ``pack`` short clips (up to ``max_clip_seconds``) are
+        concatenated into a few uploads and split back by timestamps, which
+        is much faster for many 1-3 s clips; longer files go one by one.
+        """
+        if not pack:
+            return [self.transcribe_file(audio_file, language) for audio_file in audio_files]
+
+        texts = transcribe_packed(self, audio_files, language, max_clip_seconds=max_clip_seconds)
+        for audio_file, text in zip(audio_files, texts):
+            self._record_transcript(audio_file, text, language)
+        return texts
+
+    def _run(self, request: Callable[[], T], cost: float | None = None) -> T:
+        # ``cost`` (seconds of audio) lets an adaptive scheduler tell long clips from a slow server
+        try:
+            with self._scheduler.slot(self._priority, cost=cost, unit=AUDIO_SECONDS):
+                return request()
+        except ValueError:
+            raise
+        except Exception as exc:
+            raise ValueError(f"Erro na transcrição: {exc}")
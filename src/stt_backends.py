@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, BinaryIO, Iterator, Protocol
+
+import numpy as np
+import requests
+import soundfile as sf
+
+try:
+    from .audio_utils import AudioSettings, encode_wav_buffer
+    from .backend_pool import AUDIO_SECONDS, BackendPool
+    from .resample import pcm_to_float, resample
+except ImportError:  # pragma: no cover
+    from audio_utils import AudioSettings, encode_wav_buffer
+    from backend_pool import AUDIO_SECONDS, BackendPool
+    from resample import pcm_to_float, resample
+
+WHISPER_SAMPLERATE = 16000
+DEFAULT_LOCAL_MODEL = "small"
+
+
+class TranscriptionBackend(Protocol):
+    """Speech recognizer behind ``SpeechToText``: the Speaches API or an in-process model.
+
+    Backends may also offer ``stream_verbose(buffer, filename, language,
+    word_timestamps)``, yielding verbose_json-shaped results segment by
+    segment as they are decoded; without it long files are streamed by
+    sending windows.
+    """
+
+    model: str
+    is_local: bool
+
+    @property
+    def supported_languages(self) -> list[str]: ...
+
+    def warm_up(self) -> None: ...
+
+    def transcribe_frames(self, frames: list[np.ndarray], samplerate: int, language: str) -> str: ...
+
+    def transcribe_buffer(self, buffer: BinaryIO, filename: str, language: str) -> str: ...
+
+    def transcribe_verbose(
+        self, buffer: BinaryIO, filename: str, language: str, word_timestamps: bool = False
+    ) -> dict: ...
+
+
+class SpeachesBackend:
+    """The Speaches server's OpenAI-compatible API, spread over a ``BackendPool``.
+
+    Encoded audio is uploaded as it is and captured frames as a PCM_16 WAV.
+    ``load_model`` picks the first speech recognition model the server lists.
+    """
+
+    is_local = False
+
+    def __init__(self, pool: BackendPool) -> None:
+        self._pool = pool
+        self._transcribe_path = "/v1/audio/transcriptions"
+        self._models_path = "/v1/models"
+        self.model = "whisper-1"
+        self._supported_languages: list[str] = []
+
+    @property
+    def supported_languages(self) -> list[str]:
+        return self._supported_languages
+
+    def warm_up(self) -> None:
+        """No-op: the server loads its model on the first request."""
+
+    def _download_default_model(self, base_url: str) -> None:
+        """Download default STT model if none exists."""
+        try:
+            model_id = "Systran%2Ffaster-whisper-large-v3"
+            download_url = f"{base_url}{self._models_path}/{model_id}"
+            response = requests.post(download_url, timeout=30)
+            response.raise_for_status()
+        except Exception:
+            # If download fails, continue with fallback
+            pass
+
+    def load_model(self) -> None:
+        """Load first STT model from API with supported languages."""
+        try:
+            params = {"task": "automatic-speech-recognition"}
+
+            def fetch_models(base_url: str) -> list:
+                models_endpoint = f"{base_url}{self._models_path}"
+                response = requests.get(models_endpoint, params=params, timeout=10)
+                response.raise_for_status()
+                data = response.json()
+
+                models = data.get("data", [])
+
+                # If no models found, try to download default model
+                if not models or len(models) == 0:
+                    self._download_default_model(base_url)
+                    # Try again after download
+                    response = requests.get(models_endpoint, params=params, timeout=10)
+                    response.raise_for_status()
+                    data = response.json()
+                    models = data.get("data", [])
+                return models
+
+            models = self._pool.call(fetch_models)
+
+            if models and len(models) > 0:
+                first_model = models[0]
+                self.model = first_model.get("id", "whisper-1")
+                self._supported_languages = first_model.get("language", [])
+            else:
+                # Fallback
+                self.model = "whisper-1"
+                self._supported_languages = []
+        except Exception:
+            # Fallback to default
+            self.model = "whisper-1"
+            self._supported_languages = []
+
+    def transcribe_frames(self, frames: list[np.ndarray], samplerate: int, language: str) -> str:
+        try:
+            buffer = encode_wav_buffer(frames, AudioSettings(samplerate=samplerate))
+        except Exception as exc:
+            raise ValueError(f"Erro ao processar áudio: {exc}")
+        return self.transcribe_buffer(buffer, "recording.wav", language)
+
+    def transcribe_buffer(self, buffer: BinaryIO, filename: str, language: str) -> str:
+        data = {
+            "model": self.model,
+            "language": language,
+        }
+        return self._post(buffer, filename, data).get("text", "")
+
+    def transcribe_verbose(
+        self, buffer: BinaryIO, filename: str, language: str, word_timestamps: bool = False
+    ) -> dict:
+        data = {
+            "model": self.model,
+            "language": language,
+            "response_format": "verbose_json",
+            "timestamp_granularities[]": ["segment", "word"] if word_timestamps else ["segment"],
+        }
+        return self._post(buffer, filename, data)
+
+    def stream_verbose(
+        self, buffer: BinaryIO, filename: str, language: str, word_timestamps: bool = False
+    ) -> Iterator[dict]:
+        """Transcribe with ``stream=true``: one verbose_json result per segment, as the server decodes it.
+
+        Speaches answers with server-sent events; a server that ignores the
+        flag sends one ordinary response, which is yielded whole. The pool
+        only times the connection, since the rest depends on the reader.
+        """
+        data = {
+            "model": self.model,
+            "language": language,
+            "response_format": "verbose_json",
+            "timestamp_granularities[]": ["segment", "word"] if word_timestamps else ["segment"],
+            "stream": "true",
+        }
+        try:
+            with self._post(buffer, filename, data, stream=True) as response:
+                if not response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                    yield response.json()
+                    return
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        return
+                    yield json.loads(payload)
+        except requests.exceptions.RequestException as exc:
+            raise ValueError(f"Erro na API de transcrição: {exc}") from exc
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Resposta inválida da API de transcrição: {exc}") from exc
+
+    def _post(self, buffer: BinaryIO, filename: str, data: dict, stream: bool = False) -> Any:
+        """POST an upload; the parsed JSON, or with ``stream`` the open response."""
+        try:
+            position = buffer.tell()
+            audio_seconds = None if stream else audio_duration(buffer)
+
+            def send(base_url: str) -> Any:
+                # A retry on another backend has to upload the whole file again
+                buffer.seek(position)
+                files = {"file": (filename, buffer, "audio/wav")}
+                options = {"stream": True} if stream else {}
+                response = requests.post(
+                    f"{base_url}{self._transcribe_path}",
+                    files=files,
+                    data=data,
+                    timeout=60,
+                    **options,
+                )
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.HTTPError:
+                    response.close()
+                    raise
+                return response if stream else response.json()
+
+            return self._pool.call(send, cost=audio_seconds, unit=AUDIO_SECONDS)
+        except requests.exceptions.HTTPError as exc:
+            error_detail = ""
+            try:
+                error_detail = exc.response.json()
+            except Exception:
+                error_detail = exc.response.text
+            raise ValueError(f"Erro na API de transcrição ({exc.response.status_code}): {error_detail}") from exc
+        except requests.exceptions.RequestException as exc:
+            raise ValueError(f"Erro na API de transcrição: {exc}") from exc
+        except Exception as exc:
+            raise ValueError(f"Erro ao processar arquivo: {exc}")
+
+
+class LocalWhisperBackend:
+    """Whisper running on the CPU through faster-whisper (CTranslate2).
+
+    The model is loaded once, on first use or ``warm_up``, and reused by every
+    call, so short clips only pay for inference. Install it with
+    ``pip install faster-whisper``; ``model`` is a size name ("small",
+    "large-v3"...), a Hugging Face repo id or a local CTranslate2 directory.
+    """
+
+    is_local = True
+
+    def __init__(
+        self,
+        model: str = DEFAULT_LOCAL_MODEL,
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+        beam_size: int = 5,
+    ) -> None:
+        self.model = model
+        self._device = device
+        self._compute_type = compute_type
+        self._cpu_threads = cpu_threads
+        self._num_workers = num_workers
+        self._beam_size = beam_size
+        self._whisper: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._whisper is not None
+
+    @property
+    def supported_languages(self) -> list[str]:
+        if self._whisper is None:
+            return []
+        return list(getattr(self._whisper, "supported_languages", []))
+
+    def warm_up(self) -> None:
+        """Load the model and run it once on silence so the first real call is fast."""
+        self.transcribe_samples(np.zeros(WHISPER_SAMPLERATE, dtype=np.float32), WHISPER_SAMPLERATE, "pt")
+
+    def transcribe_samples(self, samples: np.ndarray, samplerate: int, language: str) -> str:
+        whisper = self._load()
+        audio = to_whisper_input(samples, samplerate)
+        segments, _ = whisper.transcribe(audio, language=language or None, beam_size=self._beam_size)
+        # Same joining as the Speaches server, so both backends return identical text
+        return "".join(segment.text for segment in segments).strip()
+
+    def transcribe_frames(self, frames: list[np.ndarray], samplerate: int, language: str) -> str:
+        # The samples are used as they are, no WAV round-trip
+        samples = np.concatenate(frames) if frames else np.zeros(0, dtype=np.float32)
+        return self.transcribe_samples(samples, samplerate, language)
+
+    def transcribe_buffer(self, buffer: BinaryIO, filename: str, language: str) -> str:  # noqa: ARG002
+        return self.transcribe_samples(*_decode(buffer), language)
+
+    def transcribe_verbose(
+        self, buffer: BinaryIO, filename: str, language: str, word_timestamps: bool = False  # noqa: ARG002
+    ) -> dict:
+        """Same shape as the API's verbose_json response."""
+        audio, segments, info = self._transcribe_segments(buffer, language, word_timestamps)
+        result_segments = list(segments)
+        result = {
+            "text": "".join(segment["text"] for segment in result_segments).strip(),
+            "language": getattr(info, "language", language),
+            "duration": len(audio) / WHISPER_SAMPLERATE,
+            "segments": result_segments,
+        }
+        if word_timestamps:
+            result["words"] = [word for segment in result_segments for word in segment["words"]]
+        return result
+
+    def stream_verbose(
+        self, buffer: BinaryIO, filename: str, language: str, word_timestamps: bool = False  # noqa: ARG002
+    ) -> Iterator[dict]:
+        """One verbose_json-shaped result per segment, as faster-whisper decodes them."""
+        _, segments, info = self._transcribe_segments(buffer, language, word_timestamps)
+        for segment in segments:
+            yield {
+                "text": segment["text"],
+                "language": getattr(info, "language", language),
+                "segments": [segment],
+            }
+
+    def _transcribe_segments(
+        self, buffer: BinaryIO, language: str, word_timestamps: bool
+    ) -> tuple[np.ndarray, Iterator[dict], Any]:
+        samples, samplerate = _decode(buffer)
+        whisper = self._load()
+        audio = to_whisper_input(samples, samplerate)
+        # faster-whisper decodes lazily, one segment per step of this iterator
+        segments, info = whisper.transcribe(
+            audio, language=language or None, beam_size=self._beam_size, word_timestamps=word_timestamps
+        )
+        return audio, (_segment_dict(index, segment) for index, segment in enumerate(segments)), info
+
+    def _load(self) -> Any:
+        if self._whisper is not None:
+            return self._whisper
+        with self._lock:
+            if self._whisper is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError as exc:
+                    raise RuntimeError(
+                        "Backend local requer o pacote faster-whisper (pip install faster-whisper)"
+                    ) from exc
+                self._whisper = WhisperModel(
+                    self.model,
+                    device=self._device,
+                    compute_type=self._compute_type,
+                    cpu_threads=self._cpu_threads,
+                    num_workers=self._num_workers,
+                )
+        return self._whisper
+
+
+def create_backend(name: str | None, model: str | None = None) -> TranscriptionBackend | None:
+    """In-process backend for a configuration value; ``None`` means the Speaches API (``SpeachesBackend``)."""
+    if not name or name == "speaches":
+        return None
+    if name == "local":
+        return LocalWhisperBackend(model=model or DEFAULT_LOCAL_MODEL)
+    raise ValueError(f"Backend de transcrição desconhecido: {name}")
+
+
+def to_whisper_input(samples: np.ndarray, samplerate: int) -> np.ndarray:
+    """Mono float32 in [-1, 1] at 16 kHz, which is what Whisper models consume."""
+    audio = pcm_to_float(samples)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if samplerate != WHISPER_SAMPLERATE and len(audio):
+        audio = resample(audio, samplerate, WHISPER_SAMPLERATE)
+    return audio
+
+
+def audio_duration(buffer: BinaryIO) -> float | None:
+    """Duration of an encoded audio buffer, leaving its position untouched; None if unknown."""
+    position = buffer.tell()
+    try:
+        return sf.info(buffer).duration
+    except Exception:
+        return None
+    finally:
+        buffer.seek(position)
+
+
+def _segment_dict(index: int, segment: Any) -> dict:
+    words = [
+        {"start": word.start, "end": word.end, "word": word.word, "probability": word.probability}
+        for word in (segment.words or [])
+    ]
+    return {"id": index, "start": segment.start, "end": segment.end, "text": segment.text, "words": words}
+
+
+def _decode(buffer: BinaryIO) -> tuple[np.ndarray, int]:
+    try:
+        return sf.read(buffer, dtype="float32", always_2d=True)
+    except Exception as exc:
+        raise ValueError(f"Erro ao processar arquivo: {exc}")
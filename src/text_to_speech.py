@@ -1,26 +1,54 @@
 from __future__ import annotations
 
+import os
+import shutil
 from pathlib import Path
+from typing import Sequence
 
 import requests
 
+try:
+    from .backend_pool import CHARACTERS, HEALTH_INTERVAL, BackendPool
+    from .scheduler import NORMAL, PRIORITIES, RequestScheduler, get_default_scheduler
+    from .single_flight import SingleFlight
+except ImportError:  # pragma: no cover
+    from backend_pool import CHARACTERS, HEALTH_INTERVAL, BackendPool
+    from scheduler import NORMAL, PRIORITIES, RequestScheduler, get_default_scheduler
+    from single_flight import SingleFlight
+
+SUPPORTED_FORMATS = ("mp3", "opus", "aac", "flac", "wav", "pcm")
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 class TextToSpeech:
-    def __init__(self, api_base_url: str = "http://localhost:8000") -> None:
-        self._api_base_url = api_base_url.rstrip("/")
-        self._speech_endpoint = f"{self._api_base_url}/v1/audio/speech"
-        self._models_endpoint = f"{self._api_base_url}/v1/models"
+    def __init__(
+        self,
+        api_base_url: str | Sequence[str] | BackendPool = "http://localhost:8000",
+        scheduler: RequestScheduler | None = None,
+        priority: str = NORMAL,
+    ) -> None:
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioridade desconhecida: {priority}")
+        self._pool = api_base_url if isinstance(api_base_url, BackendPool) else BackendPool(api_base_url, health_interval=HEALTH_INTERVAL)
+        self._scheduler = scheduler or get_default_scheduler()
+        self._priority = priority
+        self._api_base_url = self._pool.primary_url
+        self._speech_path = "/v1/audio/speech"
+        self._models_path = "/v1/models"
         self._current_voice = "alloy"  # Default voice
         self._voice_names: list[str] = []  # Formatted names for display
         self._voice_id_map: dict[str, str] = {}  # Map display name -> voice ID
         self._model = "tts-1"
+        self._response_format = "mp3"
+        self._speed = 1.0
+        self._in_flight = SingleFlight()
         self._load_model_and_voices_from_api()
 
-    def _download_default_model(self) -> None:
+    def _download_default_model(self, base_url: str) -> None:
         """Download default TTS model if none exists."""
         try:
             model_id = "speaches-ai%2FKokoro-82M-v1.0-ONNX-int8"
-            download_url = f"{self._api_base_url}/v1/models/{model_id}"
+            download_url = f"{base_url}{self._models_path}/{model_id}"
             response = requests.post(download_url, timeout=30)
             response.raise_for_status()
         except Exception:
@@ -31,20 +59,27 @@ class TextToSpeech:
         """Load first TTS model from API with its voices."""
         try:
             params = {"task": "text-to-speech"}
-            response = requests.get(self._models_endpoint, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            models = data.get("data", [])
-            
-            # If no models found, try to download default model
-            if not models or len(models) == 0:
-                self._download_default_model()
-                # Try again after download
-                response = requests.get(self._models_endpoint, params=params, timeout=10)
+
+            def fetch_models(base_url: str) -> list:
+                models_endpoint = f"{base_url}{self._models_path}"
+                response = requests.get(models_endpoint, params=params, timeout=10)
                 response.raise_for_status()
                 data = response.json()
+                
                 models = data.get("data", [])
+                
+                # If no models found, try to download default model
+                if not models or len(models) == 0:
+                    self._download_default_model(base_url)
+                    # Try again after download
+                    response = requests.get(models_endpoint, params=params, timeout=10)
+                    response.raise_for_status()
+                    data = response.json()
+                    models = data.get("data", [])
+                return models
+
+            with self._scheduler.slot(self._priority):
+                models = self._pool.call(fetch_models)
             
             if models and len(models) > 0:
                 first_model = models[0]
@@ -99,41 +134,100 @@ class TextToSpeech:
         self._current_voice = "pf_dora"  # Portuguese female voice as default
 
     def speak(self, text: str) -> None:
-        """Speak the text immediately (saves to temp file and plays)."""
+        """Speak the text immediately (saves to temp file and plays).
+
+        Repeated requests for the same text while one is in flight (e.g. a
+        double-click) are played only once.
+        """
         import tempfile
-        import os
-        
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-            tmp_path = Path(tmp.name)
-        
-        try:
-            self.save_to_file(text, tmp_path)
-            # Play the audio file
-            os.startfile(str(tmp_path))
-        finally:
-            # Note: file cleanup happens after playback
-            pass
 
-    def save_to_file(self, text: str, output_path: Path) -> None:
-        """Convert text to speech and save to file using Speaches API."""
-        try:
-            payload = {
-                "input": text,
-                "voice": self._current_voice,
-                "model": self._model,
-            }
-            
-            response = requests.post(
-                self._speech_endpoint,
+        def do_speak() -> None:
+            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
+                tmp_path = Path(tmp.name)
+
+            try:
+                self.save_to_file(text, tmp_path, response_format="mp3")
+                self.play_file(tmp_path)
+            finally:
+                # Note: file cleanup happens after playback
+                pass
+
+        key = ("speak", text, self._current_voice, self._model, self._speed)
+        self._in_flight.do(key, do_speak)
+
+    def play_file(self, audio_file: Path) -> None:
+        """Play an audio file with the system's default player."""
+        os.startfile(str(audio_file))
+
+    def save_to_file(
+        self,
+        text: str,
+        output_path: Path,
+        response_format: str | None = None,
+        speed: float | None = None,
+        voice: str | None = None,
+        priority: str | None = None,
+    ) -> None:
+        """Convert text to speech and stream it to file using Speaches API.
+
+        ``priority`` overrides the client's scheduler priority for this call,
+        e.g. BULK for speculative work.
+        """
+        response_format = (response_format or self._response_format).lower()
+        if response_format not in SUPPORTED_FORMATS:
+            raise ValueError(f"Formato não suportado: {response_format}")
+        if speed is not None:
+            _validate_speed(speed)
+        if priority is not None and priority not in PRIORITIES:
+            raise ValueError(f"Prioridade desconhecida: {priority}")
+
+        payload = {
+            "input": text,
+            "voice": voice or self._current_voice,
+            "model": self._model,
+            "response_format": response_format,
+            "speed": self._speed if speed is None else speed,
+        }
+
+        # Identical concurrent requests share one synthesis; the others copy its output
+        key = tuple(payload.values())
+        written_path = self._in_flight.do(
+            key, lambda: self._download_speech(payload, output_path, priority or self._priority)
+        )
+        if Path(written_path) != Path(output_path):
+            try:
+                shutil.copyfile(written_path, output_path)
+            except Exception as exc:
+                raise ValueError(f"Erro ao salvar arquivo: {exc}")
+
+    def _download_speech(self, payload: dict, output_path: Path, priority: str) -> Path:
+        # Stream next to the target and rename, so a failed download never leaves a truncated file behind
+        output_path = Path(output_path)
+        partial = output_path.with_name(output_path.name + ".part")
+
+        def send(base_url: str) -> None:
+            with requests.post(
+                f"{base_url}{self._speech_path}",
                 json=payload,
                 timeout=60,
-            )
-            response.raise_for_status()
-            
-            # Save audio content to file
-            with open(output_path, "wb") as f:
-                f.write(response.content)
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+
+                # Stream audio content to file without holding it in memory
+                with open(partial, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+
+        try:
+            characters = len(payload["input"])
+            with self._scheduler.slot(priority, cost=characters, unit=CHARACTERS):
+                self._pool.call(send, cost=characters, unit=CHARACTERS)
+            partial.replace(output_path)
+            return output_path
         except requests.exceptions.HTTPError as exc:
+            partial.unlink(missing_ok=True)
             error_detail = ""
             try:
                 error_detail = exc.response.json()
@@ -141,16 +235,46 @@ class TextToSpeech:
                 error_detail = exc.response.text
             raise ValueError(f"Erro na API de síntese ({exc.response.status_code}): {error_detail}")
         except requests.exceptions.RequestException as exc:
+            partial.unlink(missing_ok=True)
             raise ValueError(f"Erro na API de síntese: {exc}")
         except Exception as exc:
+            partial.unlink(missing_ok=True)
             raise ValueError(f"Erro ao salvar arquivo: {exc}")
 
+    def get_response_format(self) -> str:
+        """Get the default output format used by save_to_file."""
+        return self._response_format
+
+    def set_response_format(self, response_format: str) -> None:
+        """Set the default output format (mp3, opus, aac, flac, wav or pcm)."""
+        response_format = response_format.lower()
+        if response_format not in SUPPORTED_FORMATS:
+            raise ValueError(f"Formato não suportado: {response_format}")
+        self._response_format = response_format
+
+    def get_speed(self) -> float:
+        return self._speed
+
+    def set_speed(self, speed: float) -> None:
+        """Set the default speech speed (0.25 to 4.0)."""
+        _validate_speed(speed)
+        self._speed = speed
+
     def get_voices(self) -> list[str]:
         """Get available voice names (formatted as 'name-LANGUAGE')."""
         return self._voice_names
 
+    def get_voice(self) -> str:
+        """Get the ID of the selected voice."""
+        return self._current_voice
+
     def set_voice(self, voice_index: int) -> None:
         """Set voice by index."""
         if 0 <= voice_index < len(self._voice_names):
             display_name = self._voice_names[voice_index]
             self._current_voice = self._voice_id_map[display_name]
+
+
+def _validate_speed(speed: float) -> None:
+    if not 0.25 <= speed <= 4.0:
+        raise ValueError(f"Velocidade fora do intervalo (0.25-4.0): {speed}")
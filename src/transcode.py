@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+try:
+    from .audio_reader import AudioReader
+    from .resample import StreamingResampler
+except ImportError:  # pragma: no cover
+    from audio_reader import AudioReader
+    from resample import StreamingResampler
+
+# Target format -> (extension, soundfile format, subtype)
+OUTPUT_FORMATS = {
+    "wav": ("wav", "WAV", "PCM_16"),
+    "flac": ("flac", "FLAC", "PCM_16"),
+    "mp3": ("mp3", "MP3", "MPEG_LAYER_III"),
+    "opus": ("opus", "OGG", "OPUS"),
+}
+OPUS_SAMPLERATES = (8000, 12000, 16000, 24000, 48000)
+BLOCK_FRAMES = 65536
+
+
+@dataclass(frozen=True)
+class TranscodeOptions:
+    format: str = "flac"
+    samplerate: int | None = None  # None keeps the source rate (Opus snaps to a supported one)
+    mono: bool = False
+
+
+@dataclass
+class TranscodeResult:
+    source: Path
+    destination: Path
+    skipped: bool = False
+    duration: float = 0.0  # seconds of audio
+    elapsed: float = 0.0  # seconds of wall time
+    input_bytes: int = 0
+    output_bytes: int = 0
+    error: str | None = None
+
+
+@dataclass
+class TranscodeReport:
+    results: list[TranscodeResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def converted(self) -> list[TranscodeResult]:
+        return [r for r in self.results if not r.skipped and r.error is None]
+
+    @property
+    def skipped(self) -> list[TranscodeResult]:
+        return [r for r in self.results if r.skipped]
+
+    @property
+    def failed(self) -> list[TranscodeResult]:
+        return [r for r in self.results if r.error is not None]
+
+    @property
+    def audio_seconds_per_second(self) -> float:
+        """Aggregate throughput in seconds of audio converted per wall-clock second."""
+        if self.elapsed <= 0:
+            return 0.0
+        return sum(r.duration for r in self.converted) / self.elapsed
+
+    @property
+    def megabytes_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return sum(r.input_bytes for r in self.converted) / 1e6 / self.elapsed
+
+
+def destination_for(source: Path, source_dir: Path, output_dir: Path, options: TranscodeOptions) -> Path:
+    extension = OUTPUT_FORMATS[options.format][0]
+    return (output_dir / source.relative_to(source_dir)).with_suffix(f".{extension}")
+
+
+def is_up_to_date(source: Path, destination: Path) -> bool:
+    return destination.exists() and destination.stat().st_mtime >= source.stat().st_mtime
+
+
+def transcode_file(source: Path, destination: Path, options: TranscodeOptions) -> TranscodeResult:
+    """Convert one file block by block, with optional resample and downmix."""
+    if options.format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {options.format}")
+
+    started = time.perf_counter()
+    _, sf_format, subtype = OUTPUT_FORMATS[options.format]
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, so an interrupted run is never mistaken for a finished file
+    partial = destination.with_name(destination.name + ".part")
+
+    try:
+        with AudioReader(source) as reader:
+            channels = 1 if options.mono else reader.channels
+            samplerate = _output_samplerate(reader.samplerate, options)
+            resampler = StreamingResampler(reader.samplerate, samplerate)
+
+            with sf.SoundFile(
+                partial,
+                mode="w",
+                samplerate=samplerate,
+                channels=channels,
+                format=sf_format,
+                subtype=subtype,
+            ) as output:
+                for block in reader.blocks(BLOCK_FRAMES, dtype="float32"):
+                    if options.mono and block.shape[1] > 1:
+                        block = block.mean(axis=1, keepdims=True)
+                    output.write(resampler.process(block))
+                output.write(resampler.flush())
+            duration = reader.duration
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    partial.replace(destination)
+    return TranscodeResult(
+        source=source,
+        destination=destination,
+        duration=duration,
+        elapsed=time.perf_counter() - started,
+        input_bytes=source.stat().st_size,
+        output_bytes=destination.stat().st_size,
+    )
+
+
+def transcode_directory(
+    source_dir: Path,
+    options: TranscodeOptions,
+    output_dir: Path | None = None,
+    pattern: str = "*.wav",
+    workers: int | None = None,
+    force: bool = False,
+) -> TranscodeReport:
+    """Convert every matching file under ``source_dir`` across a process pool.
+
+    Files whose destination is already newer than the source are skipped
+    unless ``force`` is set. The pool defaults to one worker per CPU.
+    """
+    if options.format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {options.format}")
+
+    output_dir = output_dir or source_dir
+    report = TranscodeReport()
+    jobs = []
+    for source in sorted(source_dir.rglob(pattern)):
+        if source.name.endswith(".part"):
+            continue
+        destination = destination_for(source, source_dir, output_dir, options)
+        if destination == source:
+            continue
+        if not force and is_up_to_date(source, destination):
+            report.results.append(TranscodeResult(source=source, destination=destination, skipped=True))
+        else:
+            jobs.append((source, destination, options))
+
+    started = time.perf_counter()
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            report.results.extend(executor.map(_run_job, jobs))
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _run_job(job: tuple[Path, Path, TranscodeOptions]) -> TranscodeResult:
+    source, destination, options = job
+    try:
+        return transcode_file(source, destination, options)
+    except Exception as exc:  # noqa: BLE001
+        return TranscodeResult(source=source, destination=destination, error=str(exc))
+
+
+def _output_samplerate(source_rate: int, options: TranscodeOptions) -> int:
+    samplerate = options.samplerate or source_rate
+    if options.format == "opus" and samplerate not in OPUS_SAMPLERATES:
+        # Opus only runs at fixed rates; take the smallest one that keeps the bandwidth
+        samplerate = next((rate for rate in OPUS_SAMPLERATES if rate >= samplerate), OPUS_SAMPLERATES[-1])
+    return samplerate
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Converte em lote os arquivos de uma pasta de gravações.")
+    parser.add_argument("source_dir", type=Path)
+    parser.add_argument("--to", dest="format", choices=sorted(OUTPUT_FORMATS), default="flac")
+    parser.add_argument("--output-dir", type=Path, default=None)
+    parser.add_argument("--pattern", default="*.wav")
+    parser.add_argument("--samplerate", type=int, default=None)
+    parser.add_argument("--mono", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args(argv)
+
+    options = TranscodeOptions(format=args.format, samplerate=args.samplerate, mono=args.mono)
+    report = transcode_directory(
+        args.source_dir,
+        options,
+        output_dir=args.output_dir,
+        pattern=args.pattern,
+        workers=args.workers,
+        force=args.force,
+    )
+
+    for result in report.results:
+        if result.skipped:
+            print(f"[pulado] {result.source}")
+        elif result.error:
+            print(f"[erro]   {result.source}: {result.error}")
+        else:
+            speed = result.duration / result.elapsed if result.elapsed else 0.0
+            print(f"[ok]     {result.source} -> {result.destination.name} ({speed:.1f}x tempo real)")
+
+    print(
+        f"{len(report.converted)} convertidos, {len(report.skipped)} pulados, {len(report.failed)} com erro "
+        f"em {report.elapsed:.1f}s ({report.audio_seconds_per_second:.1f}x tempo real, "
+        f"{report.megabytes_per_second:.1f} MB/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import argparse
+import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+import numpy as np
+
+try:
+    from .audio_reader import AudioReader
+    from .audio_utils import AudioSettings, encode_wav_buffer
+except ImportError:  # pragma: no cover
+    from audio_reader import AudioReader
+    from audio_utils import AudioSettings, encode_wav_buffer
+
+# Whisper decodes 30 s windows, so longer uploads gain nothing but latency
+WINDOW_SECONDS = 30.0
+# Where to look, before each window boundary, for a pause to cut at
+SEARCH_SECONDS = 3.0
+_RMS_FRAME_SECONDS = 0.02
+
+
+@dataclass(frozen=True)
+class Word:
+    start: float
+    end: float
+    text: str
+    probability: float | None = None
+
+
+@dataclass(frozen=True)
+class Segment:
+    id: int
+    start: float  # seconds from the start of the file
+    end: float
+    text: str
+    words: list[Word] = field(default_factory=list)
+
+    def shifted(self, offset: float, id: int | None = None) -> Segment:
+        """Same segment with every timestamp moved by ``offset`` seconds."""
+        return replace(
+            self,
+            id=self.id if id is None else id,
+            start=self.start + offset,
+            end=self.end + offset,
+            words=[replace(word, start=word.start + offset, end=word.end + offset) for word in self.words],
+        )
+
+
+@dataclass
+class Transcript:
+    segments: list[Segment] = field(default_factory=list)
+    language: str | None = None
+    duration: float | None = None
+
+    @property
+    def text(self) -> str:
+        return " ".join(segment.text for segment in self.segments if segment.text)
+
+    @property
+    def words(self) -> list[Word]:
+        return [word for segment in self.segments for word in segment.words]
+
+    @classmethod
+    def from_verbose(cls, result: dict) -> Transcript:
+        """Parse a verbose_json response (the API's or a local backend's)."""
+        raw_segments = result.get("segments") or []
+        # The API returns words at the top level; attach each to the segment containing its midpoint
+        loose_words = [] if any(segment.get("words") for segment in raw_segments) else result.get("words") or []
+        segments = []
+        for index, raw in enumerate(raw_segments):
+            start, end = float(raw["start"]), float(raw["end"])
+            words = [_parse_word(word) for word in raw.get("words") or []]
+            segments.append(Segment(id=index, start=start, end=end, text=raw.get("text", "").strip(), words=words))
+        for word in map(_parse_word, loose_words):
+            if segments:
+                _nearest_segment(segments, (word.start + word.end) / 2).words.append(word)
+        if not segments and result.get("text"):
+            # Plain json response: one segment with the whole text and no timing
+            duration = float(result.get("duration") or 0.0)
+            segments.append(Segment(id=0, start=0.0, end=duration, text=result["text"].strip()))
+        return cls(segments=segments, language=result.get("language"), duration=result.get("duration"))
+
+
+def stream_segments(
+    stt,
+    audio_file: Path,
+    language: str = "pt",
+    word_timestamps: bool = False,
+    window_seconds: float = WINDOW_SECONDS,
+    search_seconds: float = SEARCH_SECONDS,
+    prefetch: int = 2,
+) -> Iterator[Segment]:
+    """Transcribe a file window by window, yielding segments in order as they are ready.
+
+    Windows end at the quietest point of the last ``search_seconds`` before
+    each boundary, so words aren't cut in half, and up to ``prefetch`` of them
+    are in flight at once. Closing the iterator early cancels the rest.
+    """
+    try:
+        reader = AudioReader(Path(audio_file))
+    except Exception as exc:
+        raise ValueError(f"Erro ao processar arquivo: {exc}")
+
+    settings = AudioSettings(samplerate=reader.samplerate, channels=reader.channels)
+
+    def transcribe_window(block: np.ndarray) -> list[Segment]:
+        buffer = encode_wav_buffer([block], settings)
+        result = stt.transcribe_verbose(buffer, filename="window.wav", language=language, word_timestamps=word_timestamps)
+        return Transcript.from_verbose(result).segments
+
+    pending: deque[tuple[int, Future]] = deque()
+    executor = ThreadPoolExecutor(max_workers=max(1, prefetch), thread_name_prefix="transcript")
+    try:
+        windows = _windows(reader, window_seconds, search_seconds)
+        next_id = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max(1, prefetch):
+                window = next(windows, None)
+                if window is None:
+                    exhausted = True
+                else:
+                    # Read here: a non-WAV reader seeks a shared file handle, so it can't be used from the pool
+                    start, stop = window
+                    block = np.array(reader.read(start, stop, dtype="int16"))
+                    pending.append((start, executor.submit(transcribe_window, block)))
+            if not pending:
+                return
+            start, future = pending.popleft()
+            offset = start / reader.samplerate
+            for segment in future.result():
+                yield segment.shifted(offset, id=next_id)
+                next_id += 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        reader.close()
+
+
+def write_srt(segments: Iterable[Segment], output: TextIO) -> int:
+    """Write SubRip cues as segments arrive; returns how many were written."""
+    count = 0
+    for segment in segments:
+        count += 1
+        output.write(
+            f"{count}\n{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}\n{segment.text}\n\n"
+        )
+        output.flush()
+    return count
+
+
+def write_vtt(segments: Iterable[Segment], output: TextIO) -> int:
+    """Write WebVTT cues as segments arrive; returns how many were written."""
+    output.write("WEBVTT\n\n")
+    count = 0
+    for segment in segments:
+        count += 1
+        start, end = format_timestamp(segment.start, "."), format_timestamp(segment.end, ".")
+        output.write(f"{start} --> {end}\n{segment.text}\n\n")
+        output.flush()
+    return count
+
+
+def write_jsonl(segments: Iterable[Segment], output: TextIO) -> int:
+    """Write one JSON object per segment, words included; returns how many were written."""
+    count = 0
+    for segment in segments:
+        count += 1
+        output.write(json.dumps(asdict(segment), ensure_ascii=False) + "\n")
+        output.flush()
+    return count
+
+
+WRITERS = {".srt": write_srt, ".vtt": write_vtt, ".jsonl": write_jsonl}
+
+
+def save_segments(segments: Iterable[Segment], output_path: Path) -> int:
+    """Write segments to a file whose format (.srt, .vtt, .jsonl) comes from its suffix."""
+    output_path = Path(output_path)
+    writer = WRITERS.get(output_path.suffix.lower())
+    if writer is None:
+        raise ValueError(f"Formato de legenda não suportado: {output_path.suffix}")
+    with open(output_path, "w", encoding="utf-8") as output:
+        return writer(segments, output)
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """HH:MM:SS,mmm (SRT) or, with ``separator="."``, HH:MM:SS.mmm (WebVTT)."""
+    milliseconds = max(0, int(round(seconds * 1000)))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+def _windows(reader: AudioReader, window_seconds: float, search_seconds: float) -> Iterator[tuple[int, int]]:
+    window = max(1, int(window_seconds * reader.samplerate))
+    search = min(window // 2, int(search_seconds * reader.samplerate))
+    start = 0
+    while start < reader.frames:
+        stop = start + window
+        if stop + search >= reader.frames:
+            # Stretch the last window rather than leave a sliver of a few seconds
+            yield start, reader.frames
+            return
+        stop = _quietest_point(reader, stop - search, stop)
+        yield start, stop
+        start = stop
+
+
+def _quietest_point(reader: AudioReader, start: int, stop: int) -> int:
+    """Frame at the center of the lowest-energy 20 ms frame in [start, stop)."""
+    hop = max(1, int(_RMS_FRAME_SECONDS * reader.samplerate))
+    audio = reader.read(start, stop, dtype="float32")
+    count = len(audio) // hop
+    if count == 0:
+        return stop
+    frames = audio[: count * hop].reshape(count, hop * reader.channels)
+    energy = np.einsum("ij,ij->i", frames, frames)
+    # Ties (digital silence) go to the latest frame, keeping windows as long as possible
+    quietest = count - 1 - int(np.argmin(energy[::-1]))
+    return start + quietest * hop + hop // 2
+
+
+def _parse_word(word: dict) -> Word:
+    return Word(
+        start=float(word["start"]),
+        end=float(word["end"]),
+        text=str(word.get("word", "")).strip(),
+        probability=word.get("probability"),
+    )
+
+
+def _nearest_segment(segments: list[Segment], position: float) -> Segment:
+    def distance(segment: Segment) -> float:
+        if segment.start <= position <= segment.end:
+            return 0.0
+        return min(abs(position - segment.start), abs(position - segment.end))
+
+    return min(segments, key=distance)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Transcreve um áudio em legendas (SRT, VTT) ou JSONL com tempos.")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("destination", type=Path, help="arquivo .srt, .vtt ou .jsonl")
+    parser.add_argument("--language", default="pt")
+    parser.add_argument("--url", default="http://localhost:8000", help="endereço do servidor Speaches")
+    parser.add_argument("--words", action="store_true", help="inclui tempos por palavra (JSONL)")
+    parser.add_argument("--window", type=float, default=WINDOW_SECONDS, help="segundos por janela, se o backend não transmitir segmentos")
+    args = parser.parse_args(argv)
+
+    try:
+        from .speech_to_text import SpeechToText
+    except ImportError:  # pragma: no cover
+        from speech_to_text import SpeechToText
+
+    stt = SpeechToText(api_base_url=args.url)
+    segments = stt.iter_segments(args.source, args.language, word_timestamps=args.words, window_seconds=args.window)
+    count = save_segments(segments, args.destination)
+    print(f"{count} segmentos salvos em {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
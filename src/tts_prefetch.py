@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+try:
+    from .jobs import Job, JobExecutor
+    from .scheduler import BULK, INTERACTIVE, NORMAL, RequestScheduler
+    from .text_to_speech import TextToSpeech
+except ImportError:  # pragma: no cover
+    from jobs import Job, JobExecutor
+    from scheduler import BULK, INTERACTIVE, NORMAL, RequestScheduler
+    from text_to_speech import TextToSpeech
+
+# A sentence is complete once its terminator is followed by whitespace (or ends the text)
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'»)\]]*(?:\s+|$)")
+# Rendered texts kept on disk: the player opens them asynchronously, so the
+# one just handed over can't be deleted yet
+KEEP_SPOKEN = 2
+# Synthesis requests the TTS client sends at once, and how many of them may be speculative
+TTS_CONCURRENCY = 2
+PREFETCH_CONCURRENCY = 1
+
+
+def split_sentences(text: str) -> tuple[list[str], str]:
+    """Split text into completed sentences and the trailing, still-open remainder."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    return sentences, text[start:].strip()
+
+
+def create_prefetch_scheduler(
+    max_concurrency: int = TTS_CONCURRENCY, prefetch_concurrency: int = PREFETCH_CONCURRENCY
+) -> RequestScheduler:
+    """Scheduler for a TTS client shared with a SpeechPrefetcher.
+
+    Speculative (BULK) requests hold at most ``prefetch_concurrency`` of the
+    ``max_concurrency`` slots, so a real request always finds one free and
+    is dispatched ahead of prefetches still queued.
+    """
+    if not 0 < prefetch_concurrency < max_concurrency:
+        raise ValueError("prefetch_concurrency must be positive and below max_concurrency.")
+    return RequestScheduler(
+        max_concurrency=max_concurrency,
+        limits={INTERACTIVE: None, NORMAL: None, BULK: prefetch_concurrency},
+    )
+
+
+class SpeechPrefetcher:
+    """Speculatively synthesizes completed sentences while the user is still typing.
+
+    Every edit restarts a debounce in its own job group, so a new
+    edit or a voice change supersedes the pending work; sentences are rendered
+    as WAV into a small LRU cache keyed by (sentence, voice, speed). ``speak``
+    then plays straight from the cache, synthesizing only what is missing.
+    Speculative requests run at BULK priority; give the TTS client a
+    ``create_prefetch_scheduler()`` so they can never delay real ones.
+    """
+
+    def __init__(
+        self,
+        tts: TextToSpeech,
+        jobs: JobExecutor,
+        debounce: float = 0.6,
+        max_cached: int = 64,
+        group: str = "tts-prefetch",
+    ) -> None:
+        self._tts = tts
+        self._jobs = jobs
+        self._debounce = debounce
+        self._max_cached = max_cached
+        self._group = group
+        self._cache: OrderedDict[tuple, Path] = OrderedDict()
+        self._lock = threading.Lock()
+        self._directory = Path(tempfile.mkdtemp(prefix="tts-prefetch-"))
+        self._counter = 0
+        self._spoken: deque[Path] = deque()
+        self._text = ""
+        self.hits = 0
+        self.misses = 0
+
+    def text_changed(self, text: str) -> None:
+        """Schedule pre-synthesis of ``text`` after the debounce, dropping stale work."""
+        self._text = text
+        voice = self._tts.get_voice()
+        self._jobs.submit(self._group, lambda job: self._prefetch(job, text, voice))
+
+    def voice_changed(self) -> None:
+        self.text_changed(self._text)
+
+    def cancel(self) -> None:
+        self._jobs.supersede(self._group)
+
+    def is_cached(self, sentence: str, voice: str | None = None) -> bool:
+        with self._lock:
+            return self._key(sentence, voice) in self._cache
+
+    def render(self, text: str, output_path: Path) -> bool:
+        """Write ``text`` as one WAV built from per-sentence renders.
+
+        Returns False, writing nothing, when none of the sentences were
+        pre-rendered, so callers can fall back to a single regular request.
+        """
+        sentences, remainder = split_sentences(text)
+        if remainder:
+            sentences.append(remainder)
+        if not sentences:
+            return False
+
+        voice = self._tts.get_voice()
+        with self._lock:
+            cached = [self._key(sentence, voice) in self._cache for sentence in sentences]
+        if not any(cached):
+            self.misses += len(sentences)
+            return False
+        self.hits += sum(cached)
+        self.misses += len(cached) - sum(cached)
+
+        # Rendering and concatenation happen before writing, so a failure leaves no partial file
+        blocks = []
+        samplerate = None
+        for sentence in sentences:
+            data, samplerate = self._read(sentence, voice)
+            blocks.append(data)
+        sf.write(str(output_path), np.concatenate(blocks), samplerate, subtype="PCM_16")
+        return True
+
+    def speak(self, text: str) -> None:
+        """Play ``text``, from pre-rendered sentences when there are any."""
+        with self._lock:
+            self._counter += 1
+            output_path = self._directory / f"speak_{self._counter}.wav"
+        if not self.render(text, output_path):
+            self._tts.speak(text)
+            return
+        self._tts.play_file(output_path)
+        with self._lock:
+            self._spoken.append(output_path)
+            stale = [self._spoken.popleft() for _ in range(len(self._spoken) - KEEP_SPOKEN)]
+        for path in stale:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                # Still open in the player (Windows); close() removes it
+                pass
+
+    def close(self) -> None:
+        self.cancel()
+        with self._lock:
+            self._cache.clear()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def _prefetch(self, job: Job, text: str, voice: str) -> None:
+        if job.wait(self._debounce):
+            return
+        sentences, _ = split_sentences(text)
+        for sentence in sentences:
+            if job.superseded:
+                return
+            self._synthesize(sentence, voice, priority=BULK)
+
+    def _read(self, sentence: str, voice: str) -> tuple[np.ndarray, int]:
+        """Samples of a sentence, synthesizing it if it isn't cached."""
+        key = self._key(sentence, voice)
+        while True:
+            path = self._synthesize(sentence, voice)
+            with self._lock:
+                # Eviction unlinks under this lock, so a file still in the cache can't vanish mid-read
+                if self._cache.get(key) == path:
+                    return sf.read(str(path), dtype="int16", always_2d=True)
+
+    def _synthesize(self, sentence: str, voice: str, priority: str | None = None) -> Path:
+        key = self._key(sentence, voice)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+            self._counter += 1
+            output_path = self._directory / f"sentence_{self._counter}.wav"
+
+        self._tts.save_to_file(sentence, output_path, response_format="wav", voice=voice, priority=priority)
+
+        with self._lock:
+            self._cache[key] = output_path
+            while len(self._cache) > self._max_cached:
+                _, evicted = self._cache.popitem(last=False)
+                evicted.unlink(missing_ok=True)
+        return output_path
+
+    def _key(self, sentence: str, voice: str | None) -> tuple:
+        return (sentence, voice or self._tts.get_voice(), self._tts.get_speed())
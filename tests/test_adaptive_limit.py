@@ -0,0 +1,194 @@
+"""Tests for the adaptive concurrency limiter."""
+import io
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+import requests
+
+from src.adaptive_limit import AdaptiveLimiter, create_adaptive_scheduler, is_overload
+from src.backend_pool import AUDIO_SECONDS
+from src.scheduler import BULK, RequestScheduler
+from src.speech_to_text import SpeechToText
+from src.text_to_speech import TextToSpeech
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _http_error(status_code: int) -> requests.exceptions.HTTPError:
+    return requests.exceptions.HTTPError(response=Mock(status_code=status_code))
+
+
+def _run(limiter: AdaptiveLimiter, clock: FakeClock, latency: float, in_flight: int | None = None) -> int:
+    started = limiter.now()
+    clock.now += latency
+    return limiter.record(started, limiter.limit if in_flight is None else in_flight)
+
+
+def test_limit_grows_while_latency_stays_at_baseline():
+    """Test that a fully used limit is raised while the server stays fast."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=16, clock=clock)
+
+    for _ in range(50):
+        _run(limiter, clock, 1.0)
+
+    assert limiter.limit == 16
+
+
+def test_limit_does_not_grow_when_unused():
+    """Test that fast answers with few requests in flight don't raise the limit."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=8, clock=clock)
+
+    for _ in range(50):
+        _run(limiter, clock, 1.0, in_flight=1)
+
+    assert limiter.limit == 8
+
+
+def test_limit_settles_near_server_capacity():
+    """Test that the limit follows a server whose latency grows with queued requests."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=32, clock=clock)
+
+    def serve(capacity: int, count: int) -> None:
+        for _ in range(count):
+            _run(limiter, clock, max(1.0, limiter.limit / capacity))
+
+    serve(capacity=4, count=200)
+    settled = limiter.limit
+    assert 4 < settled < 16
+
+    serve(capacity=2, count=200)
+    assert limiter.limit < settled
+    stats = limiter.get_stats()
+    assert stats["limit"] == limiter.limit
+    assert stats["baseline_latency"] == pytest.approx(1.0)
+    assert stats["short_latency"] > stats["baseline_latency"]
+
+
+def test_overload_burst_backs_off_once():
+    """Test that failures of requests started before a cut don't cut the limit again."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=16, max_limit=16, clock=clock)
+    started = [limiter.now() for _ in range(4)]
+    clock.now += 1.0
+
+    limits = [limiter.record(start, 4, _http_error(503)) for start in started]
+
+    assert limits == [8, 8, 8, 8]
+    assert limiter.get_stats()["overloads"] == 4
+
+    clock.now += 1.0
+    assert limiter.record(limiter.now(), 1, requests.exceptions.Timeout()) == 4
+
+
+def test_limit_is_clamped():
+    """Test that backing off never goes below min_limit."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=2, clock=clock)
+
+    for _ in range(3):
+        clock.now += 1.0
+        limiter.record(limiter.now(), 1, requests.exceptions.ConnectionError())
+
+    assert limiter.limit == 2
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (_http_error(429), True),
+        (_http_error(503), True),
+        (_http_error(400), False),
+        (requests.exceptions.Timeout(), True),
+        (requests.exceptions.ConnectionError(), True),
+        (ValueError("bad file"), False),
+    ],
+)
+def test_is_overload(error, expected):
+    """Test which errors count as the server being over capacity."""
+    assert is_overload(error) is expected
+
+
+def test_client_errors_leave_limit_alone():
+    """Test that errors caused by the request itself don't lower the limit."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=8, clock=clock)
+
+    assert limiter.record(limiter.now(), 8, _http_error(400)) == 8
+
+
+def test_scheduler_follows_limiter():
+    """Test that the scheduler's total concurrency tracks the limiter after each slot."""
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    scheduler = RequestScheduler(limits={BULK: 8}, limiter=limiter)
+    assert scheduler.max_concurrency == 8
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        with scheduler.slot(BULK):
+            raise _http_error(503)
+
+    assert scheduler.max_concurrency == 4
+    assert scheduler.limiter is limiter
+    assert scheduler.get_stats()[BULK]["running"] == 0
+
+
+def test_clients_share_adaptive_scheduler(tmp_path):
+    """Test that STT and TTS overloads both feed the shared limiter."""
+    scheduler = create_adaptive_scheduler(initial_limit=8, max_limit=8)
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        stt = SpeechToText(scheduler=scheduler, priority=BULK)
+        tts = TextToSpeech(scheduler=scheduler, priority=BULK)
+    assert scheduler.max_concurrency == 8
+
+    overloaded = Mock(status_code=503, json=Mock(return_value={"detail": "busy"}))
+    overloaded.raise_for_status.side_effect = requests.exceptions.HTTPError(response=overloaded)
+    with patch("requests.post", return_value=overloaded):
+        with pytest.raises(ValueError):
+            stt.transcribe_buffer(io.BytesIO(b"RIFF"), filename="a.wav")
+    assert scheduler.max_concurrency == 4
+
+    streamed = MagicMock()
+    streamed.__enter__.return_value = overloaded
+    with patch("requests.post", return_value=streamed):
+        with pytest.raises(ValueError):
+            tts.save_to_file("Olá", tmp_path / "out.mp3")
+    assert scheduler.max_concurrency == 2
+    assert scheduler.limiter.get_stats()["overloads"] == 2
+
+
+def test_mixed_request_sizes_dont_shrink_the_limit():
+    """Test that latency per unit of work keeps long clips after short ones from reading as overload."""
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=16, clock=clock)
+
+    for index in range(60):
+        # Short clips first, then long ones mixed in; the server takes
+        # 0.1 s per audio second for all of them
+        seconds = 30.0 if index >= 20 and index % 2 == 0 else 2.0
+        started = limiter.now()
+        clock.now += 0.1 * seconds
+        limiter.record(started, limiter.limit, cost=seconds, unit=AUDIO_SECONDS)
+
+    assert limiter.limit == 16
+    stats = limiter.get_stats()
+    assert stats["unit"] == AUDIO_SECONDS
+    assert stats["short_latency"] == pytest.approx(0.1)
+
+
+def test_slot_passes_request_size_to_limiter():
+    """Test that a slot's cost and unit reach the limiter."""
+    limiter = Mock(limit=4, now=Mock(return_value=0.0), record=Mock(return_value=4))
+    scheduler = RequestScheduler(limiter=limiter)
+
+    with scheduler.slot(BULK, cost=12.5, unit=AUDIO_SECONDS):
+        pass
+
+    assert limiter.record.call_args.kwargs == {"cost": 12.5, "unit": AUDIO_SECONDS}
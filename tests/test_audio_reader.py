@@ -0,0 +1,85 @@
+"""Tests for the block-wise, memory-mapped audio reader."""
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.audio_reader import AudioReader
+
+
+def _write_ramp(path: Path, frames: int = 1000, channels: int = 2, subtype: str = "PCM_16") -> np.ndarray:
+    data = (np.arange(frames * channels, dtype=np.int32) % 30000).astype(np.int16).reshape(frames, channels)
+    sf.write(path, data, 8000, subtype=subtype)
+    return data
+
+
+def test_pcm_wav_is_memory_mapped(tmp_path: Path) -> None:
+    path = tmp_path / "ramp.wav"
+    data = _write_ramp(path)
+
+    with AudioReader(path) as reader:
+        assert reader.is_memory_mapped
+        assert reader.frames == 1000
+        assert reader.channels == 2
+        assert reader.samplerate == 8000
+        np.testing.assert_array_equal(reader.read(100, 200), data[100:200])
+
+
+def test_non_wav_falls_back_to_soundfile(tmp_path: Path) -> None:
+    path = tmp_path / "ramp.flac"
+    data = _write_ramp(path)
+
+    with AudioReader(path) as reader:
+        assert not reader.is_memory_mapped
+        np.testing.assert_array_equal(reader.read(500, 510), data[500:510])
+
+
+def test_blocks_cover_file_with_overlap(tmp_path: Path) -> None:
+    path = tmp_path / "ramp.wav"
+    data = _write_ramp(path, frames=1000, channels=1)
+
+    with AudioReader(path) as reader:
+        blocks = list(reader.blocks(blocksize=400, overlap=100))
+
+    assert [len(block) for block in blocks] == [400, 400, 400]
+    np.testing.assert_array_equal(blocks[1], data[300:700])
+    np.testing.assert_array_equal(blocks[-1], data[600:1000])
+
+
+def test_read_converts_dtype(tmp_path: Path) -> None:
+    path = tmp_path / "ramp.wav"
+    _write_ramp(path, channels=1)
+
+    with AudioReader(path) as reader:
+        expected, _ = sf.read(path, dtype="float32", always_2d=True)
+        converted = reader.read(0, 50, dtype="float32")
+        seconds = reader.read_seconds(0.0, 50 / 8000, dtype="float32")
+
+    np.testing.assert_allclose(converted, expected[:50])
+    np.testing.assert_allclose(seconds, expected[:50])
+
+
+def test_blocks_rejects_invalid_overlap(tmp_path: Path) -> None:
+    path = tmp_path / "ramp.wav"
+    _write_ramp(path)
+
+    with AudioReader(path) as reader:
+        with pytest.raises(ValueError):
+            list(reader.blocks(blocksize=100, overlap=100))
+
+
+@pytest.mark.parametrize(
+    ("subtype", "expected"),
+    [("PCM_16", np.int16), ("PCM_24", np.int32), ("PCM_32", np.int32), ("FLOAT", np.float32)],
+)
+@pytest.mark.parametrize("use_memmap", [True, False])
+def test_native_dtype_is_the_same_on_both_paths(tmp_path: Path, subtype: str, expected, use_memmap: bool) -> None:
+    path = tmp_path / "ramp.wav"
+    _write_ramp(path, subtype=subtype)
+
+    with AudioReader(path, use_memmap=use_memmap) as reader:
+        block = reader.read(0, 10)
+        assert reader.native_dtype == expected
+        assert block.dtype == expected
+        assert block.shape == (10, 2)
@@ -5,7 +5,7 @@ import numpy as np
 import pytest
 import soundfile as sf
 
-from src.audio_utils import AudioSettings, build_recording_path, write_wav
+from src.audio_utils import AudioSettings, build_recording_path, encode_wav_buffer, write_wav
 
 
 def test_build_recording_path(tmp_path: Path) -> None:
@@ -15,6 +15,13 @@ def test_build_recording_path(tmp_path: Path) -> None:
     assert re.fullmatch(r"\d{8}_\d{6}\.wav", path.name)
 
 
+def test_build_recording_path_avoids_collisions(tmp_path: Path) -> None:
+    paths = {build_recording_path(tmp_path) for _ in range(3)}
+
+    assert len(paths) == 3
+    assert all(path.exists() for path in paths)
+
+
 def test_write_wav_creates_file(tmp_path: Path) -> None:
     settings = AudioSettings()
     frames = [np.zeros((100, settings.channels), dtype=np.int16)]
@@ -33,3 +40,24 @@ def test_write_wav_raises_on_empty(tmp_path: Path) -> None:
 
     with pytest.raises(ValueError):
         write_wav(tmp_path / "empty.wav", [], settings)
+
+
+def test_encode_wav_buffer_matches_frames() -> None:
+    settings = AudioSettings()
+    frames = [
+        np.full((60, settings.channels), 5, dtype=np.int16),
+        np.full((40, settings.channels), -7, dtype=np.int16),
+    ]
+
+    buffer = encode_wav_buffer(frames, settings)
+
+    data, samplerate = sf.read(buffer, dtype="int16")
+    assert samplerate == settings.samplerate
+    assert data.shape[0] == 100
+    assert data[0] == 5
+    assert data[-1] == -7
+
+
+def test_encode_wav_buffer_raises_on_empty() -> None:
+    with pytest.raises(ValueError):
+        encode_wav_buffer([], AudioSettings())
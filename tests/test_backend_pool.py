@@ -0,0 +1,219 @@
+"""Tests for client-side load balancing across Speaches backends."""
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from src.backend_pool import AUDIO_SECONDS, CHARACTERS, BackendPool
+
+
+def test_single_url_pool():
+    """Test that a plain URL becomes a one-backend pool."""
+    pool = BackendPool("http://localhost:8000/")
+
+    assert pool.urls == ["http://localhost:8000"]
+    with pool.request() as base_url:
+        assert base_url == "http://localhost:8000"
+
+
+def test_least_outstanding_routing():
+    """Test that requests go to the backend with the fewest in-flight requests."""
+    pool = BackendPool(["http://a", "http://b"])
+
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first.url, second.url} == {"http://a", "http://b"}
+
+    pool.release(first, elapsed=0.1)
+    third = pool.acquire()
+    assert third is first
+
+
+def test_failing_backend_is_ejected():
+    """Test that consecutive connection failures eject a backend."""
+    pool = BackendPool(["http://a", "http://b"], max_failures=2)
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            with pool.request() as base_url:
+                assert base_url == "http://a"
+                raise requests.exceptions.ConnectionError("down")
+
+    backends = {b.url: b for b in pool.get_backends()}
+    assert backends["http://a"].is_ejected
+    for _ in range(3):
+        with pool.request() as base_url:
+            assert not backends[base_url].is_ejected
+
+
+def test_client_errors_do_not_eject():
+    """Test that 4xx responses are not counted against the backend."""
+    pool = BackendPool(["http://a", "http://b"], max_failures=1)
+    error = requests.exceptions.HTTPError(response=Mock(status_code=400))
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        with pool.request():
+            raise error
+
+    assert not any(b.is_ejected for b in pool.get_backends())
+
+
+def test_slow_backend_is_ejected():
+    """Test that a backend much slower than its peers is ejected."""
+    pool = BackendPool(["http://a", "http://b", "http://c"], slow_factor=3.0)
+    backends = pool.get_backends()
+
+    for backend in backends[:2]:
+        pool.acquire()
+        pool.release(backend, elapsed=0.1)
+    pool.acquire()
+    pool.release(backends[2], elapsed=2.0)
+
+    assert backends[2].is_ejected
+    assert not backends[0].is_ejected
+
+
+def test_ejected_backend_readmitted_after_health_probe():
+    """Test that an ejected backend returns only after /health succeeds."""
+    pool = BackendPool(["http://a", "http://b"], eject_seconds=0.0)
+    backend_a = pool.get_backends()[0]
+    backend_a.ejected_until = 1e-9
+
+    with patch("requests.get", return_value=Mock(raise_for_status=Mock())) as mock_get:
+        pool.acquire()
+
+    mock_get.assert_called_once_with("http://a/health", timeout=2.0)
+    assert not backend_a.is_ejected
+
+
+def test_check_health_ejects_unhealthy():
+    """Test that check_health probes every backend's /health endpoint."""
+    pool = BackendPool(["http://a", "http://b"])
+
+    def fake_get(url, timeout=None):
+        if url.startswith("http://a"):
+            raise requests.exceptions.ConnectionError("down")
+        return Mock(raise_for_status=Mock())
+
+    with patch("requests.get", side_effect=fake_get):
+        pool.check_health()
+
+    backends = {b.url: b for b in pool.get_backends()}
+    assert backends["http://a"].is_ejected
+    assert not backends["http://b"].is_ejected
+
+
+def test_long_request_on_fast_backend_is_not_slow():
+    """Test that latency is compared per unit of work, not per request."""
+    pool = BackendPool(["http://a", "http://b", "http://c"], slow_factor=3.0)
+    backends = pool.get_backends()
+
+    for backend in backends[:2]:
+        pool.acquire()
+        pool.release(backend, elapsed=0.5, cost=5.0, unit=AUDIO_SECONDS)
+    pool.acquire()
+    # A 10 minute file taking 60 s is the same 0.1 s per audio second as its peers
+    pool.release(backends[2], elapsed=60.0, cost=600.0, unit=AUDIO_SECONDS)
+
+    assert not backends[2].is_ejected
+    assert backends[2].latency[AUDIO_SECONDS] == pytest.approx(0.1)
+
+
+def test_units_are_compared_separately():
+    """Test that per-character and per-second latencies don't mix."""
+    pool = BackendPool(["http://a", "http://b"], slow_factor=3.0)
+    backend_a, backend_b = pool.get_backends()
+
+    pool.acquire()
+    pool.release(backend_a, elapsed=1.0, cost=1000, unit=CHARACTERS)
+    pool.acquire()
+    pool.release(backend_b, elapsed=1.0, cost=2.0, unit=AUDIO_SECONDS)
+
+    assert not backend_a.is_ejected and not backend_b.is_ejected
+
+
+def test_call_moves_to_next_backend_on_connection_error():
+    """Test that a dead backend is skipped within the same call."""
+    pool = BackendPool(["http://a", "http://b"])
+    attempts = []
+
+    def send(base_url):
+        attempts.append(base_url)
+        if base_url == "http://a":
+            raise requests.exceptions.ConnectionError("refused")
+        return "ok"
+
+    assert pool.call(send) == "ok"
+    assert attempts == ["http://a", "http://b"]
+    assert pool.get_backends()[0].failures == 1
+
+
+def test_call_raises_when_every_backend_is_down():
+    """Test that each backend is tried once before giving up."""
+    pool = BackendPool(["http://a", "http://b"])
+    send = Mock(side_effect=requests.exceptions.ConnectionError("refused"))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        pool.call(send)
+
+    assert send.call_count == 2
+
+
+def test_call_does_not_retry_server_errors():
+    """Test that HTTP errors are not retried; the request did reach a server."""
+    pool = BackendPool(["http://a", "http://b"])
+    send = Mock(side_effect=requests.exceptions.HTTPError(response=Mock(status_code=500)))
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        pool.call(send)
+
+    assert send.call_count == 1
+
+
+def test_readmission_probe_is_single_flight():
+    """Test that concurrent callers finding the same expired ejection send one /health probe."""
+    pool = BackendPool(["http://a", "http://b"], eject_seconds=0.0)
+    backend_a = pool.get_backends()[0]
+    backend_a.ejected_until = 1e-9
+    probing = threading.Event()
+    release = threading.Event()
+
+    def slow_get(url, timeout=None):
+        probing.set()
+        release.wait(5)
+        return Mock(raise_for_status=Mock())
+
+    with patch("requests.get", side_effect=slow_get) as mock_get:
+        first = threading.Thread(target=pool.acquire)
+        first.start()
+        assert probing.wait(5)
+        # Meanwhile another request is routed to the healthy backend without probing again
+        assert pool.acquire().url == "http://b"
+        release.set()
+        first.join(5)
+
+    assert mock_get.call_count == 1
+    assert not backend_a.is_ejected
+    assert not backend_a.probing
+
+
+def test_background_health_checks_eject_dead_backends():
+    """Test that a pool with health_interval probes its backends without any request."""
+    def fake_get(url, timeout=None):
+        if url.startswith("http://a"):
+            raise requests.exceptions.ConnectionError("down")
+        return Mock(raise_for_status=Mock())
+
+    with patch("requests.get", side_effect=fake_get):
+        pool = BackendPool(["http://a", "http://b"], health_interval=0.01)
+        try:
+            deadline = time.monotonic() + 5
+            while not pool.get_backends()[0].is_ejected and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            pool.close()
+
+    assert pool.get_backends()[0].is_ejected
+    assert not pool.get_backends()[1].is_ejected
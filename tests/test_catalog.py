@@ -0,0 +1,175 @@
+"""Tests for the SQLite recordings catalog."""
+import os
+import sqlite3
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import requests
+import soundfile as sf
+
+from src.catalog import RECORDING, SPEECH, RecordingCatalog, file_hash
+from src.speech_to_text import SpeechToText
+
+
+def _write_take(path: Path, frames: int = 4410, value: int = 100) -> Path:
+    sf.write(path, np.full((frames, 1), value, dtype=np.int16), 44100, subtype="PCM_16")
+    return path
+
+
+def test_add_recording_reads_audio_metadata(tmp_path: Path) -> None:
+    catalog = RecordingCatalog(tmp_path / "catalog.sqlite3")
+    take = _write_take(tmp_path / "take.wav")
+
+    entry = catalog.add_recording(take)
+
+    assert entry.path == take.resolve()
+    assert entry.format == "wav"
+    assert entry.samplerate == 44100
+    assert entry.channels == 1
+    assert abs(entry.duration - 0.1) < 1e-6
+    assert entry.content_hash == file_hash(take)
+    assert catalog.find_by_hash(entry.content_hash) == [entry]
+
+
+def test_transcript_before_metadata_is_merged(tmp_path: Path) -> None:
+    catalog = RecordingCatalog(tmp_path / "catalog.sqlite3")
+    take = tmp_path / "take.wav"
+
+    catalog.set_transcript(take, "reunião de planejamento", "pt")
+    _write_take(take)
+    entry = catalog.add_recording(take)
+
+    assert entry.transcript == "reunião de planejamento"
+    assert entry.language == "pt"
+    assert entry.samplerate == 44100
+
+
+def test_search_transcripts(tmp_path: Path) -> None:
+    catalog = RecordingCatalog(tmp_path / "catalog.sqlite3")
+    first = _write_take(tmp_path / "a.wav")
+    second = _write_take(tmp_path / "b.wav", value=7)
+    catalog.add_recording(first)
+    catalog.add_recording(second)
+    catalog.set_transcript(first, "Orçamento do projeto aprovado")
+    catalog.set_transcript(second, "Agenda da próxima reunião")
+    catalog.set_transcript(second, "Agenda revisada do projeto")
+
+    assert [e.path.name for e in catalog.search("orcamento")] == ["a.wav"]
+    assert {e.path.name for e in catalog.search("projeto")} == {"a.wav", "b.wav"}
+    assert catalog.search("reunião") == []
+    assert catalog.search('"') == []
+
+
+def test_sync_directory_is_incremental(tmp_path: Path) -> None:
+    recordings = tmp_path / "recordings"
+    (recordings / "old").mkdir(parents=True)
+    _write_take(recordings / "a.wav")
+    _write_take(recordings / "old" / "b.wav")
+    (recordings / "notes.txt").write_text("x")
+    catalog = RecordingCatalog(recordings / "catalog.sqlite3")
+
+    assert catalog.sync_directory(recordings) == 2
+    assert catalog.sync_directory(recordings) == 0
+
+    newer = _write_take(recordings / "c.wav")
+    os.utime(newer, (2e9, 2e9))
+    assert catalog.sync_directory(recordings) == 1
+    assert catalog.latest().path.name == "c.wav"
+
+
+
+def test_latest_recording_skips_speech_and_empty_files(tmp_path: Path) -> None:
+    """Test that the newest-recording fallback ignores synthesized speech and reserved empty files."""
+    catalog = RecordingCatalog(tmp_path / "catalog.sqlite3")
+    take = _write_take(tmp_path / "take.wav")
+    speech = _write_take(tmp_path / "speech.wav")
+    os.utime(speech, (2e9, 2e9))
+    empty = tmp_path / "empty.wav"
+    empty.touch()
+    os.utime(empty, (3e9, 3e9))
+    catalog.add_recording(take)
+    catalog.add_recording(speech, kind=SPEECH)
+    catalog.add_recording(empty)
+
+    assert catalog.latest().path.name == "speech.wav"
+    assert catalog.latest(kind=RECORDING).path.name == "take.wav"
+    # Re-indexing without a kind keeps the one it had
+    catalog.sync_directory(tmp_path)
+    os.utime(speech, (2.5e9, 2.5e9))
+    assert catalog.sync_directory(tmp_path) == 1
+    assert catalog.get(speech).kind == SPEECH
+
+
+def test_latest_skips_and_prunes_deleted_files(tmp_path: Path) -> None:
+    """Test that a deleted newest take falls through to the next recording and leaves the catalog."""
+    catalog = RecordingCatalog(tmp_path / "catalog.sqlite3")
+    older = _write_take(tmp_path / "older.wav")
+    newer = _write_take(tmp_path / "newer.wav")
+    os.utime(newer, (2e9, 2e9))
+    catalog.add_recording(older)
+    catalog.add_recording(newer)
+    newer.unlink()
+
+    assert catalog.latest(kind=RECORDING).path.name == "older.wav"
+    assert catalog.get(newer) is None
+
+    older.unlink()
+    assert catalog.latest() is None
+
+
+def test_sync_directory_skips_export_temp_files_and_vanished_files(tmp_path: Path) -> None:
+    """Test that MP3 export temp files are not indexed and a file deleted mid-scan isn't an error."""
+    _write_take(tmp_path / "a.tmp.wav")
+    _write_take(tmp_path / "b.wav")
+    gone = _write_take(tmp_path / "c.wav")
+    catalog = RecordingCatalog(tmp_path / "catalog.sqlite3")
+    add_recording = catalog.add_recording
+
+    def vanishing(file_path, *args, **kwargs):
+        if file_path.name == gone.name:
+            gone.unlink()
+        return add_recording(file_path, *args, **kwargs)
+
+    with patch.object(catalog, "add_recording", side_effect=vanishing):
+        assert catalog.sync_directory(tmp_path) == 1
+
+    assert catalog.get(tmp_path / "b.wav") is not None
+    assert catalog.get(tmp_path / "a.tmp.wav") is None
+
+
+def test_old_catalog_gets_kind_column(tmp_path: Path) -> None:
+    """Test that a catalog created before the kind column is migrated on open."""
+    db_path = tmp_path / "catalog.sqlite3"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE recordings (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, format TEXT, duration REAL, "
+        "samplerate INTEGER, channels INTEGER, size INTEGER, mtime REAL, content_hash TEXT, "
+        "created_at TEXT NOT NULL, transcript TEXT, language TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO recordings (path, size, mtime, created_at) VALUES (?, 10, 1.0, 'x')", (str(tmp_path / "a.wav"),)
+    )
+    conn.commit()
+    conn.close()
+    (tmp_path / "a.wav").write_bytes(b"0" * 10)
+
+    catalog = RecordingCatalog(db_path)
+
+    assert catalog.latest(kind=RECORDING).path.name == "a.wav"
+    (tmp_path / "a.wav").unlink()
+    assert catalog.latest() is None
+
+
+def test_speech_to_text_records_transcripts(tmp_path: Path) -> None:
+    catalog = RecordingCatalog(tmp_path / "catalog.sqlite3")
+    take = _write_take(tmp_path / "take.wav")
+
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        stt = SpeechToText(catalog=catalog)
+
+    response = Mock(raise_for_status=Mock(), json=lambda: {"text": "bom dia"})
+    with patch("requests.post", return_value=response):
+        stt.transcribe_file(take, language="pt")
+
+    assert catalog.get(take).transcript == "bom dia"
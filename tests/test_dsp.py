@@ -0,0 +1,128 @@
+"""Tests for the block DSP chain: filters, normalization, dither and the file/take passes."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.dsp import DCBlocker, DspChain, HighPassFilter, Normalizer, TPDFDither, benchmark
+
+
+def _reference_highpass(x: np.ndarray, a: float) -> np.ndarray:
+    y = np.zeros_like(x)
+    previous_x, previous_y = x[0].copy(), np.zeros(x.shape[1])
+    for n in range(len(x)):
+        previous_y = a * (previous_y + x[n] - previous_x)
+        previous_x = x[n]
+        y[n] = previous_y
+    return y
+
+
+def test_highpass_matches_sample_loop_across_blocks() -> None:
+    x = np.random.default_rng(1).standard_normal((3000, 2))
+    highpass = HighPassFilter(16000, cutoff=120.0, order=1)
+
+    output = np.concatenate([highpass.process(x[i:i + 700].astype(np.float32)) for i in range(0, 3000, 700)])
+
+    np.testing.assert_allclose(output, _reference_highpass(x, highpass._a), atol=1e-5)
+
+
+def test_dc_blocker_and_highpass_remove_offset_and_rumble() -> None:
+    samplerate = 16000
+    t = np.arange(samplerate * 2) / samplerate
+    tone = 0.2 * np.sin(2 * np.pi * 1000 * t)
+    rumble = 0.3 * np.sin(2 * np.pi * 20 * t)
+    signal = (0.25 + tone + rumble)[:, None].astype(np.float32)
+
+    chain = DspChain([DCBlocker(samplerate), HighPassFilter(samplerate, cutoff=80.0)])
+    output = np.concatenate([chain.process(signal[i:i + 512]) for i in range(0, len(signal), 512)])
+    settled = output[samplerate:, 0]
+
+    assert abs(settled.mean()) < 1e-3
+    assert settled.max() == pytest.approx(0.2, abs=0.03)
+
+
+def test_normalizer_peak_gain_is_capped_and_ramped() -> None:
+    normalizer = Normalizer("peak", target_db=-1.0, max_gain_db=6.0, samplerate=1000, release=0.5)
+    block = np.full((100, 1), 0.1, dtype=np.float32)
+
+    first = normalizer.process(block.copy())
+    for _ in range(60):
+        last = normalizer.process(block.copy())
+
+    assert normalizer.gain == pytest.approx(10 ** (6 / 20))
+    # Live, the gain starts at unity and only creeps up over the release time
+    assert first[0, 0] == pytest.approx(0.1)
+    assert first[-1, 0] < 0.1 * 10 ** (2 / 20)
+    assert last[-1, 0] == pytest.approx(0.1 * 10 ** (6 / 20), rel=1e-3)
+
+
+def test_normalizer_attack_cuts_gain_quickly_on_a_loud_block() -> None:
+    normalizer = Normalizer("peak", target_db=-1.0, samplerate=1000, attack=0.005, release=0.5)
+    for _ in range(30):
+        normalizer.process(np.full((100, 1), 0.05, dtype=np.float32))
+
+    loud = normalizer.process(np.full((100, 1), 0.8, dtype=np.float32))
+
+    assert loud[-1, 0] == pytest.approx(10 ** (-1 / 20), rel=1e-3)
+    assert np.abs(loud).max() <= 10 ** (-1 / 20) + 1e-6
+
+
+def test_process_frames_normalizes_a_take_with_one_gain() -> None:
+    rng = np.random.default_rng(3)
+    quiet = (rng.standard_normal((4000, 1)) * 300).astype(np.int16)
+    loud = (rng.standard_normal((4000, 1)) * 3000).astype(np.int16)
+    chain = DspChain([Normalizer("peak", target_db=-1.0, samplerate=16000)], dither=False)
+
+    output = chain.process_frames([quiet, loud])
+
+    gain = output[1].astype(np.float64).std() / loud.astype(np.float64).std()
+    assert output[0].astype(np.float64).std() / quiet.astype(np.float64).std() == pytest.approx(gain, rel=0.01)
+    assert np.abs(np.concatenate(output)).max() == pytest.approx(32768 * 10 ** (-1 / 20), abs=2)
+
+
+def test_dither_quantizes_to_int16_without_bias() -> None:
+    dither = TPDFDither(seed=0)
+    block = np.full((20000, 1), 100.25 / 32768, dtype=np.float32)
+
+    quantized = dither.to_int16(block)
+
+    assert quantized.dtype == np.int16
+    assert quantized.mean() == pytest.approx(100.25, abs=0.05)
+    assert TPDFDither(seed=0).to_int16(np.array([[2.0], [-2.0]], dtype=np.float32)).tolist() == [[32767], [-32768]]
+
+
+def test_chain_keeps_int16_blocks_int16() -> None:
+    chain = DspChain.for_speech(16000, normalize=None)
+    block = np.full((256, 1), 1000, dtype=np.int16)
+
+    output = chain.process(block)
+
+    assert output.dtype == np.int16
+    assert output.shape == block.shape
+
+
+def test_process_file_normalizes_whole_file_in_blocks(tmp_path: Path) -> None:
+    samplerate = 16000
+    t = np.arange(samplerate * 3) / samplerate
+    quiet = (0.05 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    quiet[samplerate:samplerate + 100] *= 4  # the loudest moment is in the middle
+    source = tmp_path / "quiet.wav"
+    destination = tmp_path / "conditioned.wav"
+    sf.write(source, quiet, samplerate, subtype="PCM_16")
+
+    chain = DspChain.for_speech(samplerate, normalize="peak")
+    chain.process_file(source, destination, blocksize=4096)
+
+    data, rate = sf.read(destination)
+    assert rate == samplerate
+    assert len(data) == len(quiet)
+    assert np.abs(data).max() == pytest.approx(10 ** (-1 / 20), abs=0.02)
+
+
+def test_benchmark_reports_real_time_factor() -> None:
+    result = benchmark(DspChain.for_speech(16000), samplerate=16000, seconds=1.0, blocksize=1024)
+
+    assert result.seconds == pytest.approx(1.0, abs=0.07)
+    assert 0 < result.real_time_factor < 1.0
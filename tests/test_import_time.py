@@ -0,0 +1,58 @@
+"""Cold-start guard: the headless core must import fast and without GUI/audio-device deps."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+CORE_MODULES = (
+    "src.audio_utils",
+    "src.audio_reader",
+    "src.speech_to_text",
+    "src.text_to_speech",
+    "src.recorder",
+    "src.multi_recorder",
+    "src.latency_probe",
+    "src.catalog",
+    "src.dsp",
+    "src.transcode",
+    "src.main",
+)
+HEAVY_MODULES = ("wx", "sounddevice", "pydub")
+# Generous for CI machines; locally the core imports in well under half of this
+IMPORT_BUDGET_SECONDS = 1.5
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _measure_cold_import() -> dict:
+    code = _PROBE.format(modules=CORE_MODULES, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_core_imports_without_gui_or_audio_device_packages() -> None:
+    assert _measure_cold_import()["loaded"] == []
+
+
+def test_core_import_time_within_budget() -> None:
+    # Best of three, so a single slow spawn on a busy machine doesn't fail the build
+    best = min(_measure_cold_import()["elapsed"] for _ in range(3))
+    if best > IMPORT_BUDGET_SECONDS:
+        pytest.fail(f"Core import took {best:.2f}s (budget {IMPORT_BUDGET_SECONDS:.2f}s)")
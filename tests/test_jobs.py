@@ -0,0 +1,104 @@
+"""Tests for the bounded GUI job executor."""
+import threading
+
+from src.jobs import JobExecutor, UiUpdateBatcher
+
+
+def test_new_job_supersedes_previous_in_group():
+    """Test that a superseded job's result is never delivered."""
+    jobs = JobExecutor(max_workers=2)
+    release = threading.Event()
+    delivered = []
+    done = threading.Event()
+
+    def slow(job):
+        release.wait(timeout=2)
+        return "antigo"
+
+    first = jobs.submit("transcribe", slow, on_done=delivered.append)
+    jobs.submit("transcribe", lambda job: "novo", on_done=lambda r: (delivered.append(r), done.set()))
+    done.wait(timeout=2)
+    release.set()
+    first.future.result(timeout=2)
+    jobs.shutdown()
+
+    assert first.superseded
+    assert delivered == ["novo"]
+
+
+def test_supersede_false_keeps_both_jobs():
+    """Test that non-superseding groups deliver every result."""
+    jobs = JobExecutor(max_workers=2)
+    results = []
+
+    handles = [jobs.submit("save", lambda job, n=n: n, on_done=results.append, supersede=False) for n in range(3)]
+    for handle in handles:
+        handle.future.result(timeout=2)
+    jobs.shutdown()
+
+    assert sorted(results) == [0, 1, 2]
+
+
+def test_pool_is_bounded_and_queued_jobs_can_be_superseded():
+    """Test that queued work beyond max_workers waits and can be superseded before running."""
+    jobs = JobExecutor(max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    jobs.submit("a", lambda job: release.wait(timeout=2))
+    queued = jobs.submit("b", lambda job: ran.append("b"))
+    assert jobs.is_busy("b")
+    jobs.supersede("b")
+    release.set()
+    jobs.shutdown()
+
+    assert queued.superseded
+    assert ran == []
+
+
+def test_errors_go_to_on_error():
+    """Test that exceptions are delivered to the error callback."""
+    jobs = JobExecutor(max_workers=1)
+    errors = []
+
+    def fail(job):
+        raise RuntimeError("falhou")
+
+    handle = jobs.submit("x", fail, on_error=errors.append)
+    handle.future.result(timeout=2)
+    jobs.shutdown()
+
+    assert [str(e) for e in errors] == ["falhou"]
+
+
+def test_shutdown_drains_queued_saves_but_drops_supersedable_jobs():
+    """Test that shutdown still runs queued non-superseding jobs and cancels the rest."""
+    jobs = JobExecutor(max_workers=1)
+    release = threading.Event()
+    ran = []
+    delivered = []
+
+    jobs.submit("transcribe", lambda job: release.wait(timeout=2))
+    jobs.submit("speak", lambda job: ran.append("speak"))
+    save = jobs.submit("save", lambda job: ran.append("save"), on_done=delivered.append, supersede=False)
+    threading.Timer(0.05, release.set).start()
+
+    assert jobs.shutdown(timeout=2)
+    assert save.future.done() and not save.superseded
+    assert ran == ["save"]
+    assert delivered == []
+
+
+def test_ui_batcher_coalesces_updates():
+    """Test that posted updates share one dispatch and keyed updates keep the latest value."""
+    dispatched = []
+    batcher = UiUpdateBatcher(dispatched.append)
+    labels = []
+
+    batcher.post(labels.append, "Transcrevendo...", key="status")
+    batcher.post(labels.append, "extra")
+    batcher.post(labels.append, "Transcrição concluída.", key="status")
+
+    assert len(dispatched) == 1
+    dispatched[0]()
+    assert labels == ["extra", "Transcrição concluída."]
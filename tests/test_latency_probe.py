@@ -0,0 +1,89 @@
+"""Tests for the capture latency and jitter probe."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src import latency_probe
+from src.audio_utils import AudioSettings
+from src.latency_probe import LatencyProbe, measure_latency
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # not installed, or PortAudio missing
+    pytest.skip("sounddevice not available", allow_module_level=True)
+
+
+def _feed(monkeypatch, probe: LatencyProbe, host_times: list[float], frames: int = 256, overflow_at=()) -> None:
+    # The Python clock runs late and uneven; the probe must go by PortAudio's stream time
+    clock = iter(np.cumsum(np.random.default_rng(0).uniform(0.001, 0.1, len(host_times))))
+    monkeypatch.setattr(latency_probe.time_module, "perf_counter", lambda: next(clock))
+    block = np.zeros((frames, 1), dtype=np.int16)
+    for index, host_time in enumerate(host_times):
+        time = SimpleNamespace(inputBufferAdcTime=host_time - 0.004, currentTime=host_time)
+        status = SimpleNamespace(input_overflow=index in overflow_at)
+        probe.callback(block, frames, time, status)
+
+
+def test_probe_reports_interval_jitter_and_input_latency(monkeypatch) -> None:
+    probe = LatencyProbe(samplerate=16000)
+    # 256 frames at 16 kHz = 16 ms per block, with one late callback
+    _feed(monkeypatch, probe, [1.000, 1.016, 1.032, 1.052, 1.064], overflow_at={3})
+
+    report = probe.report(reported_latency=0.01)
+
+    assert report.callbacks == 5
+    assert report.frames == 5 * 256
+    assert report.blocksize_mean == 256
+    assert report.interval_mean_ms == pytest.approx(16.0)
+    assert report.interval_max_ms == pytest.approx(20.0)
+    assert report.jitter_ms == pytest.approx(np.std([16, 16, 20, 12]))
+    assert report.input_latency_mean_ms == pytest.approx(4.0)
+    assert report.reported_latency_ms == pytest.approx(10.0)
+    assert report.overflows == 1
+    assert report.drift_frames == 0
+    assert "jitter" in report.format()
+
+
+def test_probe_without_stream_timestamps(monkeypatch) -> None:
+    probe = LatencyProbe(samplerate=16000)
+    clock = iter([1.0, 1.02])
+    monkeypatch.setattr(latency_probe.time_module, "perf_counter", lambda: next(clock))
+    probe.callback(np.zeros((10, 1)), 10, None, None)
+    probe.callback(np.zeros((10, 1)), 10, SimpleNamespace(inputBufferAdcTime=0.0, currentTime=0.0), None)
+
+    report = probe.report()
+
+    assert report.callbacks == 2
+    assert report.interval_mean_ms == pytest.approx(20.0)
+    assert report.input_latency_mean_ms is None
+    assert report.reported_latency_ms is None
+
+
+@pytest.mark.skipif(not hasattr(sd, "InputStream"), reason="sounddevice not available")
+def test_measure_latency_opens_stream_with_settings(monkeypatch) -> None:
+    opened = {}
+
+    class FakeStream:
+        latency = 0.005
+
+        def __init__(self, **kwargs) -> None:
+            opened.update(kwargs)
+
+        def __enter__(self):
+            block = np.zeros((128, 1), dtype=np.int16)
+            opened["callback"](block, 128, None, None)
+            return self
+
+        def __exit__(self, *exc) -> None:
+            pass
+
+    monkeypatch.setattr(sd, "InputStream", FakeStream)
+
+    report = measure_latency(AudioSettings(blocksize=128, latency="low", device=2), seconds=0)
+
+    assert opened["blocksize"] == 128
+    assert opened["latency"] == "low"
+    assert opened["device"] == 2
+    assert report.callbacks == 1
+    assert report.reported_latency_ms == pytest.approx(5.0)
@@ -0,0 +1,116 @@
+"""Tests for packing short clips into shared transcription requests."""
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+import requests
+import soundfile as sf
+
+from src import micro_batch
+from src.micro_batch import ClipBatch, PackedClip, pack_clips, split_result, transcribe_packed
+from src.speech_to_text import SpeechToText
+
+
+def _clip(seconds: float) -> np.ndarray:
+    return np.full(int(seconds * 16000), 0.1, dtype=np.float32)
+
+
+def _write_clip(path: Path, seconds: float, samplerate: int = 8000) -> Path:
+    sf.write(path, np.full(int(seconds * samplerate), 1000, dtype=np.int16), samplerate)
+    return path
+
+
+def test_pack_clips_inserts_gaps_and_respects_batch_length() -> None:
+    batches = pack_clips([(0, _clip(2)), (1, _clip(3)), (2, _clip(2.5))], gap_seconds=1.0, max_batch_seconds=7.0)
+
+    assert [[clip.index for clip in batch.clips] for batch in batches] == [[0, 1], [2]]
+    first = batches[0]
+    assert first.clips[1] == PackedClip(index=1, start=3.0, end=6.0)
+    assert first.duration == pytest.approx(6.0)
+    assert sum(len(piece) for piece in first.pieces) == 6 * 16000
+
+
+def test_split_result_by_word_midpoints() -> None:
+    batch = ClipBatch(clips=[PackedClip(0, 0.0, 1.0), PackedClip(1, 2.0, 3.0)])
+    result = {
+        "words": [
+            {"start": 0.1, "end": 0.5, "word": " abrir"},
+            {"start": 0.6, "end": 1.2, "word": " porta"},  # runs into the gap, midpoint still in clip 0
+            {"start": 2.1, "end": 2.6, "word": " sim"},
+        ]
+    }
+
+    texts, ambiguous = split_result(batch, result)
+
+    assert texts == {0: "abrir porta", 1: "sim"}
+    assert ambiguous == set()
+
+
+def test_split_result_flags_segments_spanning_clips() -> None:
+    batch = ClipBatch(clips=[PackedClip(0, 0.0, 1.0), PackedClip(1, 2.0, 3.0), PackedClip(2, 4.0, 5.0)])
+    result = {
+        "segments": [
+            {"start": 0.0, "end": 2.8, "text": " um dois"},
+            {"start": 4.1, "end": 4.9, "text": " três"},
+        ]
+    }
+
+    texts, ambiguous = split_result(batch, result)
+
+    assert texts[2] == "três"
+    assert ambiguous == {0, 1}
+
+
+def test_transcribe_files_packs_short_clips_into_one_request(tmp_path: Path) -> None:
+    files = [_write_clip(tmp_path / f"clip{i}.wav", 1.0) for i in range(5)]
+    long_file = _write_clip(tmp_path / "long.wav", 8.0)
+    posts = []
+
+    def fake_post(url, files=None, data=None, timeout=None):
+        posts.append(data)
+        if data.get("response_format") == "verbose_json":
+            duration = sf.info(files["file"][1]).duration
+            assert duration == pytest.approx(9.0)  # 5 clips of 1 s + 4 gaps of 1 s
+            words = [{"start": 2 * i + 0.2, "end": 2 * i + 0.8, "word": f" palavra{i}"} for i in range(5)]
+            return Mock(raise_for_status=Mock(), json=lambda: {"text": "", "segments": [], "words": words})
+        return Mock(raise_for_status=Mock(), json=lambda: {"text": "arquivo longo"})
+
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        stt = SpeechToText()
+    with patch("requests.post", side_effect=fake_post):
+        texts = stt.transcribe_files([files[0], long_file, *files[1:]], pack=True)
+
+    assert texts == ["palavra0", "arquivo longo", "palavra1", "palavra2", "palavra3", "palavra4"]
+    assert len(posts) == 2
+    assert posts[0]["timestamp_granularities[]"] == ["segment", "word"]
+
+
+def test_transcribe_files_without_packing_is_one_request_per_file(tmp_path: Path) -> None:
+    files = [_write_clip(tmp_path / f"clip{i}.wav", 1.0) for i in range(3)]
+    response = Mock(raise_for_status=Mock(), json=lambda: {"text": "ok"})
+
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        stt = SpeechToText()
+    with patch("requests.post", return_value=response) as mock_post:
+        assert stt.transcribe_files(files) == ["ok", "ok", "ok"]
+
+    assert mock_post.call_count == 3
+
+
+def test_transcribe_packed_reads_clips_one_batch_at_a_time(tmp_path: Path, monkeypatch) -> None:
+    files = [_write_clip(tmp_path / f"clip{i}.wav", 1.0) for i in range(6)]
+    read = []
+    real_read = sf.read
+    monkeypatch.setattr(micro_batch.sf, "read", lambda path, **kwargs: read.append(path) or real_read(path, **kwargs))
+    loaded_per_request = []
+
+    def transcribe_verbose(buffer, filename, language, word_timestamps):
+        loaded_per_request.append(len(read))
+        assert sf.info(buffer).duration == pytest.approx(3.0)  # 2 clips of 1 s + one gap
+        return {"segments": [], "words": []}
+
+    stt = Mock(transcribe_verbose=transcribe_verbose)
+    transcribe_packed(stt, files, max_batch_seconds=3.0, max_workers=1)
+
+    assert loaded_per_request == [2, 4, 6]
@@ -0,0 +1,125 @@
+"""Tests for concurrent multi-device capture and per-track transcription."""
+import json
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.audio_utils import AudioSettings
+from src.multi_recorder import CaptureSource, MultiRecorder, transcribe_tracks
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # not installed, or PortAudio missing
+    pytest.skip("sounddevice not available", allow_module_level=True)
+
+
+class FakeStream:
+    def __init__(self, *args, **kwargs) -> None:
+        self.kwargs = kwargs
+        self.callback = kwargs["callback"]
+        self.started = False
+        self.closed = False
+
+    def start(self) -> None:
+        self.started = True
+
+    def stop(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_streams(monkeypatch):
+    streams = []
+
+    def fake_input_stream(*args, **kwargs):
+        stream = FakeStream(*args, **kwargs)
+        streams.append(stream)
+        return stream
+
+    monkeypatch.setattr(sd, "InputStream", fake_input_stream)
+    return streams
+
+
+def test_multi_recorder_writes_one_file_per_channel(fake_streams, tmp_path: Path) -> None:
+    sources = [CaptureSource(device=1, channels=2, name="mesa"), CaptureSource(device=2, channels=1, name="lapela")]
+    recorder = MultiRecorder(sources, AudioSettings(samplerate=16000), tmp_path)
+
+    session = recorder.start()
+    assert [stream.kwargs["device"] for stream in fake_streams] == [1, 2]
+    assert all(stream.started for stream in fake_streams)
+
+    stereo = np.stack([np.full(100, 1, dtype=np.int16), np.full(100, 2, dtype=np.int16)], axis=1)
+    mono = np.full((100, 1), 3, dtype=np.int16)
+    fake_streams[0].callback(stereo, 100, None, None)
+    fake_streams[0].callback(stereo, 100, None, None)
+    fake_streams[1].callback(mono, 100, None, None)
+
+    time.sleep(0.2)
+    session = recorder.stop()
+
+    names = sorted(track.file_path.name for track in session.tracks)
+    assert names == ["lapela_ch01.wav", "mesa_ch01.wav", "mesa_ch02.wav"]
+    left, _ = sf.read(session.directory / "mesa_ch01.wav", dtype="int16")
+    right, _ = sf.read(session.directory / "mesa_ch02.wav", dtype="int16")
+    assert len(left) == 200 and set(left) == {1}
+    assert set(right) == {2}
+
+    metadata = json.loads((session.directory / "session.json").read_text(encoding="utf-8"))
+    assert metadata["samplerate"] == 16000
+    assert [clock["frames"] for clock in metadata["clocks"]] == [200, 100]
+    assert all(stream.closed for stream in fake_streams)
+
+
+def test_transcribe_tracks_fans_out(fake_streams, tmp_path: Path) -> None:
+    recorder = MultiRecorder([CaptureSource(channels=2)], AudioSettings(), tmp_path)
+    recorder.start()
+    fake_streams[0].callback(np.zeros((50, 2), dtype=np.int16), 50, None, None)
+    time.sleep(0.2)
+    session = recorder.stop()
+
+    stt = Mock()
+    stt.transcribe_file.side_effect = lambda path, language: f"texto {path.name}"
+
+    results = transcribe_tracks(stt, session)
+
+    assert results == {
+        "src1_ch01.wav": "texto src1_ch01.wav",
+        "src1_ch02.wav": "texto src1_ch02.wav",
+    }
+
+
+def test_multi_recorder_requires_sources(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        MultiRecorder([], AudioSettings(), tmp_path)
+
+
+def test_sessions_started_in_the_same_second_get_their_own_directory(fake_streams, tmp_path: Path) -> None:
+    first = MultiRecorder([CaptureSource()], AudioSettings(), tmp_path)
+    second = MultiRecorder([CaptureSource()], AudioSettings(), tmp_path)
+
+    directories = {first.start().directory, second.start().directory}
+    first.stop()
+    second.stop()
+
+    assert len(directories) == 2
+    assert all((directory / "session.json").exists() for directory in directories)
+
+
+def test_stop_writes_queued_blocks_before_closing_files(fake_streams, tmp_path: Path) -> None:
+    recorder = MultiRecorder([CaptureSource()], AudioSettings(samplerate=16000), tmp_path)
+    recorder.start()
+    for _ in range(50):
+        fake_streams[0].callback(np.full((1000, 1), 7, dtype=np.int16), 1000, None, None)
+
+    session = recorder.stop()
+
+    audio, _ = sf.read(session.tracks[0].file_path, dtype="int16")
+    assert len(audio) == 50_000
+    assert session.clocks[0].frames == 50_000
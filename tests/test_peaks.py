@@ -0,0 +1,114 @@
+"""Tests for the multi-resolution peak index."""
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from src.peaks import PeakPyramid, peaks_path_for
+
+
+def _sine(frames: int = 200_000, amplitude: int = 16000) -> np.ndarray:
+    samples = np.sin(np.arange(frames) / 20.0) * amplitude
+    return samples.astype(np.int16).reshape(-1, 1)
+
+
+def test_incremental_build_matches_signal() -> None:
+    signal = _sine()
+    pyramid = PeakPyramid(44100, base_bin=256, factor=4)
+    for start in range(0, len(signal), 1000):
+        pyramid.add(signal[start:start + 1000])
+
+    summary = pyramid.query(0, len(signal), 50)
+
+    assert pyramid.frames == len(signal)
+    assert len(summary.maxs) == 50
+    np.testing.assert_allclose(summary.maxs, 16000 / 32768, atol=1e-3)
+    np.testing.assert_allclose(summary.mins, -16000 / 32768, atol=1e-3)
+    np.testing.assert_allclose(summary.rms, 16000 / 32768 / np.sqrt(2), rtol=0.05)
+
+
+def test_query_zoomed_range_shows_local_peak() -> None:
+    signal = np.zeros((100_000, 1), dtype=np.int16)
+    signal[60_000:60_100] = 32000
+    pyramid = PeakPyramid(44100)
+    pyramid.add(signal)
+
+    overview = pyramid.query(0, 100_000, 10)
+    zoomed = pyramid.query(50_000, 70_000, 20)
+
+    assert overview.maxs[6] > 0.9
+    assert overview.maxs[0] == 0
+    assert zoomed.maxs.argmax() == 10
+
+
+def test_latest_level_tracks_last_block() -> None:
+    pyramid = PeakPyramid(44100)
+    pyramid.add(np.full((512, 2), 16384, dtype=np.int16))
+
+    peak, rms = pyramid.latest_level()
+
+    assert peak == 0.5
+    assert rms == 0.5
+
+
+def test_sidecar_round_trip(tmp_path: Path) -> None:
+    pyramid = PeakPyramid(44100)
+    pyramid.add(_sine())
+    sidecar = peaks_path_for(tmp_path / "take.wav")
+
+    pyramid.save(sidecar)
+    loaded = PeakPyramid.load(sidecar)
+
+    assert sidecar.name == "take.wav.peaks"
+    assert loaded.frames == pyramid.frames
+    original = pyramid.query(0, pyramid.frames, 30)
+    restored = loaded.query(0, loaded.frames, 30)
+    np.testing.assert_allclose(restored.maxs, original.maxs, atol=1e-3)
+    np.testing.assert_allclose(restored.rms, original.rms, atol=1e-3)
+
+
+def test_from_file(tmp_path: Path) -> None:
+    path = tmp_path / "take.wav"
+    signal = _sine(frames=50_000)
+    sf.write(path, signal, 44100, subtype="PCM_16")
+
+    pyramid = PeakPyramid.from_file(path, blocksize=4096)
+
+    assert pyramid.frames == 50_000
+    assert pyramid.query(0, 50_000, 5).maxs.max() > 0.45
+
+
+def test_query_shows_loud_tail_beyond_complete_bins() -> None:
+    """Test that frames past the last complete bin of a level still show up."""
+    samplerate = 44100
+    signal = np.zeros((100 * samplerate, 1), dtype=np.int16)
+    signal[96 * samplerate:] = 30000
+    pyramid = PeakPyramid(samplerate)
+    for start in range(0, len(signal), 4410):
+        pyramid.add(signal[start:start + 4410])
+
+    overview = pyramid.query(0, 100 * samplerate, 10)
+    tail = pyramid.query(90 * samplerate, 100 * samplerate, 1)
+    last = pyramid.query(len(signal) - 100, len(signal), 1)
+
+    assert overview.maxs[-1] > 0.9
+    assert overview.maxs[:9].max() == 0
+    assert tail.maxs[0] > 0.9
+    np.testing.assert_allclose(last.rms, 30000 / 32768, rtol=1e-4)
+
+
+def test_finish_keeps_partial_bins_in_sidecar(tmp_path: Path) -> None:
+    """Test that the frames still pending at stop are saved with the sidecar."""
+    signal = np.zeros((1000, 1), dtype=np.int16)
+    signal[-100:] = 30000
+    pyramid = PeakPyramid(44100)
+    pyramid.add(signal)
+    pyramid.finish()
+    pyramid.save(tmp_path / "a.peaks")
+
+    loaded = PeakPyramid.load(tmp_path / "a.peaks")
+    summary = loaded.query(900, 1000, 1)
+
+    assert summary.maxs[0] > 0.9
+    # The partial last bin holds frames 768-999, 100 of them loud
+    np.testing.assert_allclose(summary.rms, 30000 / 32768 * np.sqrt(100 / 232), atol=1e-3)
@@ -1,10 +1,14 @@
+"""Tests for the callback-based audio recorder."""
+import sys
+import threading
 import time
+from types import SimpleNamespace
 
 import numpy as np
-import sounddevice as sd
 import pytest
 
 from src.audio_utils import AudioSettings
+from src import recorder as recorder_module
 from src.recorder import AudioRecorder
 
 
@@ -25,17 +29,21 @@ class FakeStream:
         self.closed = True
 
 
-@pytest.mark.skipif(not hasattr(sd, "InputStream"), reason="sounddevice not available")
-def test_recorder_collects_frames(monkeypatch) -> None:
-    holder = {}
+@pytest.fixture
+def streams(monkeypatch) -> list:
+    """Stand in for sounddevice (the recorder imports it lazily), so no PortAudio is needed."""
+    opened = []
 
     def fake_input_stream(*args, **kwargs):
         stream = FakeStream(*args, **kwargs)
-        holder["stream"] = stream
+        opened.append(stream)
         return stream
 
-    monkeypatch.setattr(sd, "InputStream", fake_input_stream)
+    monkeypatch.setitem(sys.modules, "sounddevice", SimpleNamespace(InputStream=fake_input_stream))
+    return opened
 
+
+def test_recorder_collects_frames(streams) -> None:
     settings = AudioSettings()
     recorder = AudioRecorder(settings)
     recorder.start()
@@ -47,9 +55,9 @@ def test_recorder_collects_frames(monkeypatch) -> None:
     time.sleep(0.2)
     frames = recorder.stop()
 
-    assert holder["stream"].started
-    assert holder["stream"].stopped
-    assert holder["stream"].closed
+    assert streams[0].started
+    assert streams[0].stopped
+    assert streams[0].closed
     assert len(frames) >= 2
     assert frames[0].shape == (50, settings.channels)
 
@@ -59,3 +67,90 @@ def test_stop_without_start() -> None:
     recorder = AudioRecorder(settings)
 
     assert recorder.stop() == []
+
+
+def test_recorder_builds_peak_index(streams) -> None:
+    settings = AudioSettings()
+    recorder = AudioRecorder(settings)
+    recorder.start()
+
+    chunk = np.full((512, settings.channels), 16384, dtype=np.int16)
+    recorder._callback(chunk, chunk.shape[0], None, None)
+
+    time.sleep(0.2)
+    assert recorder.get_level()[0] == 0.5
+    recorder.stop()
+
+    assert recorder.last_peaks is not None
+    assert recorder.last_peaks.frames == 512
+    assert recorder.get_level() == (0.0, 0.0)
+
+
+def test_overflow_count_survives_stop(streams) -> None:
+    recorder = AudioRecorder(AudioSettings())
+    recorder.start()
+    recorder._callback(None, 0, None, SimpleNamespace(input_overflow=True))
+    recorder.stop()
+
+    assert recorder.overflows == 1
+    recorder.start()
+    assert recorder.overflows == 0
+    recorder.stop()
+
+
+def test_recorder_applies_processor_in_collector(streams) -> None:
+    from src.dsp import DspChain
+
+    settings = AudioSettings()
+    recorder = AudioRecorder(settings, processor=DspChain.for_speech(settings.samplerate, normalize=None))
+    recorder.start()
+
+    # A constant offset is pure DC: after conditioning only dither noise is left
+    chunk = np.full((512, settings.channels), 8000, dtype=np.int16)
+    recorder._callback(chunk, chunk.shape[0], None, None)
+
+    time.sleep(0.2)
+    frames = recorder.stop()
+
+    assert frames[0].dtype == np.int16
+    assert np.abs(frames[0]).max() <= 1
+
+
+class StallingProcessor:
+    """Processor whose first block blocks the collector until released."""
+
+    def __init__(self) -> None:
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def reset(self) -> None:
+        pass
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        if not self.entered.is_set():
+            self.entered.set()
+            self.release.wait(timeout=2)
+        return chunk
+
+
+def test_late_collector_cannot_write_into_the_next_take(streams, monkeypatch) -> None:
+    monkeypatch.setattr(recorder_module, "STOP_TIMEOUT", 0.05)
+    processor = StallingProcessor()
+    settings = AudioSettings()
+    recorder = AudioRecorder(settings, processor=processor)
+    recorder.start()
+    old = np.ones((50, settings.channels), dtype=np.int16)
+    recorder._callback(old, old.shape[0], None, None)
+    assert processor.entered.wait(timeout=2)
+
+    with pytest.raises(RuntimeError):
+        recorder.stop()
+
+    recorder.start()
+    processor.release.set()
+    new = np.full((30, settings.channels), 2, dtype=np.int16)
+    recorder._callback(new, new.shape[0], None, None)
+    time.sleep(0.2)
+    frames = recorder.stop()
+
+    assert [frame.shape[0] for frame in frames] == [30]
@@ -0,0 +1,53 @@
+"""Tests for the band-limited streaming resampler."""
+import numpy as np
+import pytest
+
+from src.resample import StreamingResampler, resample
+
+
+def _tone(frequency: float, samplerate: int = 44100, seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+@pytest.mark.parametrize("target_rate", [8000, 16000, 48000])
+def test_passband_tone_keeps_its_level(target_rate: int) -> None:
+    """Test that a tone well below both Nyquist frequencies comes through unchanged in level."""
+    output = resample(_tone(440), 44100, target_rate)
+
+    assert len(output) == target_rate
+    assert np.abs(output[100:-100]).max() == pytest.approx(0.5, abs=0.005)
+
+
+def test_tone_above_new_nyquist_is_filtered_out() -> None:
+    """Test that downsampling doesn't alias a 10 kHz tone into the 16 kHz output."""
+    output = resample(_tone(10_000), 44100, 16000)
+
+    # Plain interpolation would fold it to a full-level 6 kHz tone
+    assert np.abs(output[200:-200]).max() < 1e-3
+
+
+def test_streaming_matches_one_shot() -> None:
+    """Test that block boundaries don't change the output, whatever the block sizes."""
+    signal = np.random.default_rng(0).standard_normal((20_000, 2)).astype(np.float32)
+    resampler = StreamingResampler(44100, 16000)
+
+    parts = []
+    position = 0
+    for size in [3, 997, 4000, 1, 14_999]:
+        parts.append(resampler.process(signal[position:position + size]))
+        position += size
+    parts.append(resampler.flush())
+
+    np.testing.assert_allclose(np.concatenate(parts), resample(signal, 44100, 16000), atol=1e-6)
+    assert sum(len(part) for part in parts) == int(np.ceil(20_000 * 16000 / 44100))
+
+
+def test_same_rate_is_passthrough() -> None:
+    """Test that equal rates return the samples untouched."""
+    signal = _tone(440).reshape(-1, 1)
+    resampler = StreamingResampler(44100, 44100)
+
+    np.testing.assert_array_equal(resampler.process(signal), signal)
+    assert len(resampler.flush()) == 0
+    np.testing.assert_array_equal(resample(signal, 44100, 44100), signal)
@@ -0,0 +1,164 @@
+"""Tests for the priority request scheduler."""
+import threading
+import time
+
+import pytest
+
+from src.scheduler import BULK, DEFAULT_LIMITS, INTERACTIVE, NORMAL, RequestScheduler, get_default_scheduler
+
+
+def _queue_waiters(scheduler, priority, count, order):
+    def wait_and_record():
+        with scheduler.slot(priority):
+            order.append(priority)
+
+    threads = [threading.Thread(target=wait_and_record) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _wait_for_queued(scheduler, priority, count):
+    deadline = time.monotonic() + 2
+    while scheduler.get_stats()[priority]["queued"] < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_slot_limits_total_concurrency():
+    """Test that no more than max_concurrency requests run at once."""
+    scheduler = RequestScheduler(max_concurrency=2)
+    scheduler.acquire(NORMAL)
+    scheduler.acquire(NORMAL)
+
+    order = []
+    threads = _queue_waiters(scheduler, NORMAL, 1, order)
+    _wait_for_queued(scheduler, NORMAL, 1)
+    assert order == []
+
+    scheduler.release(NORMAL)
+    for thread in threads:
+        thread.join(timeout=2)
+    assert order == [NORMAL]
+
+
+def test_interactive_jumps_ahead_of_bulk_backlog():
+    """Test that interactive requests are dispatched before queued bulk work."""
+    scheduler = RequestScheduler(max_concurrency=1)
+    scheduler.acquire(BULK)
+
+    order = []
+    threads = _queue_waiters(scheduler, BULK, 5, order)
+    _wait_for_queued(scheduler, BULK, 5)
+    threads += _queue_waiters(scheduler, INTERACTIVE, 1, order)
+    _wait_for_queued(scheduler, INTERACTIVE, 1)
+
+    scheduler.release(BULK)
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert order[0] == INTERACTIVE
+    assert order.count(BULK) == 5
+
+
+def test_bulk_is_not_starved():
+    """Test that weighted fair queueing still dispatches bulk work under load."""
+    scheduler = RequestScheduler(max_concurrency=1, weights={NORMAL: 2.0, BULK: 1.0})
+    scheduler.acquire(NORMAL)
+
+    order = []
+    threads = _queue_waiters(scheduler, NORMAL, 6, order)
+    _wait_for_queued(scheduler, NORMAL, 6)
+    threads += _queue_waiters(scheduler, BULK, 3, order)
+    _wait_for_queued(scheduler, BULK, 3)
+
+    scheduler.release(NORMAL)
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert BULK in order[:4]
+
+
+def test_per_class_limit():
+    """Test that a class cannot exceed its own concurrency limit."""
+    scheduler = RequestScheduler(max_concurrency=4, limits={BULK: 1})
+    scheduler.acquire(BULK)
+
+    order = []
+    threads = _queue_waiters(scheduler, BULK, 1, order)
+    _wait_for_queued(scheduler, BULK, 1)
+    assert scheduler.get_stats()[BULK] == {"running": 1, "queued": 1}
+
+    scheduler.release(BULK)
+    for thread in threads:
+        thread.join(timeout=2)
+    assert order == [BULK]
+
+
+def test_unknown_priority_rejected():
+    """Test that unknown priority classes are rejected."""
+    with pytest.raises(ValueError):
+        RequestScheduler().acquire("urgent")
+
+
+def test_acquire_times_out_and_leaves_queue():
+    """Test that a queued acquire gives up after its timeout."""
+    scheduler = RequestScheduler(max_concurrency=1)
+    scheduler.acquire(NORMAL)
+
+    assert scheduler.acquire(NORMAL, timeout=0.05) is False
+    assert scheduler.get_stats()[NORMAL] == {"running": 1, "queued": 0}
+
+    scheduler.release(NORMAL)
+    assert scheduler.acquire(NORMAL, timeout=0.05) is True
+
+
+def test_slot_raises_after_queue_timeout():
+    """Test that the scheduler-wide queue timeout applies to slot()."""
+    scheduler = RequestScheduler(max_concurrency=1, queue_timeout=0.05)
+    scheduler.acquire(BULK)
+
+    with pytest.raises(TimeoutError):
+        with scheduler.slot(BULK):
+            pass
+
+
+def test_default_scheduler_limits_only_bulk():
+    """Test that the default scheduler never queues interactive/normal work but caps bulk work."""
+    scheduler = get_default_scheduler()
+    bulk_limit = DEFAULT_LIMITS[BULK]
+
+    for _ in range(50):
+        assert scheduler.acquire(NORMAL, timeout=0.1)
+    assert scheduler.get_stats()[NORMAL] == {"running": 50, "queued": 0}
+    for _ in range(50):
+        scheduler.release(NORMAL)
+
+    for _ in range(bulk_limit):
+        assert scheduler.acquire(BULK, timeout=0.1)
+    try:
+        assert not scheduler.acquire(BULK, timeout=0.05)
+    finally:
+        for _ in range(bulk_limit):
+            scheduler.release(BULK)
+
+
+def test_bulk_saturated_default_scheduler_admits_interactive_at_once():
+    """Test that a batch filling the default scheduler's bulk slots doesn't delay an interactive request."""
+    scheduler = get_default_scheduler()
+    bulk_limit = DEFAULT_LIMITS[BULK]
+    order = []
+    for _ in range(bulk_limit):
+        assert scheduler.acquire(BULK, timeout=0.1)
+    waiting = _queue_waiters(scheduler, BULK, 3, order)
+    time.sleep(0.05)
+
+    try:
+        assert scheduler.get_stats()[BULK]["queued"] == 3
+        assert scheduler.acquire(INTERACTIVE, timeout=0)
+        scheduler.release(INTERACTIVE)
+    finally:
+        for _ in range(bulk_limit):
+            scheduler.release(BULK)
+        for thread in waiting:
+            thread.join(5)
+    assert order == [BULK] * 3
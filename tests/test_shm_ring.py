@@ -0,0 +1,191 @@
+"""Tests for the shared-memory ring, its consumers and the isolated recorder."""
+import multiprocessing as mp
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src import recorder as recorder_module
+from src.audio_utils import AudioSettings
+from src.capture_process import consume, encode_worker
+from src.recorder import AudioRecorder
+from src.shm_ring import SharedRingBuffer
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRingBuffer.create(capacity=8, channels=2, dtype="int16", samplerate=8000)
+    yield ring
+    ring.release()
+
+
+def _block(start: int, count: int) -> np.ndarray:
+    values = np.arange(start, start + count, dtype=np.int16)
+    return np.column_stack((values, -values))
+
+
+def test_reader_gets_zero_copy_views_across_the_wrap(ring) -> None:
+    reader = ring.reader()
+    ring.write(_block(0, 6))
+    first = reader.read()
+    assert first[:, 0].tolist() == [0, 1, 2, 3, 4, 5]
+    assert not first.flags.owndata
+
+    ring.write(_block(6, 4))
+    assert reader.read()[:, 0].tolist() == [6, 7]  # up to the end of the ring
+    assert reader.read()[:, 0].tolist() == [8, 9]  # wrapped to the start
+    assert reader.read() is None
+    assert reader.lost_frames == 0
+
+
+def test_slow_reader_skips_overwritten_frames(ring) -> None:
+    reader = ring.reader()
+    ring.write(_block(0, 4))
+    view = reader.read(max_frames=2)
+    ring.write(_block(4, 8))
+
+    assert not reader.still_valid()
+    assert reader.read()[:, 0].tolist() == [4, 5, 6, 7]
+    assert reader.lost_frames == 2
+    ring.close()
+    assert reader.read()[:, 0].tolist() == [8, 9, 10, 11]
+    assert reader.drained()
+    del view
+
+
+def test_encode_worker_consumes_ring_in_another_process(tmp_path: Path) -> None:
+    context = mp.get_context("spawn")
+    # Big enough to hold everything while the spawned worker is still starting up
+    ring = SharedRingBuffer.create(capacity=16000, channels=1, dtype="int16", samplerate=8000)
+    output = tmp_path / "take.wav"
+    try:
+        worker = context.Process(target=encode_worker, args=(ring.spec, output))
+        worker.start()
+        for index in range(10):
+            ring.write(np.full((800, 1), index, dtype=np.int16))
+            time.sleep(0.01)
+        ring.close()
+        worker.join(30)
+        assert worker.exitcode == 0
+    finally:
+        ring.release()
+
+    data, samplerate = sf.read(output, dtype="int16")
+    assert samplerate == 8000
+    assert len(data) == 8000
+    assert data[-1] == 9
+
+
+def test_reopen_starts_a_new_stream_for_new_readers(ring) -> None:
+    ring.write(_block(0, 6))
+    ring.count_overflow()
+    ring.close()
+
+    ring.reopen()
+    ring.write(_block(6, 2))
+
+    assert not ring.closed
+    assert ring.overflows == 0
+    assert ring.reader().read()[:, 0].tolist() == [6, 7]
+
+
+def test_consume_counts_frames_overwritten_while_the_handler_ran(ring) -> None:
+    ring.write(_block(0, 4))
+    seen = []
+
+    def handler(block: np.ndarray) -> None:
+        seen.append(len(block))
+        if len(seen) == 1:
+            # The producer laps the view the handler is still working on
+            ring.write(_block(4, 8))
+            ring.close()
+
+    lost = consume(ring.spec, handler)
+
+    assert seen[0] == 4
+    assert lost == 4
+
+
+class FakeCaptureProcess:
+    instances = 0
+
+    def __init__(self, settings: AudioSettings) -> None:
+        FakeCaptureProcess.instances += 1
+        self.ring = SharedRingBuffer.create(capacity=1024, channels=settings.channels, dtype=settings.dtype)
+        self.ring.close()
+        self.released = False
+        self._producer: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.ring.reopen()
+
+        def produce() -> None:
+            for _ in range(4):
+                self.ring.write(np.full((256, 1), 1000, dtype=np.int16))
+                time.sleep(0.01)
+
+        self._producer = threading.Thread(target=produce)
+        self._producer.start()
+
+    def stop(self) -> None:
+        self._producer.join()
+        self.ring.close()
+
+    def release(self) -> None:
+        self.released = True
+        self.ring.release()
+
+
+def test_isolated_recorder_collects_from_ring(monkeypatch) -> None:
+    monkeypatch.setattr(recorder_module, "CaptureProcess", FakeCaptureProcess)
+
+    recorder = AudioRecorder(AudioSettings(), isolated=True)
+    recorder.start()
+    time.sleep(0.1)
+    frames = recorder.stop()
+    recorder.close()
+
+    assert sum(len(frame) for frame in frames) == 1024
+    assert all(frame.flags.owndata for frame in frames)
+    assert recorder.last_peaks.frames == 1024
+
+
+def test_isolated_recorder_keeps_one_capture_process_across_takes(monkeypatch) -> None:
+    monkeypatch.setattr(recorder_module, "CaptureProcess", FakeCaptureProcess)
+    FakeCaptureProcess.instances = 0
+
+    recorder = AudioRecorder(AudioSettings(), isolated=True)
+    takes = []
+    for _ in range(2):
+        recorder.start()
+        time.sleep(0.1)
+        takes.append(recorder.stop())
+    capture = recorder.capture
+    recorder.close()
+
+    assert FakeCaptureProcess.instances == 1
+    # The second take starts where its own stream began, not at the first take's frames
+    assert [sum(len(frame) for frame in take) for take in takes] == [1024, 1024]
+    assert capture.released
+    assert recorder.capture is None
+
+
+def test_ring_collector_counts_laps_as_overflows() -> None:
+    ring = SharedRingBuffer.create(capacity=256, channels=1, dtype="int16")
+    try:
+        recorder = AudioRecorder(AudioSettings())
+        recorder._state.is_recording = True
+        reader = ring.reader()
+        ring.write(np.ones((1024, 1), dtype=np.int16))
+        ring.close()
+
+        recorder._collect_from_ring(reader, recorder._state)
+
+        assert recorder.overflows == 1
+        assert recorder.lost_frames == 768
+        assert sum(len(frame) for frame in recorder._state.frames) == 256
+    finally:
+        ring.release()
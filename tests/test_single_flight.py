@@ -0,0 +1,61 @@
+"""Tests for in-flight request coalescing."""
+import threading
+
+import numpy as np
+import pytest
+
+from src.single_flight import SingleFlight, frames_digest
+
+
+def _run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test that callers with the same key get the leader's result."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=2)
+        return "resultado"
+
+    threads = _run_concurrently(5, lambda: results.append(flight.do("key", work)))
+    assert started.wait(timeout=2)
+    # Give the followers time to attach to the in-flight call
+    threading.Event().wait(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert len(calls) == 1
+    assert results == ["resultado"] * 5
+    assert flight.in_flight() == 0
+
+
+def test_error_is_shared_and_key_forgotten():
+    """Test that exceptions propagate and the key can run again afterwards."""
+    flight = SingleFlight()
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", lambda: (_ for _ in ()).throw(RuntimeError("falhou")))
+
+    assert flight.do("key", lambda: 42) == 42
+
+
+def test_frames_digest_depends_on_content():
+    """Test that the frames digest identifies identical audio."""
+    frames = [np.zeros((10, 1), dtype=np.int16), np.ones((5, 1), dtype=np.int16)]
+    same = [frame.copy() for frame in frames]
+    different = [np.zeros((10, 1), dtype=np.int16), np.full((5, 1), 2, dtype=np.int16)]
+
+    assert frames_digest(frames) == frames_digest(same)
+    assert frames_digest(frames) != frames_digest(different)
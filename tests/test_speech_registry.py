@@ -34,12 +34,11 @@ def test_get_model_from_models_endpoint():
         assert call_args[1].get("params") == {"task": "automatic-speech-recognition"}  # params
         
         # Should use first model
-        assert stt._model == "Systran/faster-whisper-large-v3"
+        assert stt.model == "Systran/faster-whisper-large-v3"
         
         # Should store supported languages
-        assert hasattr(stt, "_supported_languages")
-        assert "pt" in stt._supported_languages
-        assert "en" in stt._supported_languages
+        assert "pt" in stt.get_supported_languages()
+        assert "en" in stt.get_supported_languages()
 
 
 def test_get_model_fallback_on_error():
@@ -48,8 +47,8 @@ def test_get_model_fallback_on_error():
         stt = SpeechToText()
         
         # Should fallback to default
-        assert stt._model == "whisper-1"
-        assert hasattr(stt, "_supported_languages")
+        assert stt.model == "whisper-1"
+        assert stt.get_supported_languages() == []
 
 
 def test_transcribe_validates_language():
@@ -70,8 +69,8 @@ def test_transcribe_validates_language():
         stt = SpeechToText()
         
         # Should have limited language support
-        assert "en" in stt._supported_languages
-        assert "pt" not in stt._supported_languages
+        assert "en" in stt.get_supported_languages()
+        assert "pt" not in stt.get_supported_languages()
 
 
 def test_get_supported_languages():
@@ -133,5 +132,62 @@ def test_download_model_when_none_available():
         )
         
         # Verify model was loaded after download
-        assert stt._model == "Systran/faster-whisper-large-v3"
-        assert "pt" in stt._supported_languages
+        assert stt.model == "Systran/faster-whisper-large-v3"
+        assert "pt" in stt.get_supported_languages()
+
+
+def test_transcribe_frames_uploads_from_memory():
+    """Test that recorder frames are uploaded as an in-memory WAV."""
+    import numpy as np
+    import soundfile as sf
+
+    from src.audio_utils import AudioSettings
+
+    uploaded = {}
+
+    def fake_post(url, files=None, data=None, timeout=None):
+        name, fileobj, mime = files["file"]
+        uploaded["name"] = name
+        uploaded["audio"] = sf.read(fileobj, dtype="int16")
+        return Mock(raise_for_status=Mock(), json=lambda: {"text": "olá"})
+
+    settings = AudioSettings()
+    frames = [np.ones((80, settings.channels), dtype=np.int16)] * 3
+
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")), \
+         patch("requests.post", side_effect=fake_post):
+        stt = SpeechToText()
+        text = stt.transcribe_frames(frames, settings)
+
+    assert text == "olá"
+    assert uploaded["name"].endswith(".wav")
+    data, samplerate = uploaded["audio"]
+    assert samplerate == settings.samplerate
+    assert data.shape[0] == 240
+
+
+def test_transcription_fails_over_to_reachable_backend():
+    """Test that an unreachable backend is skipped and the upload resent in full."""
+    import io
+
+    import numpy as np
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(8000, dtype=np.int16), 8000, format="WAV")
+    buffer.seek(0)
+    uploads = []
+
+    def fake_post(url, files=None, data=None, timeout=None):
+        uploads.append((url, files["file"][1].read()))
+        if url.startswith("http://a"):
+            raise requests.exceptions.ConnectionError("refused")
+        return Mock(raise_for_status=Mock(), json=lambda: {"text": "olá"})
+
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        stt = SpeechToText(["http://a", "http://b"])
+    with patch("requests.post", side_effect=fake_post):
+        assert stt.transcribe_buffer(buffer) == "olá"
+
+    assert [url for url, _ in uploads] == ["http://a/v1/audio/transcriptions", "http://b/v1/audio/transcriptions"]
+    assert uploads[1][1] == buffer.getvalue()
@@ -0,0 +1,174 @@
+"""Tests for the transcription backends behind SpeechToText."""
+import io
+import sys
+from types import ModuleType, SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.audio_utils import AudioSettings
+from src.backend_pool import BackendPool
+from src.speech_to_text import SpeechToText
+from src.stt_backends import LocalWhisperBackend, SpeachesBackend, create_backend, to_whisper_input
+
+
+class FakeWhisperModel:
+    instances = 0
+
+    def __init__(self, model, **kwargs) -> None:
+        FakeWhisperModel.instances += 1
+        self.model = model
+        self.kwargs = kwargs
+        self.supported_languages = ["en", "pt"]
+        self.calls = []
+
+    def transcribe(self, audio, language=None, beam_size=5):
+        self.calls.append((audio, language))
+        return iter([SimpleNamespace(text=" bom"), SimpleNamespace(text=" dia ")]), None
+
+
+@pytest.fixture
+def fake_faster_whisper(monkeypatch):
+    module = ModuleType("faster_whisper")
+    module.WhisperModel = FakeWhisperModel
+    FakeWhisperModel.instances = 0
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    return module
+
+
+def test_local_backend_loads_model_once(fake_faster_whisper) -> None:
+    backend = LocalWhisperBackend(model="tiny")
+    assert not backend.is_loaded
+    assert backend.supported_languages == []
+
+    backend.warm_up()
+    text = backend.transcribe_samples(np.zeros(8000, dtype=np.float32), 16000, "pt")
+
+    assert text == "bom dia"
+    assert FakeWhisperModel.instances == 1
+    assert backend.supported_languages == ["en", "pt"]
+    assert backend._whisper.kwargs["device"] == "cpu"
+
+
+def test_local_backend_without_package_fails_clearly(monkeypatch) -> None:
+    monkeypatch.setitem(sys.modules, "faster_whisper", None)
+    with pytest.raises(RuntimeError, match="faster-whisper"):
+        LocalWhisperBackend().transcribe_samples(np.zeros(10), 16000, "pt")
+
+
+def test_to_whisper_input_converts_to_mono_16k_float() -> None:
+    samples = np.full((44100, 2), 16384, dtype=np.int16)
+
+    audio = to_whisper_input(samples, 44100)
+
+    assert audio.dtype == np.float32
+    assert audio.ndim == 1
+    assert len(audio) == 16000
+    # Full scale is 32768, like everywhere else, so 16384 is exactly half
+    np.testing.assert_allclose(audio[100:-100], 0.5, atol=1e-3)
+
+
+def test_create_backend_from_configuration() -> None:
+    assert create_backend(None) is None
+    assert create_backend("speaches") is None
+    assert isinstance(create_backend("local", model="base"), LocalWhisperBackend)
+    with pytest.raises(ValueError):
+        create_backend("gpu-cluster")
+
+
+def test_speech_to_text_with_local_backend_skips_http(fake_faster_whisper) -> None:
+    settings = AudioSettings()
+    frames = [np.zeros((4410, settings.channels), dtype=np.int16)] * 2
+
+    with patch("requests.get") as mock_get, patch("requests.post") as mock_post:
+        stt = SpeechToText(backend="local")
+        from_frames = stt.transcribe_frames(frames, settings)
+
+        buffer = io.BytesIO()
+        sf.write(buffer, np.zeros(16000, dtype=np.int16), 16000, format="WAV")
+        buffer.seek(0)
+        from_buffer = stt.transcribe_buffer(buffer, language="en")
+
+    mock_get.assert_not_called()
+    mock_post.assert_not_called()
+    assert stt.is_local
+    assert stt.model == "small"
+    assert from_frames == from_buffer == "bom dia"
+    audio, language = stt._backend._whisper.calls[0]
+    assert len(audio) == 3200  # 0.2 s resampled to 16 kHz
+    assert language == "pt"
+
+
+def test_to_whisper_input_filters_before_downsampling() -> None:
+    """Test that content above 8 kHz is removed instead of aliased into the 16 kHz signal."""
+    t = np.arange(44100) / 44100
+    samples = (np.sin(2 * np.pi * 10_000 * t) * 16384).astype(np.int16)
+
+    audio = to_whisper_input(samples, 44100)
+
+    assert np.abs(audio[100:-100]).max() < 1e-3
+
+
+def test_speech_to_text_delegates_every_call_to_its_backend() -> None:
+    """Test that SpeechToText has no HTTP code path of its own: any backend serves every method."""
+    backend = SimpleNamespace(
+        model="remoto",
+        is_local=False,
+        supported_languages=["pt"],
+        warm_up=lambda: None,
+        transcribe_frames=lambda frames, samplerate, language: f"frames {samplerate}",
+        transcribe_buffer=lambda buffer, filename, language: f"buffer {filename}",
+        transcribe_verbose=lambda buffer, filename, language, word_timestamps: {"text": "verbose"},
+    )
+
+    with patch("requests.get") as mock_get, patch("requests.post") as mock_post:
+        stt = SpeechToText(backend=backend)
+        from_frames = stt.transcribe_frames([np.zeros((10, 1), dtype=np.int16)], AudioSettings(samplerate=8000))
+        from_buffer = stt.transcribe_buffer(io.BytesIO(), filename="a.wav")
+        verbose = stt.transcribe_verbose(io.BytesIO())
+
+    mock_get.assert_not_called()
+    mock_post.assert_not_called()
+    assert (from_frames, from_buffer, verbose) == ("frames 8000", "buffer a.wav", {"text": "verbose"})
+    assert stt.model == "remoto"
+    assert not stt.is_local
+
+
+def test_speaches_backend_uploads_frames_as_wav() -> None:
+    """Test that the HTTP backend encodes captured frames and posts them to the transcription endpoint."""
+    backend = SpeachesBackend(BackendPool("http://stt:8000"))
+    response = SimpleNamespace(raise_for_status=lambda: None, json=lambda: {"text": "olá"})
+
+    with patch("requests.post", return_value=response) as mock_post:
+        text = backend.transcribe_frames([np.zeros((8000, 1), dtype=np.int16)], 16000, "pt")
+
+    assert text == "olá"
+    assert mock_post.call_args[0][0] == "http://stt:8000/v1/audio/transcriptions"
+    upload = mock_post.call_args[1]["files"]["file"][1]
+    upload.seek(0)
+    assert sf.info(upload).duration == pytest.approx(0.5)
+
+
+def test_local_backend_streams_segments_as_they_are_decoded(fake_faster_whisper) -> None:
+    """Test that the local backend yields each segment before decoding the next."""
+    decoded = []
+
+    def segments():
+        for index, text in enumerate((" bom", " dia")):
+            decoded.append(index)
+            yield SimpleNamespace(start=float(index), end=index + 1.0, text=text, words=[])
+
+    backend = LocalWhisperBackend()
+    backend._load().transcribe = lambda audio, **kwargs: (segments(), SimpleNamespace(language="pt"))
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(16000, dtype=np.int16), 16000, format="WAV")
+    buffer.seek(0)
+
+    stream = backend.stream_verbose(buffer, "a.wav", "pt")
+    first = next(stream)
+
+    assert decoded == [0]
+    assert first["segments"][0]["text"] == " bom"
+    assert [result["segments"][0]["start"] for result in stream] == [1.0]
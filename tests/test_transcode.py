@@ -0,0 +1,63 @@
+"""Tests for bulk conversion of the recordings directory."""
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.transcode import TranscodeOptions, transcode_directory, transcode_file
+
+
+def _write_tone(path: Path, samplerate: int = 44100, seconds: float = 0.5, channels: int = 2) -> None:
+    t = np.arange(int(samplerate * seconds)) / samplerate
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    sf.write(path, np.repeat(tone[:, None], channels, axis=1), samplerate, subtype="PCM_16")
+
+
+def test_transcode_file_to_flac_with_resample_and_downmix(tmp_path: Path) -> None:
+    source = tmp_path / "take.wav"
+    _write_tone(source)
+
+    result = transcode_file(source, tmp_path / "take.flac", TranscodeOptions("flac", samplerate=16000, mono=True))
+
+    data, samplerate = sf.read(result.destination)
+    assert samplerate == 16000
+    assert data.ndim == 1
+    assert abs(len(data) - 8000) <= 1
+    assert np.abs(data).max() == pytest.approx(0.5, abs=0.01)
+    assert result.duration == pytest.approx(0.5)
+
+
+def test_opus_snaps_to_supported_samplerate(tmp_path: Path) -> None:
+    source = tmp_path / "take.wav"
+    _write_tone(source, samplerate=44100)
+
+    result = transcode_file(source, tmp_path / "take.opus", TranscodeOptions("opus"))
+
+    assert sf.info(str(result.destination)).samplerate == 48000
+
+
+def test_transcode_directory_skips_converted_files(tmp_path: Path) -> None:
+    recordings = tmp_path / "recordings"
+    recordings.mkdir()
+    for name in ("a.wav", "b.wav"):
+        _write_tone(recordings / name, seconds=0.1)
+
+    first = transcode_directory(recordings, TranscodeOptions("flac"), workers=2)
+    second = transcode_directory(recordings, TranscodeOptions("flac"), workers=2)
+
+    assert len(first.converted) == 2
+    assert not first.failed
+    assert first.audio_seconds_per_second > 0
+    assert len(second.skipped) == 2
+    assert (recordings / "a.flac").exists()
+
+
+def test_transcode_directory_reports_failures(tmp_path: Path) -> None:
+    (tmp_path / "broken.wav").write_bytes(b"not audio")
+
+    report = transcode_directory(tmp_path, TranscodeOptions("flac"), workers=1)
+
+    assert len(report.failed) == 1
+    assert not (tmp_path / "broken.flac").exists()
@@ -0,0 +1,240 @@
+"""Tests for timed transcription results, streaming and subtitle writers."""
+import io
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
+
+import numpy as np
+import pytest
+import requests
+import soundfile as sf
+
+from src.speech_to_text import SpeechToText
+from src.transcript import (
+    Segment,
+    Transcript,
+    Word,
+    format_timestamp,
+    save_segments,
+    stream_segments,
+    write_jsonl,
+    write_srt,
+    write_vtt,
+)
+
+SEGMENTS = [
+    Segment(id=0, start=0.0, end=1.5, text="Olá mundo", words=[Word(0.0, 0.6, "Olá", 0.9), Word(0.7, 1.5, "mundo", 0.8)]),
+    Segment(id=1, start=3661.25, end=3662.0, text="fim"),
+]
+
+
+def _write_speech(path: Path, seconds: float, pauses: list[float], samplerate: int = 8000) -> Path:
+    """Tone with 0.4 s of silence centered on each of ``pauses``."""
+    audio = np.full(int(seconds * samplerate), 8000, dtype=np.int16)
+    audio[1::2] = -8000
+    for pause in pauses:
+        audio[int((pause - 0.2) * samplerate):int((pause + 0.2) * samplerate)] = 0
+    sf.write(path, audio, samplerate)
+    return path
+
+
+def test_from_verbose_attaches_top_level_words_to_segments():
+    """Test parsing verbose_json where words come at the top level, as the API returns them."""
+    transcript = Transcript.from_verbose(
+        {
+            "text": "Olá mundo. Tchau.",
+            "language": "pt",
+            "duration": 4.0,
+            "segments": [
+                {"id": 0, "start": 0.0, "end": 1.5, "text": " Olá mundo."},
+                {"id": 1, "start": 2.0, "end": 3.0, "text": " Tchau."},
+            ],
+            "words": [
+                {"start": 0.0, "end": 0.6, "word": " Olá"},
+                {"start": 0.7, "end": 1.6, "word": " mundo.", "probability": 0.5},
+                {"start": 2.1, "end": 2.9, "word": " Tchau."},
+            ],
+        }
+    )
+
+    assert transcript.text == "Olá mundo. Tchau."
+    assert transcript.language == "pt"
+    assert [word.text for word in transcript.segments[0].words] == ["Olá", "mundo."]
+    assert transcript.segments[0].words[1].probability == 0.5
+    assert [word.text for word in transcript.words] == ["Olá", "mundo.", "Tchau."]
+
+
+def test_from_verbose_without_segments_keeps_text():
+    """Test that a plain json response still yields one segment."""
+    transcript = Transcript.from_verbose({"text": " só texto "})
+
+    assert transcript.segments == [Segment(id=0, start=0.0, end=0.0, text="só texto")]
+
+
+def test_format_timestamp():
+    """Test SRT and WebVTT timestamp formatting."""
+    assert format_timestamp(3661.2506) == "01:01:01,251"
+    assert format_timestamp(0.5, ".") == "00:00:00.500"
+    assert format_timestamp(-0.01) == "00:00:00,000"
+
+
+def test_write_srt_and_vtt():
+    """Test the SubRip and WebVTT cue layout."""
+    srt, vtt = io.StringIO(), io.StringIO()
+
+    assert write_srt(iter(SEGMENTS), srt) == 2
+    assert write_vtt(iter(SEGMENTS), vtt) == 2
+
+    assert srt.getvalue() == (
+        "1\n00:00:00,000 --> 00:00:01,500\nOlá mundo\n\n"
+        "2\n01:01:01,250 --> 01:01:02,000\nfim\n\n"
+    )
+    assert vtt.getvalue() == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.500\nOlá mundo\n\n"
+        "01:01:01.250 --> 01:01:02.000\nfim\n\n"
+    )
+
+
+def test_write_jsonl_includes_words():
+    """Test that JSONL has one object per segment with its words."""
+    output = io.StringIO()
+    write_jsonl(SEGMENTS, output)
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert lines[0]["text"] == "Olá mundo"
+    assert lines[0]["words"][1] == {"start": 0.7, "end": 1.5, "text": "mundo", "probability": 0.8}
+    assert lines[1]["words"] == []
+
+
+def test_save_segments_picks_format_from_suffix(tmp_path):
+    """Test that the output format follows the file suffix."""
+    save_segments(SEGMENTS, tmp_path / "out.vtt")
+
+    assert (tmp_path / "out.vtt").read_text(encoding="utf-8").startswith("WEBVTT")
+    with pytest.raises(ValueError, match="não suportado"):
+        save_segments(SEGMENTS, tmp_path / "out.txt")
+
+
+def test_stream_segments_cuts_windows_at_pauses(tmp_path):
+    """Test that long files go in windows cut at silence, with timestamps shifted back."""
+    audio_file = _write_speech(tmp_path / "long.wav", 25.0, pauses=[9.0, 18.5])
+    durations = []
+
+    def transcribe_verbose(buffer, filename, language, word_timestamps):
+        duration = sf.info(buffer).duration
+        durations.append(duration)
+        return {
+            "segments": [{"start": 0.5, "end": duration - 0.5, "text": f" janela {len(durations)}"}],
+            "words": [{"start": 0.5, "end": 1.0, "word": " janela"}] if word_timestamps else [],
+        }
+
+    stt = Mock(transcribe_verbose=Mock(side_effect=transcribe_verbose))
+    segments = list(stream_segments(stt, audio_file, word_timestamps=True, window_seconds=10.0, prefetch=1))
+
+    assert [segment.id for segment in segments] == [0, 1, 2]
+    assert [segment.text for segment in segments] == ["janela 1", "janela 2", "janela 3"]
+    # Each cut lands inside a pause, not on the 10 s grid
+    assert 8.8 < segments[1].start - 0.5 < 9.2
+    assert 18.3 < segments[2].start - 0.5 < 18.7
+    assert sum(durations) == pytest.approx(25.0)
+    assert segments[2].words[0].start == pytest.approx(segments[2].start)
+
+
+def test_iter_segments_falls_back_to_windows_without_streaming(tmp_path):
+    """Test that a backend that can't stream gets windows, the first segments before later windows are sent."""
+    audio_file = _write_speech(tmp_path / "long.wav", 50.0, pauses=[])
+    calls = []
+
+    def transcribe_verbose(buffer, filename, language, word_timestamps):
+        calls.append(word_timestamps)
+        return {"text": "parte", "segments": [{"start": 0.0, "end": 2.0, "text": " parte"}]}
+
+    backend = SimpleNamespace(model="janelas", is_local=False, transcribe_verbose=transcribe_verbose)
+    catalog = Mock()
+    stt = SpeechToText(catalog=catalog, backend=backend)
+    stream = stt.iter_segments(audio_file, word_timestamps=False, window_seconds=10.0)
+    first = next(stream)
+    assert first.start == 0.0
+    assert len(calls) <= 2
+    rest = list(stream)
+
+    assert len(calls) == 5
+    assert [segment.start for segment in rest] == pytest.approx([10.0, 20.0, 30.0, 40.0], abs=0.05)
+    catalog.set_transcript.assert_called_once_with(audio_file, "parte parte parte parte parte", "pt")
+
+
+def _sse_response(events: list[dict]) -> MagicMock:
+    response = MagicMock(headers={"Content-Type": "text/event-stream; charset=utf-8"})
+    response.__enter__.return_value = response
+    lines = []
+    for event in events:
+        lines += [f"data: {json.dumps(event)}", ""]
+    response.iter_lines.return_value = iter(lines)
+    return response
+
+
+def test_iter_segments_streams_server_sent_segments_from_one_request(tmp_path):
+    """Test that Speaches' stream=true events become segments as they arrive, from a single upload."""
+    audio_file = _write_speech(tmp_path / "long.wav", 50.0, pauses=[])
+    events = [
+        {"text": " primeira", "segments": [{"id": 0, "start": 0.0, "end": 4.0, "text": " primeira"}],
+         "words": [{"start": 0.5, "end": 1.0, "word": " primeira"}]},
+        {"text": " segunda", "segments": [{"id": 0, "start": 31.0, "end": 35.0, "text": " segunda"}]},
+    ]
+    catalog = Mock()
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        stt = SpeechToText(catalog=catalog)
+    with patch("requests.post", return_value=_sse_response(events)) as mock_post:
+        segments = list(stt.iter_segments(audio_file, word_timestamps=True))
+
+    assert mock_post.call_count == 1
+    data = mock_post.call_args[1]["data"]
+    assert data["stream"] == "true"
+    assert data["response_format"] == "verbose_json"
+    assert mock_post.call_args[1]["stream"] is True
+    assert [(segment.id, segment.start, segment.text) for segment in segments] == [
+        (0, 0.0, "primeira"),
+        (1, 31.0, "segunda"),
+    ]
+    assert segments[0].words == [Word(0.5, 1.0, "primeira")]
+    catalog.set_transcript.assert_called_once_with(audio_file, "primeira segunda", "pt")
+
+
+def test_iter_segments_accepts_a_server_that_does_not_stream(tmp_path):
+    """Test that an ordinary verbose_json answer to a stream request is used whole."""
+    audio_file = _write_speech(tmp_path / "short.wav", 2.0, pauses=[])
+    response = MagicMock(headers={"Content-Type": "application/json"})
+    response.__enter__.return_value = response
+    response.json.return_value = {
+        "text": "um dois",
+        "segments": [{"start": 0.0, "end": 1.0, "text": " um"}, {"start": 1.0, "end": 2.0, "text": " dois"}],
+    }
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        stt = SpeechToText()
+    with patch("requests.post", return_value=response):
+        segments = list(stt.iter_segments(audio_file))
+
+    assert [(segment.id, segment.text) for segment in segments] == [(0, "um"), (1, "dois")]
+
+
+def test_transcribe_result_returns_timed_transcript(tmp_path):
+    """Test the one-request timed transcription of a file."""
+    audio_file = _write_speech(tmp_path / "short.wav", 2.0, pauses=[])
+    response = Mock(
+        raise_for_status=Mock(),
+        json=lambda: {
+            "text": "oi",
+            "segments": [{"start": 0.0, "end": 1.0, "text": " oi"}],
+            "words": [{"start": 0.1, "end": 0.4, "word": " oi"}],
+        },
+    )
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        stt = SpeechToText()
+    with patch("requests.post", return_value=response) as mock_post:
+        transcript = stt.transcribe_result(audio_file)
+
+    assert transcript.text == "oi"
+    assert transcript.words == [Word(0.1, 0.4, "oi")]
+    assert mock_post.call_args[1]["data"]["timestamp_granularities[]"] == ["segment", "word"]
@@ -0,0 +1,255 @@
+"""Tests for speculative per-sentence speech synthesis."""
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from src.jobs import JobExecutor
+from src.scheduler import BULK, INTERACTIVE
+from src.tts_prefetch import KEEP_SPOKEN, SpeechPrefetcher, create_prefetch_scheduler, split_sentences
+
+
+class FakeTTS:
+    def __init__(self) -> None:
+        self.voice = "pf_dora"
+        self.synthesized = []
+        self.played = []
+        self.spoken = []
+        self.priorities = []
+        self.lock = threading.Lock()
+
+    def get_voice(self) -> str:
+        return self.voice
+
+    def get_speed(self) -> float:
+        return 1.0
+
+    def save_to_file(self, text, output_path, response_format=None, speed=None, voice=None, priority=None) -> None:
+        with self.lock:
+            self.synthesized.append((text, voice))
+            self.priorities.append(priority)
+        sf.write(str(output_path), np.full(100, len(text), dtype=np.int16), 24000, format="WAV")
+
+    def play_file(self, audio_file: Path) -> None:
+        self.played.append(audio_file)
+
+    def speak(self, text: str) -> None:
+        self.spoken.append(text)
+
+
+class ScheduledTTS(FakeTTS):
+    """Fake client whose requests take scheduler slots like TextToSpeech; prefetches block until released."""
+
+    def __init__(self, scheduler) -> None:
+        super().__init__()
+        self.scheduler = scheduler
+        self.release = threading.Event()
+        self.served = []
+
+    def save_to_file(self, text, output_path, response_format=None, speed=None, voice=None, priority=None) -> None:
+        with self.scheduler.slot(priority or INTERACTIVE):
+            if priority == BULK:
+                self.release.wait(timeout=2)
+            self.served.append(text)
+        super().save_to_file(text, output_path, response_format, speed, voice, priority)
+
+    def speak(self, text: str) -> None:
+        with self.scheduler.slot(INTERACTIVE):
+            self.served.append(text)
+        super().speak(text)
+
+
+def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_split_sentences_keeps_open_remainder() -> None:
+    sentences, remainder = split_sentences("Olá, tudo bem? Hoje vai chover. Amanhã o")
+
+    assert sentences == ["Olá, tudo bem?", "Hoje vai chover."]
+    assert remainder == "Amanhã o"
+    assert split_sentences("Valor de 3.5 reais") == ([], "Valor de 3.5 reais")
+
+
+def test_debounced_edits_only_synthesize_latest_text() -> None:
+    tts = FakeTTS()
+    jobs = JobExecutor(max_workers=2)
+    prefetcher = SpeechPrefetcher(tts, jobs, debounce=0.1)
+    try:
+        prefetcher.text_changed("Primeira")
+        prefetcher.text_changed("Primeira frase. Segunda")
+        prefetcher.text_changed("Primeira frase. Segunda frase. Ter")
+
+        _wait_for(lambda: len(tts.synthesized) >= 2)
+        time.sleep(0.2)
+
+        assert tts.synthesized == [("Primeira frase.", "pf_dora"), ("Segunda frase.", "pf_dora")]
+        assert prefetcher.is_cached("Segunda frase.")
+        assert not prefetcher.is_cached("Ter")
+    finally:
+        prefetcher.close()
+        jobs.shutdown()
+
+
+def test_voice_change_cancels_pending_work() -> None:
+    tts = FakeTTS()
+    jobs = JobExecutor(max_workers=2)
+    prefetcher = SpeechPrefetcher(tts, jobs, debounce=0.1)
+    try:
+        prefetcher.text_changed("Bom dia.")
+        tts.voice = "pm_alex"
+        prefetcher.voice_changed()
+
+        _wait_for(lambda: tts.synthesized)
+        time.sleep(0.2)
+
+        assert tts.synthesized == [("Bom dia.", "pm_alex")]
+        assert not prefetcher.is_cached("Bom dia.", voice="pf_dora")
+    finally:
+        prefetcher.close()
+        jobs.shutdown()
+
+
+def test_speak_plays_from_cache_and_fills_gaps(tmp_path: Path) -> None:
+    tts = FakeTTS()
+    jobs = JobExecutor(max_workers=2)
+    prefetcher = SpeechPrefetcher(tts, jobs, debounce=0)
+    try:
+        prefetcher.text_changed("Uma frase pronta. ")
+        _wait_for(lambda: prefetcher.is_cached("Uma frase pronta."))
+
+        prefetcher.speak("Uma frase pronta. E o resto")
+
+        assert tts.spoken == []
+        assert len(tts.played) == 1
+        data, samplerate = sf.read(str(tts.played[0]), dtype="int16")
+        assert samplerate == 24000
+        assert len(data) == 200
+        assert prefetcher.hits == 1
+        assert prefetcher.misses == 1
+    finally:
+        prefetcher.close()
+        jobs.shutdown()
+
+
+def test_speak_without_cache_falls_back_to_single_request() -> None:
+    tts = FakeTTS()
+    jobs = JobExecutor(max_workers=1)
+    prefetcher = SpeechPrefetcher(tts, jobs)
+    try:
+        prefetcher.speak("Nada foi pré-sintetizado.")
+
+        assert tts.spoken == ["Nada foi pré-sintetizado."]
+        assert tts.synthesized == []
+    finally:
+        prefetcher.close()
+        jobs.shutdown()
+
+
+def test_cache_is_bounded() -> None:
+    tts = FakeTTS()
+    jobs = JobExecutor(max_workers=1)
+    prefetcher = SpeechPrefetcher(tts, jobs, debounce=0, max_cached=2)
+    try:
+        prefetcher.text_changed("Um. Dois. Três. ")
+        _wait_for(lambda: len(tts.synthesized) == 3)
+        _wait_for(lambda: prefetcher.is_cached("Três."))
+
+        assert not prefetcher.is_cached("Um.")
+        assert prefetcher.is_cached("Dois.")
+    finally:
+        prefetcher.close()
+        jobs.shutdown()
+
+
+def test_prefetch_runs_at_bulk_priority_and_speak_at_the_client_priority() -> None:
+    tts = FakeTTS()
+    jobs = JobExecutor(max_workers=1)
+    prefetcher = SpeechPrefetcher(tts, jobs, debounce=0)
+    try:
+        prefetcher.text_changed("Antes. ")
+        _wait_for(lambda: prefetcher.is_cached("Antes."))
+        prefetcher.speak("Antes. Depois.")
+
+        assert tts.synthesized == [("Antes.", "pf_dora"), ("Depois.", "pf_dora")]
+        assert tts.priorities == [BULK, None]
+    finally:
+        prefetcher.close()
+        jobs.shutdown()
+
+
+def test_render_survives_eviction_of_a_sentence_it_is_using(tmp_path: Path) -> None:
+    tts = FakeTTS()
+    jobs = JobExecutor(max_workers=1)
+    prefetcher = SpeechPrefetcher(tts, jobs, debounce=0)
+    synthesize = prefetcher._synthesize
+    raced = []
+
+    def evicted_right_after(sentence, voice, priority=None):
+        path = synthesize(sentence, voice, priority)
+        if not raced:
+            # A concurrent prefetch pushes the sentence out of the cache before render reads it
+            raced.append(path)
+            with prefetcher._lock:
+                prefetcher._cache.pop(prefetcher._key(sentence, voice))
+                path.unlink()
+        return path
+
+    try:
+        prefetcher.text_changed("Uma. ")
+        _wait_for(lambda: prefetcher.is_cached("Uma."))
+        prefetcher._synthesize = evicted_right_after
+
+        assert prefetcher.render("Uma.", tmp_path / "out.wav")
+        data, _ = sf.read(str(tmp_path / "out.wav"), dtype="int16")
+        assert len(data) == 100
+    finally:
+        prefetcher.close()
+        jobs.shutdown()
+
+
+def test_speak_keeps_only_the_latest_renders() -> None:
+    tts = FakeTTS()
+    jobs = JobExecutor(max_workers=1)
+    prefetcher = SpeechPrefetcher(tts, jobs, debounce=0)
+    try:
+        prefetcher.text_changed("Oi. ")
+        _wait_for(lambda: prefetcher.is_cached("Oi."))
+        for _ in range(KEEP_SPOKEN + 3):
+            prefetcher.speak("Oi.")
+
+        assert len(tts.played) == KEEP_SPOKEN + 3
+        assert [path.exists() for path in tts.played] == [False] * 3 + [True] * KEEP_SPOKEN
+    finally:
+        prefetcher.close()
+        jobs.shutdown()
+
+
+def test_speak_is_served_before_queued_prefetches() -> None:
+    """Test that with the prefetch scheduler a speak request doesn't wait behind speculative work."""
+    scheduler = create_prefetch_scheduler()
+    tts = ScheduledTTS(scheduler)
+    jobs = JobExecutor(max_workers=4)
+    prefetcher = SpeechPrefetcher(tts, jobs, debounce=0)
+    try:
+        prefetcher.text_changed("Um. Dois. ")
+        _wait_for(lambda: scheduler.get_stats()[BULK]["running"] == 1)
+        # The superseded job's request is still in flight while the new one queues behind it
+        prefetcher.text_changed("Três. Quatro. ")
+        _wait_for(lambda: scheduler.get_stats()[BULK]["queued"] == 1)
+
+        prefetcher.speak("Agora.")
+        assert tts.served == ["Agora."]
+        assert scheduler.get_stats()[BULK] == {"running": 1, "queued": 1}
+
+        tts.release.set()
+        _wait_for(lambda: prefetcher.is_cached("Quatro."))
+        assert tts.served == ["Agora.", "Um.", "Três.", "Quatro."]
+    finally:
+        tts.release.set()
+        prefetcher.close()
+        jobs.shutdown()
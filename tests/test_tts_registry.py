@@ -1,5 +1,5 @@
 """Tests for Text-to-Speech models endpoint integration."""
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 import requests
@@ -179,3 +179,135 @@ def test_download_model_when_none_available():
         assert tts._model == "speaches-ai/Kokoro-82M-v1.0-ONNX-int8"
         assert len(tts._voice_names) == 2
         assert "dora-PT-BR" in tts._voice_names
+
+
+def _offline_tts():
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        return TextToSpeech()
+
+
+def test_save_to_file_streams_chunks(tmp_path):
+    """Test that synthesis is streamed to disk chunk by chunk."""
+    tts = _offline_tts()
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [b"abc", b"", b"def"]
+
+    with patch("requests.post", return_value=response) as mock_post:
+        output = tmp_path / "out.opus"
+        tts.save_to_file("Olá", output, response_format="opus", speed=1.5)
+
+    assert output.read_bytes() == b"abcdef"
+    kwargs = mock_post.call_args[1]
+    assert kwargs["stream"] is True
+    assert kwargs["json"]["response_format"] == "opus"
+    assert kwargs["json"]["speed"] == 1.5
+
+
+def test_save_to_file_uses_default_format_and_speed(tmp_path):
+    """Test that configured format and speed are sent by default."""
+    tts = _offline_tts()
+    tts.set_response_format("FLAC")
+    tts.set_speed(0.8)
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [b"x"]
+
+    with patch("requests.post", return_value=response) as mock_post:
+        tts.save_to_file("Olá", tmp_path / "out.flac")
+
+    payload = mock_post.call_args[1]["json"]
+    assert payload["response_format"] == "flac"
+    assert payload["speed"] == 0.8
+
+
+def test_rejects_unsupported_format_and_speed():
+    """Test that invalid format and speed values are rejected."""
+    tts = _offline_tts()
+
+    with pytest.raises(ValueError):
+        tts.set_response_format("ogg")
+    with pytest.raises(ValueError):
+        tts.set_speed(10.0)
+
+
+def test_concurrent_identical_saves_share_one_request(tmp_path):
+    """Test that identical concurrent syntheses hit the server once."""
+    import threading
+
+    tts = _offline_tts()
+    release = threading.Event()
+    response = MagicMock()
+    response.__enter__.return_value = response
+
+    def slow_chunks(chunk_size=None):
+        release.wait(timeout=2)
+        return [b"audio"]
+
+    response.iter_content.side_effect = slow_chunks
+    outputs = [tmp_path / "a.mp3", tmp_path / "b.mp3"]
+
+    with patch("requests.post", return_value=response) as mock_post:
+        threads = [threading.Thread(target=tts.save_to_file, args=("Olá", out)) for out in outputs]
+        for thread in threads:
+            thread.start()
+        threading.Event().wait(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=2)
+
+    assert mock_post.call_count == 1
+    assert all(out.read_bytes() == b"audio" for out in outputs)
+
+
+def test_save_to_file_rejects_out_of_range_speed(tmp_path):
+    """Test that a per-call speed is range-checked like set_speed."""
+    tts = _offline_tts()
+
+    with patch("requests.post") as mock_post, pytest.raises(ValueError):
+        tts.save_to_file("Olá", tmp_path / "out.mp3", speed=8.0)
+    mock_post.assert_not_called()
+
+
+def test_failed_stream_leaves_no_partial_file(tmp_path):
+    """Test that a download failing midway removes what was written."""
+    tts = _offline_tts()
+    response = MagicMock()
+    response.__enter__.return_value = response
+
+    def broken_chunks(chunk_size=None):
+        yield b"abc"
+        raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+    response.iter_content.side_effect = broken_chunks
+    output = tmp_path / "out.mp3"
+
+    with patch("requests.post", return_value=response), pytest.raises(ValueError):
+        tts.save_to_file("Olá", output)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_to_file_priority_overrides_client_priority(tmp_path):
+    """Test that a per-call priority picks the scheduler class the request waits in."""
+    from src.scheduler import BULK, RequestScheduler
+
+    scheduler = RequestScheduler()
+    with patch("requests.get", side_effect=requests.exceptions.RequestException("offline")):
+        tts = TextToSpeech(scheduler=scheduler)
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [b"abc"]
+    classes = []
+
+    def post(*args, **kwargs):
+        classes.extend(p for p, stats in scheduler.get_stats().items() if stats["running"])
+        return response
+
+    with patch("requests.post", side_effect=post):
+        tts.save_to_file("Olá", tmp_path / "a.wav", priority=BULK)
+        tts.save_to_file("Olá de novo", tmp_path / "b.wav")
+    with pytest.raises(ValueError, match="Prioridade"):
+        tts.save_to_file("Olá", tmp_path / "c.wav", priority="urgent")
+
+    assert classes == [BULK, "normal"]